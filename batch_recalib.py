@@ -0,0 +1,170 @@
+"""
+保存済みのクリック結果 (.mat / .clk) をまとめて再キャリブレーション・形式変換するコマンド (GUI 不要)
+
+    python batch_recalib.py DIR --calib calib.json [--out OUT_DIR] [--format mat|clk] [--workers N]
+
+calib.json は次のいずれか:
+    {"model": "affine", "img": [[x, y], ...], "real": [[X, Y], ...]}   # 対応点から推定
+    {"model": "homography", "matrix": [[...], [...], [...]]}           # 変換行列を直接指定
+    {"default": <上のどちらか>, "files": {"a.mat": <上のどちらか>, ...}} # ファイルごとに指定
+--calib を省略すると coords_real はそのままで、形式変換のみ行う。
+ファイルはプロセスプールで並列に処理し、進捗とスループットを表示する。
+"""
+import argparse
+import fnmatch
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from click_app.calibration import Calibration, CALIB_MODELS
+from click_app.columns import load_click_columns, save_click_columns
+from click_app.core import load_click_mat, save_click_mat
+
+
+FORMATS = ('mat', 'clk')
+
+
+def parse_calib(spec):
+	"""Calibration from a spec dict (fitted from img/real point pairs or given as a matrix)."""
+	if spec is None:
+		return None
+	model = spec.get('model', 'scale')
+	if model not in CALIB_MODELS:
+		raise ValueError(f'Unknown calibration model: {model}')
+	if 'matrix' in spec:
+		return Calibration(model, spec['matrix'])
+	return Calibration.fit(spec['img'], spec['real'], model)
+
+
+def calib_for(specs, name):
+	if specs is None:
+		return None
+	if 'files' in specs or 'default' in specs:
+		return specs.get('files', {}).get(name, specs.get('default'))
+	return specs
+
+
+def find_inputs(directory, pattern=None):
+	names = []
+	for name in sorted(os.listdir(directory)):
+		ext = os.path.splitext(name)[1].lower()
+		if ext not in ('.mat', '.clk'):
+			continue
+		if pattern and not fnmatch.fnmatch(name, pattern):
+			continue
+		names.append(name)
+	return names
+
+
+def load_flat(path):
+	"""Any result file -> (flat raw (N, 2), flat real (N, 2), offsets (n_frames + 1,))."""
+	if path.lower().endswith('.clk'):
+		clk = load_click_columns(path)
+		raw = np.column_stack([clk.column('x_raw'), clk.column('y_raw')])
+		real = np.column_stack([clk.column('x_real'), clk.column('y_real')])
+		return raw, real, np.asarray(clk.offsets)
+	out = load_click_mat(path)
+	raw = [np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in out['coords_raw']]
+	real = [np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in out['coords_real']]
+	offsets = np.zeros(len(raw) + 1, dtype=np.int64)
+	np.cumsum([len(p) for p in raw], out=offsets[1:])
+	flat_raw = np.concatenate(raw) if raw else np.zeros((0, 2))
+	flat_real = np.concatenate(real) if real else np.zeros((0, 2))
+	if len(flat_real) != len(flat_raw):
+		flat_real = np.full_like(flat_raw, np.nan)
+	return flat_raw, flat_real, offsets
+
+
+def process_file(src, dst, fmt, spec):
+	"""Worker: load src, recompute coords_real with spec (if any) and write dst. Returns the point count."""
+	raw, real, offsets = load_flat(src)
+	calib = parse_calib(spec)
+	if calib is not None:
+		real = calib.apply(raw)
+	if fmt == 'clk':
+		save_click_columns(dst, raw, real, offsets=offsets)
+	else:
+		n = len(offsets) - 1
+		coords_raw = [raw[offsets[i]:offsets[i + 1]] for i in range(n)]
+		coords_real = [real[offsets[i]:offsets[i + 1]] for i in range(n)]
+		save_click_mat(dst, coords_raw, coords_real)
+	return len(raw)
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Batch re-calibration / conversion of click results (.mat / .clk).')
+	parser.add_argument('input_dir', help='directory containing .mat / .clk result files')
+	parser.add_argument('--calib', help='calibration spec JSON (omit to only convert)')
+	parser.add_argument('--out', help='output directory (default: <input_dir>/recalib)')
+	parser.add_argument('--format', choices=FORMATS, default='mat', help='output format (default: mat)')
+	parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+	parser.add_argument('--pattern', help='only process files matching this glob, e.g. "run*.mat"')
+	args = parser.parse_args(argv)
+
+	specs = None
+	if args.calib:
+		with open(args.calib, 'r', encoding='utf-8') as f:
+			specs = json.load(f)
+	names = find_inputs(args.input_dir, args.pattern)
+	if not names:
+		print('No .mat / .clk files found in', args.input_dir)
+		return 1
+	out_dir = args.out or os.path.join(args.input_dir, 'recalib')
+	if os.path.abspath(out_dir) == os.path.abspath(args.input_dir):
+		print('Output directory must differ from the input directory')
+		return 1
+	os.makedirs(out_dir, exist_ok=True)
+
+	# fail on a bad spec before any work is submitted
+	for name in names:
+		try:
+			parse_calib(calib_for(specs, name))
+		except (KeyError, ValueError) as e:
+			print(f'Invalid calibration for {name}: {e}')
+			return 1
+
+	# run1.mat and run1.clk would both be written to run1.<format>
+	dsts = {}
+	for name in names:
+		dst = os.path.join(out_dir, os.path.splitext(name)[0] + '.' + args.format)
+		key = os.path.normcase(dst)
+		if key in dsts:
+			print(f'{dsts[key][0]} and {name} would both be written to {dst}; use --pattern to pick one')
+			return 1
+		dsts[key] = (name, dst)
+
+	workers = args.workers or os.cpu_count() or 1
+	print(f'{len(names)} files, {workers} workers, output: {out_dir} (.{args.format})')
+	t0 = time.perf_counter()
+	total_points = 0
+	failed = 0
+	with ProcessPoolExecutor(max_workers=workers) as pool:
+		futures = {}
+		for name, dst in dsts.values():
+			src = os.path.join(args.input_dir, name)
+			futures[pool.submit(process_file, src, dst, args.format, calib_for(specs, name))] = name
+		for done, fut in enumerate(as_completed(futures), 1):
+			name = futures[fut]
+			try:
+				n = fut.result()
+			except Exception as e:
+				failed += 1
+				print(f'[{done}/{len(names)}] {name}: FAILED ({e})')
+				continue
+			total_points += n
+			elapsed = time.perf_counter() - t0
+			print(f'[{done}/{len(names)}] {name}: {n} points ({done / elapsed:.1f} files/s)')
+	elapsed = time.perf_counter() - t0
+	print(
+		f'Done: {len(names) - failed} files, {total_points} points in {elapsed:.2f} s '
+		f'({(len(names) - failed) / elapsed:.1f} files/s, {total_points / elapsed:.0f} points/s)'
+	)
+	return 1 if failed else 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
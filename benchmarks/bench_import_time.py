@@ -0,0 +1,88 @@
+"""
+パッケージの import 時間と、そのとき読み込まれる重い依存モジュールを測るベンチマーク
+
+    python benchmarks/bench_import_time.py [--runs 7] [--top 10]
+
+Each target is imported in a fresh interpreter (cold for this process, warm OS file
+cache), --runs times; the median wall time is reported. --top N additionally lists the
+N slowest modules of the first target from `python -X importtime`.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+TARGETS = [
+	'click_app',
+	'click_app.core',
+	'click_app.columns',
+	'click_app.video_source',
+	'click_app.click_gui',
+]
+HEAVY = ['tkinter', 'cv2', 'matplotlib', 'PIL', 'scipy']
+
+_PROBE = """
+import sys, time
+t0 = time.perf_counter()
+import {target}
+dt = time.perf_counter() - t0
+print(dt, ','.join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def measure(target, runs):
+	times = []
+	loaded = ''
+	for _ in range(runs):
+		out = subprocess.run(
+			[sys.executable, '-c', _PROBE.format(target=target, heavy=HEAVY)],
+			cwd=ROOT, capture_output=True, text=True, stdin=subprocess.DEVNULL,
+		)
+		if out.returncode != 0:
+			return None, out.stderr.strip().splitlines()[-1]
+		t, _, loaded = out.stdout.strip().partition(' ')
+		times.append(float(t))
+	return statistics.median(times), loaded or '-'
+
+
+def slowest_modules(target, top):
+	out = subprocess.run(
+		[sys.executable, '-X', 'importtime', '-c', f'import {target}'],
+		cwd=ROOT, capture_output=True, text=True, stdin=subprocess.DEVNULL,
+	)
+	rows = []
+	for line in out.stderr.splitlines():
+		if not line.startswith('import time:') or 'self [us]' in line:
+			continue
+		# "import time: <self us> | <cumulative us> | <indented module name>"
+		_, cumulative, name = line[len('import time:'):].split('|')
+		rows.append((int(cumulative), name.rstrip()))
+	rows.sort(reverse=True)
+	return rows[:top]
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--runs', type=int, default=7)
+	parser.add_argument('--top', type=int, default=0, help='show the N slowest modules of the first target')
+	parser.add_argument('targets', nargs='*', default=TARGETS)
+	args = parser.parse_args()
+
+	print(f'{"module":<26}{"median [ms]":>12}  heavy modules loaded')
+	for target in args.targets:
+		t, loaded = measure(target, args.runs)
+		if t is None:
+			print(f'{target:<26}{"failed":>12}  {loaded}')
+		else:
+			print(f'{target:<26}{t * 1e3:>12.1f}  {loaded}')
+	if args.top:
+		print(f'\nslowest modules (cumulative) for import {args.targets[0]}:')
+		for us, name in slowest_modules(args.targets[0], args.top):
+			print(f'{us / 1e3:>10.1f} ms  {name}')
+
+
+if __name__ == '__main__':
+	main()
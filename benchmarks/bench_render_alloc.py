@@ -0,0 +1,96 @@
+"""
+show_frame の表示パスについて、1フレームあたりのメモリ確保量と時間を比較するベンチマーク
+
+    python benchmarks/bench_render_alloc.py [--width 3840 --height 2160 --canvas 1000x700 --frames 50 --interp area]
+
+legacy: frame.copy() x2 -> cv2.resize -> cv2.cvtColor -> Image.fromarray -> ImageTk.PhotoImage
+buffer: DisplayBuffer (preallocated resize/RGB buffers, PhotoImage.paste)
+Allocation is measured with tracemalloc (NumPy/OpenCV arrays; Pillow's internal image
+memory is not traced). The PhotoImage step is included only when a display is available.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from click_app.display import DisplayBuffer  # noqa: E402
+
+
+INTERPOLATIONS = {'area': cv2.INTER_AREA, 'linear': cv2.INTER_LINEAR, 'nearest': cv2.INTER_NEAREST}
+
+
+def legacy_render(frame, size, interpolation, tk_root):
+	current = frame.copy()
+	disp = frame.copy()
+	resized = cv2.resize(disp, size, interpolation=interpolation)
+	rgb = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+	img = Image.fromarray(rgb)
+	if tk_root is not None:
+		return ImageTk.PhotoImage(img), current
+	return img, current
+
+
+def buffer_render(buf, frame, size, interpolation, tk_root):
+	rgb = buf.prepare(frame, size, interpolation)
+	if tk_root is not None:
+		return buf.to_photo()
+	return Image.frombuffer('RGB', size, rgb, 'raw', 'RGB', 0, 1)
+
+
+def measure(fn, frames):
+	fn()  # warm-up: allocates the reusable buffers once
+	tracemalloc.start()
+	peaks = []
+	t0 = time.perf_counter()
+	for _ in range(frames):
+		tracemalloc.reset_peak()
+		base = tracemalloc.get_traced_memory()[0]
+		out = fn()
+		peaks.append(tracemalloc.get_traced_memory()[1] - base)
+		del out
+	elapsed = time.perf_counter() - t0
+	tracemalloc.stop()
+	return float(np.mean(peaks)), elapsed / frames
+
+
+def main():
+	ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	ap.add_argument('--width', type=int, default=3840)
+	ap.add_argument('--height', type=int, default=2160)
+	ap.add_argument('--canvas', default='1000x700')
+	ap.add_argument('--frames', type=int, default=50)
+	ap.add_argument('--interp', choices=sorted(INTERPOLATIONS), default='area')
+	args = ap.parse_args()
+	interpolation = INTERPOLATIONS[args.interp]
+
+	cw, ch = (int(v) for v in args.canvas.split('x'))
+	scale = min(cw / args.width, ch / args.height)
+	size = (int(args.width * scale), int(args.height * scale))
+	frame = np.random.default_rng(0).integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+
+	tk_root = None
+	try:
+		import tkinter as tk
+		tk_root = tk.Tk()
+		tk_root.withdraw()
+	except Exception:
+		pass
+
+	buf = DisplayBuffer()
+	results = {
+		'legacy': measure(lambda: legacy_render(frame, size, interpolation, tk_root), args.frames),
+		'buffer': measure(lambda: buffer_render(buf, frame, size, interpolation, tk_root), args.frames),
+	}
+	print(f'source {args.width}x{args.height} -> display {size[0]}x{size[1]}, PhotoImage step: {"yes" if tk_root else "no (no display)"}')
+	for name, (alloc, sec) in results.items():
+		print(f'{name:>7}: {alloc / 1e6:8.2f} MB allocated/frame, {sec * 1e3:7.2f} ms/frame')
+
+
+if __name__ == '__main__':
+	main()
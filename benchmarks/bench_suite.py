@@ -0,0 +1,377 @@
+"""
+合成動画を使った再現可能なベンチマーク一式（ディスプレイ不要）。結果は JSON に保存し、前回の結果と比較できる
+
+    python benchmarks/bench_suite.py [--quick] [--out results.json] [--compare old.json] [--work DIR]
+
+Cases
+  read_seq / read_random  VideoSource.read latency per frame (cache off), with and without the seek index
+  render                  show_frame render path: a real ClickGUI on an off-screen Tk when a display is
+                          available, otherwise the same DisplayBuffer path without Tk (stub)
+  recalib                 ClickGUI.update_coords_real_from_raw on millions of points
+  io_mat / io_clk         save + load round trip of the results and the file size
+  analysis                FlatCoords per-frame stats, kinematics and summary on the flattened results
+
+Synthetic videos are generated once per (size, frames, keyframe interval) with cv2.VideoWriter into --work.
+Keyframe interval 1 is written as Motion JPEG (intra only); others ask the FFmpeg writer for the interval,
+which not every OpenCV build honours, so the interval actually found in the file is recorded as well.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+import cv2
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+import click_app  # noqa: E402
+from click_app.analysis import FlatCoords  # noqa: E402
+from click_app.calibration import Calibration  # noqa: E402
+from click_app.columns import load_click_columns, save_click_columns  # noqa: E402
+from click_app.core import load_click_mat, save_click_mat  # noqa: E402
+from click_app.display import DisplayBuffer  # noqa: E402
+from click_app.perf import PerfStats  # noqa: E402
+from click_app.point_store import PointStore  # noqa: E402
+from click_app.seek_index import SeekIndex, sidecar_path  # noqa: E402
+from click_app.video_source import VideoSource  # noqa: E402
+
+
+PRESETS = {
+	'quick': {
+		'sizes': [(320, 240), (1280, 720)],
+		'frames': [120],
+		'keyints': [1, 12, 60],
+		'reads': 60,
+		'renders': 60,
+		'points': [100_000, 1_000_000],
+	},
+	'full': {
+		'sizes': [(640, 360), (1920, 1080), (3840, 2160)],
+		'frames': [300, 3000],
+		'keyints': [1, 12, 60, 250],
+		'reads': 200,
+		'renders': 200,
+		'points': [1_000_000, 5_000_000],
+	},
+}
+CANVAS = (1000, 700)
+SEED = 0
+
+
+def synth_video(work, size, n_frames, keyint):
+	"""Deterministic test video (moving gradients + frame number); reused when it exists."""
+	w, h = size
+	ext = 'avi' if keyint == 1 else 'mp4'
+	path = os.path.join(work, f'synth_{w}x{h}_{n_frames}f_k{keyint}.{ext}')
+	if os.path.exists(path):
+		return path
+	tmp = path + '.part.' + ext
+	if keyint == 1:
+		writer = cv2.VideoWriter(tmp, cv2.VideoWriter_fourcc(*'MJPG'), 30, (w, h))
+	else:
+		writer = cv2.VideoWriter(tmp, cv2.CAP_FFMPEG, cv2.VideoWriter_fourcc(*'mp4v'), 30, (w, h), [cv2.VIDEOWRITER_PROP_KEY_INTERVAL, keyint])
+	if not writer.isOpened():
+		raise OSError(f'cannot write {path}')
+	yy, xx = np.mgrid[0:h, 0:w]
+	frame = np.empty((h, w, 3), np.uint8)
+	for i in range(n_frames):
+		frame[..., 0] = (xx + 2 * i) % 256
+		frame[..., 1] = (yy + i) % 256
+		frame[..., 2] = ((xx + yy) // 2 + 3 * i) % 256
+		cv2.putText(frame, str(i), (10, h // 4), cv2.FONT_HERSHEY_SIMPLEX, h / 240, (255, 255, 255), max(1, h // 120))
+		writer.write(frame)
+	writer.release()
+	os.replace(tmp, path)
+	return path
+
+
+def _stats(ms):
+	ms = np.asarray(ms, dtype=np.float64)
+	return {
+		'mean_ms': float(ms.mean()),
+		'p50_ms': float(np.percentile(ms, 50)),
+		'p95_ms': float(np.percentile(ms, 95)),
+		'max_ms': float(ms.max()),
+		'n': int(len(ms)),
+	}
+
+
+def bench_read(path, n_reads, use_index):
+	"""Per-frame VideoSource.read latency, sequential and random order, cache disabled."""
+	side = sidecar_path(path)
+	if use_index:
+		if not os.path.exists(side):
+			SeekIndex.build(path).save(path)
+	elif os.path.exists(side):
+		os.remove(side)
+	src = VideoSource(path, cache_mb=0, n_next=0, n_prev=0, build_index=False)
+	try:
+		n = src.frame_count
+		out = {}
+		rng = np.random.default_rng(SEED)
+		orders = {
+			'read_seq': range(min(n_reads, n)),
+			'read_random': rng.integers(0, n, min(n_reads, n)),
+		}
+		for name, order in orders.items():
+			ms = []
+			for i in order:
+				t0 = time.perf_counter()
+				frame = src.read(int(i))
+				ms.append((time.perf_counter() - t0) * 1e3)
+				if frame is None:
+					raise RuntimeError(f'{path}: frame {i} unreadable')
+			out[name] = _stats(ms)
+		if src.seek_index is not None:
+			gaps = np.diff(src.seek_index.keyframes)
+			out['keyint_actual'] = float(np.median(gaps)) if len(gaps) else float(n)
+		return out
+	finally:
+		src.close()
+
+
+def _has_display():
+	try:
+		import tkinter as tk
+		root = tk.Tk()
+		root.destroy()
+		return True
+	except Exception:
+		return False
+
+
+def bench_render(path, n_renders, display):
+	"""show_frame on cached frames (decode excluded), per-stage times from PerfStats."""
+	if display:
+		import tkinter as tk
+
+		class BenchGUI(click_app.ClickGUI):
+			# nothing written next to the synthetic videos or to ~/.click_app, no restore prompt
+			JOURNAL_ENABLED = False
+			EVENT_LOG_ENABLED = False
+			TIMELINE_THUMBS = False
+
+		had_index = os.path.exists(sidecar_path(path))
+		root = tk.Tk()
+		root.geometry(f'{CANVAS[0]}x{CANVAS[1] + 200}')
+		gui = BenchGUI(root, path)
+		root.update()
+		gui.decoder.cancel()
+		n = min(n_renders, gui.frame_count)
+		for i in range(n):
+			gui.source.read(i)
+		gui.perf.clear()
+		ms = []
+		for i in range(n):
+			t0 = time.perf_counter()
+			gui.show_frame(i)
+			root.update_idletasks()
+			ms.append((time.perf_counter() - t0) * 1e3)
+		stages = gui.perf.summary()
+		gui.on_close()
+		if not had_index and os.path.exists(sidecar_path(path)):
+			# built in the background by load_video; the read cases decide themselves whether one exists
+			os.remove(sidecar_path(path))
+		mode = 'tk'
+	else:
+		# same buffers and conversions as ClickGUI._fit_to_canvas, without the Tk PhotoImage
+		from PIL import Image
+		cap = cv2.VideoCapture(path)
+		frames = []
+		while len(frames) < n_renders:
+			ok, f = cap.read()
+			if not ok:
+				break
+			frames.append(f)
+		cap.release()
+		h, w = frames[0].shape[:2]
+		scale = min(CANVAS[0] / w, CANVAS[1] / h)
+		size = (int(w * scale), int(h * scale))
+		interp = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+		buf = DisplayBuffer()
+		buf.stats = PerfStats()
+		ms = []
+		for f in frames:
+			t0 = time.perf_counter()
+			rgb = buf.prepare(f, size, interp)
+			Image.frombuffer('RGB', size, rgb, 'raw', 'RGB', 0, 1)
+			ms.append((time.perf_counter() - t0) * 1e3)
+		stages = buf.stats.summary()
+		mode = 'stub'
+	out = _stats(ms)
+	out['mode'] = mode
+	out['stages_p50_ms'] = {k: v['p50'] for k, v in stages.items()}
+	return out
+
+
+def _synth_points(n_points, n_frames):
+	rng = np.random.default_rng(SEED)
+	frame_idx = np.sort(rng.integers(0, n_frames, n_points))
+	raw = rng.uniform(0, 1920, (n_points, 2))
+	return PointStore.from_flat(n_frames, frame_idx, raw)
+
+
+def bench_recalib(n_points):
+	"""ClickGUI.update_coords_real_from_raw (the real method) on a headless stand-in for self."""
+	from click_app.click_gui import ClickGUI
+	store = _synth_points(n_points, max(1000, n_points // 10))
+	calib = Calibration.fit([[0, 0], [1920, 0], [0, 1080], [1920, 1080]], [[0, 0], [10, 0.5], [0.2, 6], [10.3, 6.4]], 'homography')
+	fake = types.SimpleNamespace(points=store, _transform=calib, log=lambda msg: None)
+	ms = []
+	for _ in range(3):
+		t0 = time.perf_counter()
+		ClickGUI.update_coords_real_from_raw(fake)
+		ms.append((time.perf_counter() - t0) * 1e3)
+	out = _stats(ms)
+	out['points_per_s'] = n_points / (out['p50_ms'] / 1e3)
+	return out
+
+
+def bench_analysis(n_points):
+	"""Per-frame statistics, kinematics and summary histograms over the flattened real coords."""
+	store = _synth_points(n_points, max(1000, n_points // 10))
+	_, raw, _, offsets = store.flat()
+	coords = FlatCoords(raw, offsets, fps=1000)
+	ms = []
+	for _ in range(3):
+		t0 = time.perf_counter()
+		coords.frame_stats()
+		coords.kinematics()
+		coords.summary()
+		ms.append((time.perf_counter() - t0) * 1e3)
+	out = _stats(ms)
+	out['points_per_s'] = n_points / (out['p50_ms'] / 1e3)
+	return out
+
+
+def _size_of(path):
+	if os.path.isdir(path):
+		return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+	return os.path.getsize(path)
+
+
+def bench_io(n_points, work):
+	"""save + load round trip of .mat (ragged) and .clk (columnar) results."""
+	n_frames = max(1000, n_points // 10)
+	store = _synth_points(n_points, n_frames)
+	out = {}
+	path = os.path.join(work, 'bench_io.mat')
+	t0 = time.perf_counter()
+	save_click_mat(path, *store.to_ragged())
+	t1 = time.perf_counter()
+	data = load_click_mat(path)
+	t2 = time.perf_counter()
+	assert len(data['coords_raw']) == n_frames
+	out['io_mat'] = {'save_ms': (t1 - t0) * 1e3, 'load_ms': (t2 - t1) * 1e3, 'bytes': _size_of(path)}
+	os.remove(path)
+	path = os.path.join(work, 'bench_io.clk')
+	_, raw, real, offsets = store.flat()
+	t0 = time.perf_counter()
+	save_click_columns(path, raw, real, offsets=offsets)
+	t1 = time.perf_counter()
+	clk = load_click_columns(path)
+	clk.to_ragged()
+	t2 = time.perf_counter()
+	out['io_clk'] = {'save_ms': (t1 - t0) * 1e3, 'load_ms': (t2 - t1) * 1e3, 'bytes': _size_of(path)}
+	shutil.rmtree(path)
+	return out
+
+
+def _git_commit():
+	try:
+		return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True, stdin=subprocess.DEVNULL).stdout.strip() or None
+	except OSError:
+		return None
+
+
+def run(preset, work):
+	display = _has_display()
+	results = []
+
+	def record(case, params, metrics):
+		results.append({'case': case, 'params': params, 'metrics': metrics})
+		brief = ', '.join(f'{k}={v:.3g}' for k, v in metrics.items() if isinstance(v, float) and k.endswith(('p50_ms', 'save_ms', 'load_ms', 'per_s')))
+		print(f'{case:<12} {json.dumps(params):<60} {brief}')
+
+	for size in preset['sizes']:
+		for n_frames in preset['frames']:
+			for keyint in preset['keyints']:
+				path = synth_video(work, size, n_frames, keyint)
+				params = {'size': list(size), 'frames': n_frames, 'keyint': keyint}
+				for use_index in (False, True):
+					m = bench_read(path, preset['reads'], use_index)
+					for case in ('read_seq', 'read_random'):
+						p = dict(params, seek_index=use_index)
+						if 'keyint_actual' in m:
+							p['keyint_actual'] = m['keyint_actual']
+						record(case, p, m[case])
+			record('render', {'size': list(size), 'canvas': list(CANVAS)}, bench_render(synth_video(work, size, preset['frames'][0], preset['keyints'][0]), preset['renders'], display))
+	for n_points in preset['points']:
+		record('recalib', {'points': n_points}, bench_recalib(n_points))
+		record('analysis', {'points': n_points}, bench_analysis(n_points))
+		for case, m in bench_io(n_points, work).items():
+			record(case, {'points': n_points}, m)
+	return results
+
+
+def compare(results, old_path, threshold):
+	"""Print metrics that got slower by more than threshold (ratio) against an older result file."""
+	with open(old_path, 'r', encoding='utf-8') as f:
+		old = json.load(f)
+	key = lambda r: (r['case'], json.dumps({k: v for k, v in r['params'].items() if k != 'keyint_actual'}, sort_keys=True))
+	before = {key(r): r['metrics'] for r in old['results']}
+	regressions = 0
+	for r in results:
+		m0 = before.get(key(r))
+		if m0 is None:
+			continue
+		for name in ('p50_ms', 'save_ms', 'load_ms'):
+			if name in r['metrics'] and m0.get(name):
+				ratio = r['metrics'][name] / m0[name]
+				if ratio > 1 + threshold:
+					regressions += 1
+					print(f'REGRESSION {r["case"]} {key(r)[1]} {name}: {m0[name]:.3g} -> {r["metrics"][name]:.3g} ms (x{ratio:.2f})')
+	print(f'{regressions} regressions against {old_path} (threshold +{threshold:.0%})')
+	return regressions
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--quick', action='store_true', help='small preset (a minute or two)')
+	parser.add_argument('--out', default=None, help='result file (default: <work>/bench-<version>-<time>.json)')
+	parser.add_argument('--compare', default=None, help='older result file to check for regressions')
+	parser.add_argument('--threshold', type=float, default=0.2, help='slowdown ratio reported as a regression (default 0.2 = +20%%)')
+	parser.add_argument('--work', default=os.path.join(tempfile.gettempdir(), 'click_app_bench'), help='directory for the synthetic videos')
+	args = parser.parse_args()
+
+	name = 'quick' if args.quick else 'full'
+	os.makedirs(args.work, exist_ok=True)
+	started = time.strftime('%Y%m%d-%H%M%S')
+	results = run(PRESETS[name], args.work)
+	doc = {
+		'meta': {
+			'app_version': click_app.__version__,
+			'git_commit': _git_commit(),
+			'preset': name,
+			'started': started,
+			'machine': PerfStats.machine_info(),
+		},
+		'results': results,
+	}
+	out = args.out or os.path.join(args.work, f'bench-{click_app.__version__}-{started}.json')
+	os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+	with open(out, 'w', encoding='utf-8') as f:
+		json.dump(doc, f, indent=1)
+	print(f'Results written to {out}')
+	if args.compare:
+		sys.exit(1 if compare(results, args.compare, args.threshold) else 0)
+
+
+if __name__ == '__main__':
+	main()
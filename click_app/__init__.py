@@ -3,6 +3,26 @@ __version__ = '1.2.1'
 
 __all__ = []
 
-from .click_gui import *
-__all__ += getattr(__import__(__name__ + '.click_gui', fromlist=['__all__']), '__all__', [])
+from .core import *
+__all__ += getattr(__import__(__name__ + '.core', fromlist=['__all__']), '__all__', [])
 
+from .columns import *
+__all__ += getattr(__import__(__name__ + '.columns', fromlist=['__all__']), '__all__', [])
+
+# OpenCV and the GUI (tkinter) are imported on first use, so headless
+# scripts that only read results or apply calibrations never load them
+_LAZY = {
+	'VideoSource': '.video_source',
+	'open_source': '.video_source',
+	'ImageSequenceSource': '.image_sequence',
+	'ClickGUI': '.click_gui',
+	'run_gui': '.click_gui',
+}
+__all__ += list(_LAZY)
+
+
+def __getattr__(name):
+	if name in _LAZY:
+		import importlib
+		return getattr(importlib.import_module(_LAZY[name], __name__), name)
+	raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,202 @@
+"""
+保存したクリック結果の解析（軌跡・運動学）。フレームごとの Python ループを使わず、
+平坦化した座標 (N, 2) とフレームごとの開始位置 offsets (n_frames + 1,) に対する NumPy の集約だけで計算する
+"""
+import numpy as np
+
+
+__all__ = [
+	'FlatCoords',
+	'flatten_ragged',
+]
+
+
+def flatten_ragged(coords):
+	"""
+	Ragged per-frame (k, 2) arrays (coords_raw / coords_real of load_click_mat) ->
+	(xy (N, 2) float64 in frame order, offsets (n_frames + 1,) int64).
+	"""
+	if not (isinstance(coords, np.ndarray) and coords.dtype == object):
+		# a list of equally shaped arrays must not become one 3-D array
+		coords = np.fromiter(coords, dtype=object, count=len(coords))
+	coords = coords.ravel()
+	counts = np.frompyfunc(np.size, 1, 1)(coords).astype(np.int64) // 2 if len(coords) else np.zeros(0, np.int64)
+	offsets = np.zeros(len(coords) + 1, dtype=np.int64)
+	np.cumsum(counts, out=offsets[1:])
+	nonempty = coords[counts > 0]
+	if len(nonempty):
+		# empty frames may be stored as (0, 0); only non-empty ones are concatenated
+		xy = np.concatenate(nonempty.tolist(), axis=0).astype(np.float64, copy=False).reshape(-1, 2)
+	else:
+		xy = np.zeros((0, 2), dtype=np.float64)
+	return xy, offsets
+
+
+class FlatCoords:
+	"""
+	平坦化したクリック座標: xy[offsets[i]:offsets[i+1]] がフレーム i の点（クリック順）
+	フレームごとの統計、フレーム間の移動量、速度・加速度、ヒストグラムを配列演算でまとめて求める
+	Uncalibrated points (NaN real coords) give NaN in the statistics of their frames.
+	"""
+
+	def __init__(self, xy, offsets, fps=None):
+		self.xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+		self.offsets = np.asarray(offsets, dtype=np.int64)
+		if len(self.offsets) == 0 or self.offsets[0] != 0 or self.offsets[-1] != len(self.xy) or np.any(np.diff(self.offsets) < 0):
+			raise ValueError('offsets must start at 0, be non-decreasing and end at the number of points')
+		self.fps = fps  # frames per second, used when kinematics() is not given one
+
+	@classmethod
+	def from_ragged(cls, coords, fps=None):
+		return cls(*flatten_ragged(coords), fps=fps)
+
+	@classmethod
+	def from_file(cls, path, kind='real', fps=None):
+		"""Load kind ('real' or 'raw') coordinates from a .mat or .clk result."""
+		if kind not in ('real', 'raw'):
+			raise ValueError(f"kind must be 'real' or 'raw', not {kind!r}")
+		if path.lower().rstrip('/\\').endswith('.clk'):
+			from .columns import load_click_columns
+			return cls.from_columns(load_click_columns(path), kind, fps)
+		from .core import load_click_mat
+		return cls.from_ragged(load_click_mat(path)['coords_' + kind], fps)
+
+	@classmethod
+	def from_columns(cls, columns, kind='real', fps=None):
+		"""From a ClickColumns store (the columns are already flat)."""
+		xy = np.column_stack([columns.column('x_' + kind), columns.column('y_' + kind)])
+		return cls(xy, columns.offsets, fps)
+
+	@classmethod
+	def from_store(cls, store, kind='real', fps=None):
+		"""From a PointStore (e.g. the GUI's points)."""
+		_, raw, real, offsets = store.flat()
+		return cls(real if kind == 'real' else raw, offsets, fps)
+
+	def __len__(self):
+		return self.n_frames
+
+	@property
+	def n_frames(self):
+		return len(self.offsets) - 1
+
+	@property
+	def n_points(self):
+		return len(self.xy)
+
+	def counts(self):
+		"""Number of points on every frame."""
+		return np.diff(self.offsets)
+
+	def frame_idx(self):
+		"""Frame of every point, (N,)."""
+		return np.repeat(np.arange(self.n_frames), self.counts())
+
+	def _reduce(self, ufunc, values, fill=np.nan):
+		"""ufunc over each frame's rows of values; frames without points get fill."""
+		counts = self.counts()
+		out = np.full((self.n_frames,) + values.shape[1:], fill, dtype=np.float64)
+		nonempty = counts > 0
+		if np.any(nonempty):
+			# reduceat over the starts of non-empty frames only: empty frames own no rows in between
+			out[nonempty] = ufunc.reduceat(values, self.offsets[:-1][nonempty], axis=0)
+		return out
+
+	def frame_stats(self):
+		"""
+		Per-frame statistics, all (n_frames,) or (n_frames, 2), NaN on frames without points:
+		count, centroid, std (population, per axis), min, max (bounding box).
+		"""
+		counts = self.counts()
+		with np.errstate(invalid='ignore', divide='ignore'):
+			centroid = self._reduce(np.add, self.xy) / counts[:, None]
+			dev = self.xy - np.repeat(centroid, counts, axis=0)
+			std = np.sqrt(self._reduce(np.add, dev * dev) / counts[:, None])
+		return {
+			'count': counts,
+			'centroid': centroid,
+			'std': std,
+			'min': self._reduce(np.minimum, self.xy),
+			'max': self._reduce(np.maximum, self.xy),
+		}
+
+	def centroids(self):
+		"""(n_frames, 2) mean position per frame (NaN where there are no points)."""
+		with np.errstate(invalid='ignore', divide='ignore'):
+			return self._reduce(np.add, self.xy) / self.counts()[:, None]
+
+	def displacement(self):
+		"""
+		Centroid displacement between consecutive frames: (d (n_frames - 1, 2), distance (n_frames - 1,)).
+		d[i] is centroid[i + 1] - centroid[i]; NaN if either frame has no points.
+		"""
+		d = np.diff(self.centroids(), axis=0)
+		return d, np.hypot(d[:, 0], d[:, 1])
+
+	def point_displacements(self):
+		"""
+		Per-point displacement to the next frame, pairing points by click order where both frames
+		have the same number of points. Returns (frame (M,), k (M,), d (M, 2)): point k of frame
+		moves by d to point k of frame + 1.
+		"""
+		counts = self.counts()
+		same = np.zeros(self.n_frames, dtype=bool)
+		same[:-1] = (counts[:-1] == counts[1:]) & (counts[:-1] > 0)
+		frame = self.frame_idx()
+		rows = np.flatnonzero(same[frame])
+		frame = frame[rows]
+		# the partner of a row lies exactly one frame's worth of rows further on
+		d = self.xy[rows + counts[frame]] - self.xy[rows]
+		return frame, rows - self.offsets[frame], d
+
+	def kinematics(self, fps=None):
+		"""
+		Centroid trajectory with velocity and acceleration (central differences in time).
+		Returns {'t' (n_frames,) [s], 'position' (n_frames, 2), 'velocity' (n_frames, 2),
+		'speed' (n_frames,), 'acceleration' (n_frames, 2)}; units are the coordinates' per second.
+		NaN on frames without points and next to them (no interpolation across gaps).
+		"""
+		fps = fps or self.fps
+		if not fps:
+			raise ValueError('fps is required for velocities')
+		dt = 1.0 / fps
+		pos = self.centroids()
+		if self.n_frames >= 2:
+			# central differences skip the middle sample: a frame without points would get (p[i+1] - p[i-1]) / 2dt
+			empty = self.counts() == 0
+			vel = np.gradient(pos, dt, axis=0)
+			vel[empty] = np.nan
+			acc = np.gradient(vel, dt, axis=0)
+			acc[empty] = np.nan
+		else:
+			vel = np.full_like(pos, np.nan)
+			acc = np.full_like(pos, np.nan)
+		return {
+			't': np.arange(self.n_frames) * dt,
+			'position': pos,
+			'velocity': vel,
+			'speed': np.hypot(vel[:, 0], vel[:, 1]),
+			'acceleration': acc,
+		}
+
+	def summary(self, fps=None, bins=50):
+		"""
+		Totals and histograms (counts, edges) of the whole session: points per frame, centroid
+		step length, speed (if fps is known) and a 2-D histogram of all positions. NaNs are skipped.
+		"""
+		counts = self.counts()
+		_, step = self.displacement()
+		step = step[np.isfinite(step)]
+		finite = np.all(np.isfinite(self.xy), axis=1)
+		out = {
+			'n_frames': self.n_frames,
+			'n_points': self.n_points,
+			'frames_with_points': int(np.count_nonzero(counts)),
+			'points_per_frame': (np.bincount(counts), np.arange(counts.max() + 2) if len(counts) else np.zeros(1)),
+			'step': np.histogram(step, bins=bins),
+			'position': np.histogram2d(self.xy[finite, 0], self.xy[finite, 1], bins=bins),
+		}
+		if fps or self.fps:
+			speed = self.kinematics(fps)['speed']
+			out['speed'] = np.histogram(speed[np.isfinite(speed)], bins=bins)
+		return out
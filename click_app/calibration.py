@@ -0,0 +1,139 @@
+import numpy as np
+
+
+__all__ = [
+	'Calibration',
+	'CALIB_MODELS',
+]
+
+
+# model name -> minimum number of point pairs
+CALIB_MODELS = {
+	'scale': 2,       # per-axis scale + offset (no rotation), the original two-point mapping
+	'affine': 3,      # rotation / shear / anisotropic scale + offset
+	'homography': 4,  # planar perspective
+}
+
+
+class Calibration:
+	"""
+	画像座標 -> 実世界座標の変換
+	どのモデルも 3x3 の同次変換行列 matrix で表し、apply() で全点を一括変換する
+	fit() は N 点 (N >= モデルの最小点数) から最小二乗で推定し、各点の残差を持つ
+	"""
+
+	def __init__(self, model, matrix, residuals=None, warnings=()):
+		if model not in CALIB_MODELS:
+			raise ValueError(f'Unknown calibration model: {model}')
+		self.model = model
+		self.matrix = np.asarray(matrix, dtype=np.float64).reshape(3, 3)
+		self.residuals = np.zeros(0) if residuals is None else np.asarray(residuals, dtype=np.float64)
+		self.warnings = list(warnings)
+
+	@property
+	def rms(self):
+		"""Root-mean-square residual in real-world units (0 for exactly determined fits)."""
+		if len(self.residuals) == 0:
+			return 0.0
+		return float(np.sqrt(np.mean(self.residuals ** 2)))
+
+	def apply(self, pts):
+		"""Map (N, 2) image points to (N, 2) real-world points in one matrix operation."""
+		pts = np.asarray(pts, dtype=np.float64).reshape(-1, 2)
+		m = self.matrix
+		x = pts[:, 0]
+		y = pts[:, 1]
+		out = np.empty_like(pts)
+		if self.model == 'homography':
+			w = m[2, 0] * x + m[2, 1] * y + m[2, 2]
+			out[:, 0] = (m[0, 0] * x + m[0, 1] * y + m[0, 2]) / w
+			out[:, 1] = (m[1, 0] * x + m[1, 1] * y + m[1, 2]) / w
+		else:
+			out[:, 0] = m[0, 0] * x + m[0, 1] * y + m[0, 2]
+			out[:, 1] = m[1, 0] * x + m[1, 1] * y + m[1, 2]
+		return out
+
+	def to_dict(self):
+		return {'model': self.model, 'matrix': self.matrix.tolist()}
+
+	@classmethod
+	def from_dict(cls, d):
+		return cls(d['model'], d['matrix'])
+
+	@classmethod
+	def fit(cls, img_pts, real_pts, model='scale'):
+		"""Least-squares fit of model to corresponding (N, 2) image / real-world points."""
+		if model not in CALIB_MODELS:
+			raise ValueError(f'Unknown calibration model: {model}')
+		img = np.asarray(img_pts, dtype=np.float64).reshape(-1, 2)
+		real = np.asarray(real_pts, dtype=np.float64).reshape(-1, 2)
+		if len(img) != len(real):
+			raise ValueError('image and real point counts differ')
+		if len(img) < CALIB_MODELS[model]:
+			raise ValueError(f'{model} calibration needs at least {CALIB_MODELS[model]} points, got {len(img)}')
+		warnings = []
+		if model == 'scale':
+			matrix = cls._fit_scale(img, real, warnings)
+		elif model == 'affine':
+			matrix = cls._fit_affine(img, real)
+		else:
+			matrix = cls._fit_homography(img, real)
+		calib = cls(model, matrix, warnings=warnings)
+		calib.residuals = np.hypot(*(calib.apply(img) - real).T)
+		return calib
+
+	@staticmethod
+	def _fit_scale(img, real, warnings):
+		matrix = np.eye(3)
+		for axis, name in ((0, 'x'), (1, 'y')):
+			p = img[:, axis]
+			r = real[:, axis]
+			dp = p - p.mean()
+			denom = float(dp @ dp)
+			if denom == 0.0:
+				# like the original two-point mapping: X = r0 + (x - p0) on this axis
+				warnings.append(f'image points have identical {name}; using scale_{name}=1.0')
+				matrix[axis, 2] = r[0] - p[0]
+				continue
+			scale = float(dp @ (r - r.mean())) / denom
+			matrix[axis, axis] = scale
+			matrix[axis, 2] = r.mean() - scale * p.mean()
+		return matrix
+
+	@staticmethod
+	def _fit_affine(img, real):
+		a = np.column_stack([img, np.ones(len(img))])
+		coef, _, rank, _ = np.linalg.lstsq(a, real, rcond=None)
+		if rank < 3:
+			raise ValueError('affine calibration needs at least 3 non-collinear points')
+		matrix = np.eye(3)
+		matrix[:2, :] = coef.T
+		return matrix
+
+	@staticmethod
+	def _normalizer(pts):
+		"""Similarity transform moving pts to zero mean and mean distance sqrt(2)."""
+		c = pts.mean(axis=0)
+		d = np.mean(np.hypot(*(pts - c).T))
+		s = np.sqrt(2) / d if d > 0 else 1.0
+		return np.array([[s, 0, -s * c[0]], [0, s, -s * c[1]], [0, 0, 1]])
+
+	@classmethod
+	def _fit_homography(cls, img, real):
+		# normalized direct linear transform (least squares in algebraic error)
+		t_img = cls._normalizer(img)
+		t_real = cls._normalizer(real)
+		pi = np.column_stack([img, np.ones(len(img))]) @ t_img.T
+		pr = np.column_stack([real, np.ones(len(real))]) @ t_real.T
+		a = np.zeros((2 * len(img), 9))
+		a[0::2, 0:3] = pi
+		a[0::2, 6:9] = -pr[:, 0:1] * pi
+		a[1::2, 3:6] = pi
+		a[1::2, 6:9] = -pr[:, 1:2] * pi
+		_, sv, vt = np.linalg.svd(a)
+		# a unique solution needs an 8-dimensional row space
+		if sv[7] < 1e-10 * sv[0]:
+			raise ValueError('homography calibration points are degenerate (3 or more collinear)')
+		h = vt[-1].reshape(3, 3)
+		matrix = np.linalg.inv(t_real) @ h @ t_img
+		return matrix / matrix[2, 2]
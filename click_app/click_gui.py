@@ -1,79 +1,38 @@
 import os
-import math
+import queue
+import time
+from collections import deque
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
 import tkinter as tk
 from tkinter import filedialog, simpledialog, messagebox, colorchooser
-from PIL import Image, ImageTk
-from scipy.io import savemat
 
 from . import __version__
+from .core import load_click_mat, plot_clicks_on_frame, save_click_mat  # noqa: F401 (former home of the first two)
+from .video_source import open_source
+from .image_sequence import IMAGE_EXTS
+from .decode_worker import DecodeWorker
+from .display import DisplayBuffer
+from .proxy_store import ProxyStore
+from .point_store import PointStore
+from .calibration import Calibration, CALIB_MODELS
+from .journal import EditJournal
+from .tracking import PointTracker
+from .detection import DetectionJob
+from .export import ExportJob
+from .thumbnails import ThumbnailStrip
+from .perf import PerfStats
+from .columns import save_click_columns
+from .event_log import EventLog
 # Configuration constants (moved into ClickGUI as class attributes)
 
 
 __all__ = [
-    'load_click_mat',
-    'plot_clicks_on_frame',
 	'ClickGUI',
 	'run_gui',
 ]
 
 
-def load_click_mat(filepath):
-    """
-    click_gui.py で作成した.matファイルを読み込んで、
-    保存前と同じ形式のデータにする関数
-	
-	coords_raw[i] is np.ndarray of shape (n_points, 2) where n_points may vary across frames
-	same for coords_real
-    """
-    from scipy.io import loadmat
-    data = loadmat(filepath)
-    coords_raw = data.get('coords_raw', None)
-    coords_real = data.get('coords_real', None)
-    if coords_raw is None or coords_real is None:
-        raise ValueError('Invalid .mat file: missing coords_raw or coords_real')
-	
-
-
-    coords_raw = coords_raw[0]
-    coords_real = coords_real[0]    
-
-    out = {
-        'coords_raw': coords_raw,
-        'coords_real': coords_real
-    }
-    return out
-
-
-def plot_clicks_on_frame(coords, frame=0):
-	"""
-	指定されたフレームのクリック点を表示する関数
-	coords_raw: クリック点のリスト [[x1, y1], [x2, y2], ...]
-	"""
-	if frame < 0 or frame >= len(coords):
-		# raise ValueError('Invalid frame index')
-		print('Invalid frame index')
-		return
-
-	points = coords[frame]
-	if len(points) == 0:
-		print('No points to plot on this frame.')
-		return
-	
-	x_vals = points[:, 0]
-	y_vals = points[:, 1]
-
-	plt.figure()
-	plt.scatter(x_vals, y_vals, c='red', marker='o')
-	plt.title('Click Points on Frame')
-	plt.xlabel('X Coordinate')
-	plt.ylabel('Y Coordinate')
-	plt.grid()
-	plt.show()
-
-
 class ClickGUI:
 	# Configuration constants (colors, radii, mode names) as class attributes
 	MODE_NONE = 'none'
@@ -86,6 +45,87 @@ class ClickGUI:
 	CALIB_POINT_RADIUS = 4
 	DATA_POINT_RADIUS = 4
 	SHOW_CALIB_POINT = True
+	# calibration model ('scale', 'affine' or 'homography') and number of points to click
+	CALIB_MODEL = 'scale'
+	CALIB_POINTS = 2
+
+	# decoded-frame cache and read-ahead around the current frame
+	FRAME_CACHE_MB = 512
+	READAHEAD_NEXT = 8
+	READAHEAD_PREV = 4
+	# decoder backend: 'opencv', 'pyav' (needs PyAV) or 'auto' (a short background benchmark after opening picks the faster one)
+	DECODER_BACKEND = 'auto'
+	DECODER_THREADS = 0  # decoding threads per decoder (0: backend default)
+	DECODE_POLL_MS = 10
+	# resize handling: low-quality redraw at most every RESIZE_FAST_MS while dragging,
+	# high-quality redraw once no <Configure> arrived for RESIZE_SETTLE_MS
+	RESIZE_FAST_MS = 40
+	RESIZE_SETTLE_MS = 200
+
+	# low-resolution proxy: frames transcoded once into a memory-mapped store (applies on open)
+	PROXY_MODE = False
+	PROXY_MAX_SIDE = 960
+	PROXY_DIR = None  # None: <tempdir>/click_app_proxy
+
+	# edit journal next to the video (<video>.session/) for crash recovery
+	JOURNAL_ENABLED = True
+	JOURNAL_COMPACT_MS = 60000  # how often the .mat snapshot is rewritten in the background
+
+	# tracking assist: propagate the points of the current frame with Lucas-Kanade optical flow
+	TRACK_FRAMES = 30  # frames propagated per run
+	TRACK_POINT_COLOR = (0, 200, 255)  # provisional (not yet accepted) points, drawn hollow
+	TRACK_WIN_SIZE = 21
+	TRACK_MAX_LEVEL = 3
+	TRACK_FB_THRESHOLD = 1.0  # [px] forward-backward error above which a point counts as lost
+	TRACK_POLL_MS = 100
+
+	# automatic candidate detection over the whole video (process pool, one VideoCapture per worker)
+	DETECT_METHOD = 'blob'  # 'blob' (cv2.SimpleBlobDetector) or 'contour' (threshold + contour centroids)
+	DETECT_MIN_AREA = 10.0  # [px^2]
+	DETECT_MAX_AREA = 5000.0
+	DETECT_DARK = False  # True: dark markers on a bright background
+	DETECT_THRESHOLD = None  # gray level for 'contour' (None: Otsu)
+	DETECT_WORKERS = None  # None: CPU count
+	DETECT_CHUNK_FRAMES = 200
+
+	# annotated-video export (decode + draw on worker threads, written in order)
+	EXPORT_THREADS = None  # None: min(8, CPU count)
+	EXPORT_FRAME_NUMBER = True
+
+	# playback at a fixed rate (native fps x PLAY_SPEED); frames are dropped when decoding falls behind
+	PLAY_SPEED = 1.0
+	PLAY_SPEEDS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0)
+	PLAY_STATS_MS = 500  # how often the achieved fps / dropped frames label is refreshed
+
+	# timeline under the navigation buttons: thumbnail strip (cached on disk) + point density bar
+	TIMELINE_THUMBS = True  # False: density bar and scrubbing only, no thumbnails are generated
+	TIMELINE_THUMB_H = 40
+	TIMELINE_MAX_THUMBS = 200
+	TIMELINE_DENSITY_H = 10
+	TIMELINE_DIR = None  # None: <tempdir>/click_app_thumbs
+	DENSITY_COLOR = '#ff8000'
+
+	# image sequences (a directory of numbered PNG / TIFF / BMP ... frames, e.g. from a high-speed camera)
+	SEQUENCE_FPS = 30.0  # playback / export rate; the files carry no frame rate
+	SEQUENCE_WORKERS = None  # read-ahead decode threads (None: min(8, CPU count))
+
+	# zoom (mouse wheel, around the cursor) and pan (right/middle drag); only the visible part of the frame is resized
+	ZOOM_MAX = 32.0  # relative to fit-to-window
+	ZOOM_STEP = 1.25
+	ZOOM_NEAREST_ABOVE = 4.0  # screen px per video px above which pixels are drawn as blocks (no smoothing)
+
+	# per-stage timing (seek, decode, resize, ...); P toggles the HUD, Shift+P exports the session stats
+	PERF_WINDOW = 300  # samples per stage in the HUD's rolling percentiles
+	PERF_HUD_MS = 500
+
+	# log panel: lines are buffered and written to the Text widget in batches; older lines are trimmed
+	LOG_MAX_LINES = 2000
+	LOG_FLUSH_MS = 100
+	# structured event log (JSON Lines, one file per session) written in the background for auditing
+	EVENT_LOG_ENABLED = True
+	EVENT_LOG_DIR = None  # None: ~/.click_app/logs
+	EVENT_LOG_KEEP = 30  # session files kept (older ones are deleted when a new session starts; None: all)
+	EVENT_LOG_MAX_AGE_DAYS = 30  # None: no age limit
 	def __init__(self, master=None, video_path=None):
 		self.master = master or tk.Tk()
 		self.master.title(f'Click GUI ver{__version__}')
@@ -99,6 +139,15 @@ class ClickGUI:
 		scrollbar = tk.Scrollbar(log_frame, orient='vertical', command=self.log_text.yview)
 		scrollbar.pack(side='right', fill='y')
 		self.log_text.config(yscrollcommand=scrollbar.set)
+		self._log_pending = deque(maxlen=self.LOG_MAX_LINES)  # lines not yet in log_text
+		self._log_job = None
+		self.events = None
+		if self.EVENT_LOG_ENABLED:
+			try:
+				self.events = EventLog.for_session(self.EVENT_LOG_DIR, self.EVENT_LOG_KEEP, self.EVENT_LOG_MAX_AGE_DAYS)
+				self.events.write('start', version=__version__, pid=os.getpid())
+			except OSError as e:
+				self._log_pending.append(f'Event log disabled: {e}')
 
 		# toolbar
 		toolbar = tk.Frame(self.master)
@@ -112,6 +161,7 @@ class ClickGUI:
 		# left buttons
 		tk.Button(left, text='Open (Ctrl+O)', command=self.open_file).pack(side='left')
 		tk.Button(left, text='Save (Ctrl+S)', command=self.save).pack(side='left')
+		tk.Button(left, text='Export video (Ctrl+E)', command=self.export_video).pack(side='left')
 		tk.Button(left, text='Settings (E)', command=self.open_settings).pack(side='left')
 		tk.Button(left, text='Help (H)', command=self.help_dialog).pack(side='left')
 		# right (mode) buttons
@@ -129,11 +179,21 @@ class ClickGUI:
 		self.canvas.pack(fill=tk.BOTH, expand=True) # expand=Trueで広がるようにする
 		self.canvas.bind('<Button-1>', self.on_canvas_click)
 		self.canvas.bind('<Configure>', self.on_resize) # リサイズ検知
+		# zoom: wheel (Windows/macOS: <MouseWheel>, X11: buttons 4/5); pan: drag with the right or middle button
+		self.canvas.bind('<MouseWheel>', self._on_wheel)
+		self.canvas.bind('<Button-4>', self._on_wheel)
+		self.canvas.bind('<Button-5>', self._on_wheel)
+		for b in (2, 3):
+			self.canvas.bind(f'<ButtonPress-{b}>', self._pan_start)
+			self.canvas.bind(f'<B{b}-Motion>', self._pan_drag)
 
 		# 座標変換・リサイズ用の変数
 		self.scale = 1.0
 		self.offset_x = 0
 		self.offset_y = 0
+		self.zoom = 1.0  # 1: whole frame fits the canvas
+		self.view_center = None  # video coords shown at the canvas center (None: frame center)
+		self._pan_from = None
 		self.canvas_w = 640 # 初期値
 		self.canvas_h = 480 # 初期値
 
@@ -142,19 +202,50 @@ class ClickGUI:
 		nav_frame.pack()
 		tk.Button(nav_frame, text='Prev (←, Z)', command=self.prev_frame).pack(side='left')
 		tk.Button(nav_frame, text='Next (→, X)', command=self.next_frame).pack(side='left')
+		self.play_btn = tk.Button(nav_frame, text='Play (Space)', command=self.toggle_play)
+		self.play_btn.pack(side='left', padx=(6, 0))
 		# Jump button between Next and frame label
 		tk.Button(nav_frame, text='Jump (j)', command=self.jump_dialog).pack(side='left', padx=(6, 0))
+		# tracking assist
+		tk.Button(nav_frame, text='Track (T)', command=self.start_tracking).pack(side='left', padx=(6, 0))
+		tk.Button(nav_frame, text='Accept (Enter)', command=self.accept_provisional).pack(side='left')
+		tk.Button(nav_frame, text='Detect (B)', command=self.start_detection).pack(side='left', padx=(6, 0))
+		tk.Button(nav_frame, text='Accept all (Shift+Enter)', command=self.accept_all_provisional).pack(side='left')
 		# frame counter label to the right of Next/Jump
 		self.frame_label = tk.Label(nav_frame, text='Frame: 0/0')
 		self.frame_label.pack(side='left', padx=8)
+		# playback speed / achieved fps / dropped frames
+		self.play_label = tk.Label(nav_frame, text='')
+		self.play_label.pack(side='left')
+
+		# timeline: click / drag to scrub
+		self.timeline = tk.Canvas(self.master, height=self.TIMELINE_THUMB_H + self.TIMELINE_DENSITY_H, bg='#202020', highlightthickness=0)
+		self.timeline.pack(fill='x')
+		self.timeline.bind('<Configure>', self._timeline_resize)
+		self.timeline.bind('<Button-1>', self._timeline_scrub)
+		self.timeline.bind('<B1-Motion>', self._timeline_scrub)
 
 
 		# state
-		self.cap = None
+		self.source = None  # VideoSource / ImageSequenceSource: decoding, caching, read-ahead (and seek index)
+		self.proxy = None
+		self.video_size = None  # (w, h) of the original video; coords are in this space
 		self.frame_count = 0
 		self.current_frame_idx = 0
 		self.current_image = None
 		self.photo = None
+		self.display = DisplayBuffer()
+		# canvas items: background frame image and markers (screen coordinates)
+		self._bg_item = None
+		self.shown_frame_idx = None  # frame currently in current_image
+		self._resize_fast_job = None
+		self._resize_settle_job = None
+		self._calib_items = []
+		self._point_items = []
+		self._track_items = []
+		# frames not in the cache are decoded off the UI thread
+		self.decoder = DecodeWorker(self.read_frame)
+		self._decode_polling = False
 
 		# do not start in calibration mode immediately; enter calib after opening a video
 
@@ -163,9 +254,34 @@ class ClickGUI:
 		self.calib_real = []
 		self._transform = None
 
-		# coords per frame
-		self.coords_raw = []
-		self.coords_real = []
+		# clicked points of all frames (raw image coords and real-world coords)
+		self.points = PointStore()
+		self.journal = None
+		# tracking assist: frame -> (k, 2) provisional raw coords, filled by the PointTracker
+		self.provisional = {}
+		self.tracker = None
+		self.detect_job = None
+		self.export_job = None
+		# playback
+		self.playing = False
+		self._play_job = None
+		# timeline
+		self.thumbs = None
+		self._tl_w = 1
+		self._tl_display = DisplayBuffer()
+		self._tl_photo = None
+		self._tl_strip_item = None
+		self._tl_cursor = None
+		self._tl_bins = np.zeros(1, dtype=np.int64)
+		self._tl_bin_items = {}
+		# performance stats
+		self.perf = PerfStats(self.PERF_WINDOW)
+		self.display.stats = self.perf
+		self._show_t = None  # (idx, time show_frame was asked for it)
+		self._hud_items = None
+		self._hud_job = None
+		self.master.protocol('WM_DELETE_WINDOW', self.on_close)
+		self.master.after(self.JOURNAL_COMPACT_MS, self._compact_journal)
 
 		# keyboard bindings (shortcuts)
 		self.master.bind('<Right>', lambda e: self.next_frame())
@@ -176,9 +292,21 @@ class ClickGUI:
 		self.master.bind('<d>', lambda e: self.enter_del_mode())
 		self.master.bind('<c>', lambda e: self.enter_calib_mode())
 		self.master.bind('<j>', lambda e: self.jump_dialog())
+		self.master.bind('<Key-0>', lambda e: self.reset_zoom())
 		self.master.bind('<Control-s>', lambda e: self.save())
 		self.master.bind('<Control-o>', lambda e: self.open_file())
+		self.master.bind('<Control-e>', lambda e: self.export_video())
+		self.master.bind('<space>', lambda e: self.toggle_play())
+		self.master.bind('<bracketleft>', lambda e: self.change_play_speed(-1))
+		self.master.bind('<bracketright>', lambda e: self.change_play_speed(1))
+		self.master.bind('<p>', lambda e: self.toggle_hud())
+		self.master.bind('<P>', lambda e: self.export_perf())
 		self.master.bind('<e>', lambda e: self.open_settings())
+		self.master.bind('<t>', lambda e: self.start_tracking())
+		self.master.bind('<Return>', lambda e: self.accept_provisional())
+		self.master.bind('<Shift-Return>', lambda e: self.accept_all_provisional())
+		self.master.bind('<b>', lambda e: self.start_detection())
+		self.master.bind('<Escape>', lambda e: self.discard_provisional())
 
 		if video_path:
 			self.load_video(video_path)
@@ -186,22 +314,65 @@ class ClickGUI:
 	
 	def on_resize(self, event):
 		"""ウィンドウサイズが変わったときに呼ばれる"""
+		if (event.width, event.height) == (self.canvas_w, self.canvas_h):
+			return
 		self.canvas_w = event.width
 		self.canvas_h = event.height
-		# 動画が読み込み済みなら再描画してサイズを合わせる
-		if self.cap and self.current_image is not None:
-			self.show_frame(self.current_frame_idx, log_flag=False)
+		# 動画が読み込み済みなら表示中の画像をサイズに合わせる（デコードはしない）
+		if self.current_image is None:
+			return
+		# while dragging: throttled low-quality fits; once settled: one high-quality fit
+		if self._resize_fast_job is None:
+			self._resize_fast_job = self.master.after(self.RESIZE_FAST_MS, self._resize_fast)
+		if self._resize_settle_job is not None:
+			self.master.after_cancel(self._resize_settle_job)
+		self._resize_settle_job = self.master.after(self.RESIZE_SETTLE_MS, self._resize_settle)
+
+	def _resize_fast(self):
+		self._resize_fast_job = None
+		self._fit_to_canvas(cv2.INTER_NEAREST)
+
+	def _resize_settle(self):
+		self._resize_settle_job = None
+		self._fit_to_canvas()
 
 
 	def log(self, msg):
-		self.log_text.insert('end', msg + '\n')
+		"""Queue msg for the log panel (written every LOG_FLUSH_MS) and the event log."""
+		self._log_pending.append(msg)
+		if self.events is not None:
+			self.events.write('log', msg=msg)
+		if self._log_job is None:
+			self._log_job = self.master.after(self.LOG_FLUSH_MS, self._flush_log)
+
+	def _flush_log(self):
+		"""after() callback: one insert for all pending lines, then trim to LOG_MAX_LINES."""
+		self._log_job = None
+		if not self._log_pending:
+			return
+		lines = '\n'.join(self._log_pending) + '\n'
+		self._log_pending.clear()
+		self.log_text.insert('end', lines)
+		# the Text always ends with an empty line after the last newline
+		n = int(self.log_text.index('end-1c').split('.')[0]) - 1
+		if n > self.LOG_MAX_LINES:
+			self.log_text.delete('1.0', f'{n - self.LOG_MAX_LINES + 1}.0')
 		self.log_text.see('end')
 
+	def event(self, kind, **fields):
+		"""Structured record for the event log (not shown in the panel)."""
+		if self.events is not None:
+			self.events.write(kind, **fields)
+
 	def open_file(self):
 		# default to last used directory or current working directory
 		initial = getattr(self, 'last_dir', os.getcwd())
-		path = filedialog.askopenfilename(initialdir=initial, filetypes=[('Video', '*.mp4;*.avi;*.mov;*.mkv'), ('All', '*.*')])
+		images = ';'.join('*' + e for e in IMAGE_EXTS)
+		path = filedialog.askopenfilename(initialdir=initial, filetypes=[('Video', '*.mp4;*.avi;*.mov;*.mkv'), ('Image sequence (any frame)', images), ('All', '*.*')])
 		if path:
+			# picking one frame of an image sequence opens the whole directory
+			if os.path.splitext(path)[1].lower() in IMAGE_EXTS:
+				path = os.path.dirname(path)
 			self.last_dir = os.path.dirname(path) or initial
 			self.log(f'Opening {path}')
 			self.load_video(path)
@@ -210,105 +381,490 @@ class ClickGUI:
 		if not os.path.exists(path):
 			self.log('File not found')
 			return
-		if self.cap:
-			self.cap.release()
-		self.cap = cv2.VideoCapture(path)
-		if not self.cap.isOpened():
-			self.log('Unable to open video')
-			return
-		self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+		path = os.path.normpath(path)
+		self.pause()
+		if self.proxy:
+			self.proxy.close()
+			self.proxy = None
+		self._stop_tracking()
+		self._stop_detection()
+		self.provisional = {}
+		self._close_journal()
+		# wait for any in-flight decode before swapping the source
+		self.decoder.cancel()
+		with self.decoder.lock:
+			if self.source:
+				self.source.close()
+				self.source = None
+			try:
+				self.source = open_source(
+					path, self.FRAME_CACHE_MB, self.READAHEAD_NEXT, self.READAHEAD_PREV, self.SEQUENCE_FPS, self.SEQUENCE_WORKERS,
+					backend=self.DECODER_BACKEND, threads=self.DECODER_THREADS,
+				)
+			except (OSError, ValueError) as e:
+				self.log(f'Unable to open video: {e}')
+				return
+		# the old frame and its markers no longer match this video: ignore clicks until frame 0 is rendered
+		self.current_image = None
+		self.shown_frame_idx = None
+		for tag in ('point', 'track', 'preview'):
+			self.canvas.delete(tag)
+		self._point_items = []
+		self._track_items = []
+		self.video_size = self.source.size
+		self.frame_count = self.source.frame_count
+		self.event('open', path=os.path.abspath(path), frames=self.frame_count, size=self.video_size, fps=self.source.fps, decoder=getattr(self.source, 'backend', None))
+		self.source.stats = self.perf
+		if getattr(self.source, 'probing', False):
+			self.master.after(200, self._poll_probe, self.source)
+		if self.source.pending:
+			self.master.after(200, self._poll_seek_index, self.source)
+		elif self.source.seek_index is not None:
+			self.log('Seek index loaded from sidecar file')
 		self.current_frame_idx = 0
-		self.coords_raw = [[] for _ in range(self.frame_count)]
-		self.coords_real = [[] for _ in range(self.frame_count)]
+		self.zoom = 1.0
+		self.view_center = None
+		self.points = PointStore(self.frame_count)
 		self.log(f'Video loaded: {self.frame_count} frames')
+		self._start_thumbs(path)
+		if self.PROXY_MODE:
+			self.proxy = ProxyStore(path, self.frame_count, self.PROXY_MAX_SIDE, self.PROXY_DIR)
+			self.proxy.start()
+			if self.proxy.done:
+				self.log(f'Proxy loaded: {self.proxy.ready} frames at {self.proxy.size[0]}x{self.proxy.size[1]}')
+			else:
+				self.log('Building low-resolution proxy in the background')
+				self.master.after(1000, self._poll_proxy, self.proxy)
 		# enter calibration mode after loading a video so highlight is correct
 		self.enter_calib_mode()
+		if self.JOURNAL_ENABLED:
+			self._open_journal(path)
 		self.show_frame(self.current_frame_idx, log_flag=True)
 
+	def _start_thumbs(self, path):
+		"""(Re)build the timeline strip for the current frame_count (thumbnail positions depend on it)."""
+		if self.thumbs:
+			self.thumbs.close()
+			self.thumbs = None
+		if not self.TIMELINE_THUMBS:
+			self._timeline_redraw()
+			return
+		self.thumbs = ThumbnailStrip(path, self.frame_count, self.TIMELINE_MAX_THUMBS, self.TIMELINE_THUMB_H, self.TIMELINE_DIR)
+		self.thumbs.start()
+		self._timeline_redraw()
+		if not self.thumbs.done:
+			self.master.after(500, self._poll_thumbs, self.thumbs, 0)
+
+	def _open_journal(self, path):
+		"""Offer to restore the previous session of this video, then start journaling edits."""
+		journal = EditJournal(path, self.frame_count)
+		try:
+			# only edits newer than the last save are worth restoring
+			if journal.unsaved():
+				if messagebox.askyesno('Restore session', 'An unsaved annotation session exists for this video.\nRestore it?'):
+					state = journal.recover()
+					self.points = state.points
+					if state.calibration is not None:
+						self.calib_img = list(state.calib_img)
+						self.calib_real = list(state.calib_real)
+						self._transform = state.calibration
+						self.enter_add_mode()
+					self.log(f'Session restored: {len(self.points)} points ({state.n_edits} journaled edits replayed)')
+					self._timeline_draw_density()
+				else:
+					journal.discard()
+			elif journal.has_session():
+				journal.discard()
+			journal.open()
+		except (OSError, ValueError, KeyError) as e:
+			self.log(f'Edit journal disabled: {e}')
+			return
+		self.journal = journal
+
+	def _close_journal(self):
+		"""Flush the journal; the session is removed if it holds nothing unsaved."""
+		if self.journal is None:
+			return
+		try:
+			self.journal.close()
+			if self.journal.error is not None:
+				self.log(f'Error compacting journal: {self.journal.error}')
+			if not self.journal.unsaved():
+				self.journal.discard()
+		except OSError as e:
+			self.log(f'Error closing journal: {e}')
+		self.journal = None
+
+	def _compact_journal(self):
+		"""Periodic after() callback: snapshot the journaled state to .mat in the background."""
+		if self.journal is not None:
+			try:
+				if self.journal.compact(self.points, self._transform, self.calib_img, self.calib_real):
+					self.log('Session snapshot written in the background')
+			except OSError as e:
+				self.log(f'Error compacting journal: {e}')
+		self.master.after(self.JOURNAL_COMPACT_MS, self._compact_journal)
+
+	def on_close(self):
+		"""Window close: flush the journal and stop background threads."""
+		self.pause()
+		self._close_journal()
+		self._stop_tracking()
+		job = self.detect_job
+		self._stop_detection()
+		if job is not None:
+			# the worker processes are terminated on cancel; do not let the interpreter wait for them
+			job.join(timeout=2.0)
+		if self.thumbs:
+			self.thumbs.close()
+		if self.export_job is not None:
+			# an interrupted export would leave a broken file; finish it cleanly
+			self.export_job.cancel()
+			self.export_job.join()
+		if self.source:
+			self.source.close()
+		if self.proxy:
+			self.proxy.close()
+		self.decoder.close()
+		if self.events is not None:
+			self.events.write('close')
+			self.events.close()
+			self.events = None
+		self.master.destroy()
+
+	def _poll_seek_index(self, source):
+		"""after() callback: pick up the background seek index once it is ready."""
+		if source is not self.source:
+			return  # another video was opened meanwhile
+		if source.indexing:
+			self.master.after(200, self._poll_seek_index, source)
+			return
+		index = source.take_index()
+		if index is None:
+			self.log('Seek index unavailable; using backend seeking')
+			return
+		n = index.frame_count
+		if n != self.frame_count:
+			self.log(f'Frame count corrected by index: {self.frame_count} -> {n}')
+			# frames past the real end can never be shown, so they hold no points
+			self.points.set_n_frames(n)
+			self.frame_count = n
+			self._start_thumbs(source.path)
+			self.current_frame_idx = min(self.current_frame_idx, n - 1)
+			self.show_frame(self.current_frame_idx)
+		self.log(f'Seek index ready: {len(index.keyframes)} keyframes')
+
+	def _poll_probe(self, source):
+		"""after() callback: report which decoder the background probe picked."""
+		if source is not self.source:
+			return
+		if source.probing:
+			self.master.after(200, self._poll_probe, source)
+			return
+		if source.probe:
+			timings = ', '.join(
+				f'{name} {r["seq_ms"]:.1f}/{r["random_ms"]:.1f} ms' if 'score' in r else f'{name} failed'
+				for name, r in source.probe.items()
+			)
+			self.log(f'Decoder: {source.backend} (sequential/random per frame: {timings})')
+			self.event('decoder', backend=source.backend, probe=source.probe)
+
+	def _poll_proxy(self, proxy):
+		"""after() callback: report when the background proxy transcode finishes."""
+		if proxy is not self.proxy:
+			return
+		if not proxy.done:
+			self.master.after(1000, self._poll_proxy, proxy)
+			return
+		if proxy.error:
+			self.log(f'Proxy disabled: {proxy.error}')
+			proxy.close()
+			self.proxy = None
+		else:
+			self.log(f'Proxy ready: {proxy.ready} frames at {proxy.size[0]}x{proxy.size[1]}')
+
 	def read_frame(self, idx):
-		if not self.cap:
-			return None
-		self.cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
-		ret, frame = self.cap.read()
-		if not ret:
+		"""Return frame idx (read-only), from the cache when possible."""
+		if not self.source:
 			return None
-		return frame
+		return self.source.read(idx)
 
 	
-	def show_frame(self, idx, log_flag=False):
-		frame = self.read_frame(idx)
+	def show_frame(self, idx, log_flag=False, preview=False):
+		"""
+		Show frame idx. Cached frames are drawn immediately; others are decoded by
+		the DecodeWorker and drawn when ready, newer requests superseding older ones.
+		preview=True shows the nearest timeline thumbnail as a placeholder until the frame is decoded.
+		"""
+		if not self.source:
+			return
+		self._show_t = (idx, time.perf_counter())
+		self._timeline_move_cursor(idx)
+		# proxy frames are a plain slice of the memory-mapped store: no decoding at all
+		frame = self.proxy.get(idx) if self.proxy is not None else None
 		if frame is None:
-			self.log('Failed to read frame')
+			frame = self.source.cached(idx)
+			if frame is None:
+				self.decoder.request(idx, log_flag)
+				thumb = self.thumbs.get(self.thumbs.nearest(idx)) if preview and self.thumbs else None
+				if thumb is not None:
+					self._render_preview(idx, thumb)
+				if not self._decode_polling:
+					self._decode_polling = True
+					self.master.after(self.DECODE_POLL_MS, self._poll_decoded)
+				try:
+					self.frame_label.config(text=f'Frame: {idx+1}/{self.frame_count}')
+				except Exception:
+					pass
+				return
+		# the worker may hold a stale request; it must not overwrite this frame
+		self.decoder.cancel()
+		self._render_frame(idx, frame, log_flag)
+		self._record_latency(idx)
+
+	def _poll_decoded(self):
+		"""after() callback: render the newest decoded frame, dropping stale ones."""
+		# sampled before draining so a result finished meanwhile is still seen below
+		idle = not self.decoder.busy
+		newest = None
+		while True:
+			try:
+				item = self.decoder.results.get_nowait()
+			except queue.Empty:
+				break
+			if item[0] == self.decoder.latest:
+				newest = item
+		if newest is not None:
+			_, idx, frame, (log_flag,) = newest
+			if frame is None:
+				self.log('Failed to read frame')
+			else:
+				self._render_frame(idx, frame, log_flag)
+				self._record_latency(idx)
+		if idle or newest is not None:
+			self._decode_polling = False
+			return
+		self.master.after(self.DECODE_POLL_MS, self._poll_decoded)
+
+	def _record_latency(self, idx):
+		"""show_frame(idx) -> exact frame on screen, including decode and queueing."""
+		if self._show_t is not None and self._show_t[0] == idx:
+			self.perf.add('latency', time.perf_counter() - self._show_t[1])
+			self._show_t = None
+
+	def _render_preview(self, idx, thumb):
+		"""
+		Stand-in for frame idx while it decodes: a nearby low-resolution thumbnail, marked as such,
+		without markers. shown_frame_idx stays None so clicks are ignored until the real frame arrives.
+		"""
+		self.current_image = thumb
+		self.shown_frame_idx = None
+		self.canvas.delete('point')
+		self.canvas.delete('track')
+		self._point_items = []
+		self._track_items = []
+		self._fit_to_canvas()
+		self.canvas.delete('preview')
+		self.canvas.create_text(
+			self.canvas_w // 2, 8, anchor=tk.N, text=f'Preview - loading frame {idx+1}...',
+			fill='yellow', font=('TkDefaultFont', 10, 'bold'), tags=('preview',),
+		)
+
+	def _render_frame(self, idx, frame, log_flag=False):
+		# frames are read-only (shared with the cache); markers are canvas items, not pixels
+		self.current_image = frame
+		self.shown_frame_idx = idx
+		self.canvas.delete('preview')
+		if self.playing:
+			self._play_rendered += 1
+		self._fit_to_canvas(rebuild_overlays=True)
+
+		if log_flag:
+			self.log(f'Showing frame {idx+1}/{self.frame_count}')
+		try:
+			self.frame_label.config(text=f'Frame: {idx+1}/{self.frame_count}')
+		except Exception:
+			pass
+
+	def _fit_to_canvas(self, interpolation=None, rebuild_overlays=False):
+		"""
+		current_image をキャンバスに合わせて表示する（スケール・オフセット計算と resize のみ）
+		Zoomed in, only the visible part of the frame is cropped and resized, so the cost follows the canvas size.
+		interpolation=None picks INTER_AREA for shrinking, INTER_LINEAR for enlarging and
+		INTER_NEAREST beyond ZOOM_NEAREST_ABOVE.
+		"""
+		disp = self.current_image
+		if disp is None:
 			return
-		self.current_image = frame.copy()
-		disp = frame.copy()
-		
-		# draw overlays (元の解像度の画像に円を描く)
-		self.draw_overlays(disp, idx)
 		
 		# --- ここからリサイズ処理 ---
-		vid_h, vid_w = disp.shape[:2]
+		# スケールは元動画の解像度基準（プロキシ表示中もクリック座標は元解像度のまま）
+		vid_w, vid_h = self.video_size or (disp.shape[1], disp.shape[0])
 		
-		# キャンバスサイズに合わせてスケールを計算（アスペクト比維持）
+		# キャンバスサイズに合わせてスケールを計算（アスペクト比維持）し、ズーム倍率を掛ける
 		if self.canvas_w > 1 and self.canvas_h > 1:
 			scale_w = self.canvas_w / vid_w
 			scale_h = self.canvas_h / vid_h
-			self.scale = min(scale_w, scale_h)
+			self.scale = min(scale_w, scale_h) * self.zoom
 		else:
 			self.scale = 1.0
 
-		new_w = int(vid_w * self.scale)
-		new_h = int(vid_h * self.scale)
-		
-		# センタリング用のオフセット計算
-		self.offset_x = (self.canvas_w - new_w) // 2
-		self.offset_y = (self.canvas_h - new_h) // 2
+		# オフセット = 動画の (0, 0) の画面座標（収まる向きはセンタリング、はみ出す向きは表示中心から）
+		center = self.view_center or (vid_w / 2, vid_h / 2)
+		self.offset_x = self._view_offset(vid_w, self.canvas_w, center[0])
+		self.offset_y = self._view_offset(vid_h, self.canvas_h, center[1])
+		self.view_center = ((self.canvas_w / 2 - self.offset_x) / self.scale, (self.canvas_h / 2 - self.offset_y) / self.scale)
+
+		# 見えている範囲だけを切り出す（disp の画素単位。プロキシやサムネイルは元動画より小さい）
+		kx = self.scale * vid_w / disp.shape[1]  # screen px per disp px
+		ky = self.scale * vid_h / disp.shape[0]
+		c0 = max(0, int(-self.offset_x / kx))
+		c1 = min(disp.shape[1], int(np.ceil((self.canvas_w - self.offset_x) / kx)))
+		r0 = max(0, int(-self.offset_y / ky))
+		r1 = min(disp.shape[0], int(np.ceil((self.canvas_h - self.offset_y) / ky)))
+		# whole source pixels, placed exactly where the transform puts them
+		left = self.offset_x + int(c0 * kx)
+		top = self.offset_y + int(r0 * ky)
+		new_w = self.offset_x + int(c1 * kx) - left
+		new_h = self.offset_y + int(r1 * ky) - top
 
 		# 画像リサイズ
-		disp_resized = cv2.resize(disp, (new_w, new_h))
-		disp_rgb = cv2.cvtColor(disp_resized, cv2.COLOR_BGR2RGB)
-		
-		img = Image.fromarray(disp_rgb)
-		self.photo = ImageTk.PhotoImage(img)
+		if interpolation is None:
+			if self.scale >= self.ZOOM_NEAREST_ABOVE:
+				interpolation = cv2.INTER_NEAREST
+			else:
+				interpolation = cv2.INTER_AREA if kx < 1.0 else cv2.INTER_LINEAR
+		# (事前確保したバッファに resize・色変換し、同じサイズの PhotoImage には paste するだけ)
+		self.display.prepare(disp[r0:max(r1, r0 + 1), c0:max(c1, c0 + 1)], (max(1, new_w), max(1, new_h)), interpolation)
+		self.photo, created = self.display.to_photo()
 		
-		# Canvasに描画 (前の画像を消してから描画)
-		self.canvas.delete("all")
-		self.canvas.create_image(self.offset_x, self.offset_y, image=self.photo, anchor=tk.NW)
+		# Canvasに描画 (背景画像アイテムは使い回し、マーカーは描き直す)
+		t0 = time.perf_counter()
+		if self._bg_item is None:
+			self._bg_item = self.canvas.create_image(left, top, image=self.photo, anchor=tk.NW)
+		else:
+			self.canvas.coords(self._bg_item, left, top)
+			if created:
+				self.canvas.itemconfig(self._bg_item, image=self.photo)
+		t1 = time.perf_counter()
+		self.perf.add('canvas', t1 - t0)
+		if rebuild_overlays:
+			self._rebuild_overlay_items(self.shown_frame_idx)
+		else:
+			self._restyle_overlay_items()
+		self.perf.add('overlay_items', time.perf_counter() - t1)
 		# ---------------------------
 
-		if log_flag:
-			self.log(f'Showing frame {idx+1}/{self.frame_count}')
-		try:
-			self.frame_label.config(text=f'Frame: {idx+1}/{self.frame_count}')
-		except Exception:
-			pass
-
+	def _view_offset(self, length, canvas, center):
+		"""Screen position of video coordinate 0 along one axis: centered if it fits, else panned but kept on screen."""
+		size = int(length * self.scale)
+		if size <= canvas:
+			return (canvas - size) // 2
+		return int(round(min(0.0, max(canvas - size, canvas / 2 - center * self.scale))))
 
-	def draw_overlays(self, img, idx):
-		# draw calibration points in red (optional)
-		if getattr(self, 'SHOW_CALIB_POINT', True):
-			for (x, y) in self.calib_img:
-				cv2.circle(img, (int(x), int(y)), self.CALIB_POINT_RADIUS, self.CALIB_POINT_COLOR, -1)
-		# draw added points in green
-		pts = self.coords_raw[idx] if 0 <= idx < len(self.coords_raw) else []
-		for (x, y) in pts:
-			cv2.circle(img, (int(x), int(y)), self.DATA_POINT_RADIUS, self.DATA_POINT_COLOR, -1)
+	def zoom_at(self, factor, sx, sy):
+		"""Multiply the zoom by factor (clamped to 1..ZOOM_MAX), keeping the video point under screen (sx, sy) in place."""
+		if self.current_image is None:
+			return
+		zoom = min(self.ZOOM_MAX, max(1.0, self.zoom * factor))
+		if zoom == self.zoom:
+			return
+		x = (sx - self.offset_x) / self.scale
+		y = (sy - self.offset_y) / self.scale
+		scale = self.scale * zoom / self.zoom
+		self.zoom = zoom
+		self.view_center = (x + (self.canvas_w / 2 - sx) / scale, y + (self.canvas_h / 2 - sy) / scale)
+		self._fit_to_canvas()
+
+	def reset_zoom(self):
+		self.zoom = 1.0
+		self.view_center = None
+		self._fit_to_canvas()
+
+	def _on_wheel(self, event):
+		up = event.num == 4 or (event.num != 5 and event.delta > 0)
+		self.zoom_at(self.ZOOM_STEP if up else 1 / self.ZOOM_STEP, event.x, event.y)
+
+	def _pan_start(self, event):
+		self._pan_from = (event.x, event.y, self.view_center)
+
+	def _pan_drag(self, event):
+		if self._pan_from is None or self._pan_from[2] is None or self.zoom == 1.0:
+			return
+		x0, y0, (cx, cy) = self._pan_from
+		self.view_center = (cx - (event.x - x0) / self.scale, cy - (event.y - y0) / self.scale)
+		self._fit_to_canvas()
+
+
+	def _to_screen(self, x, y):
+		"""元の動画座標 -> 画面座標"""
+		return self.offset_x + x * self.scale, self.offset_y + y * self.scale
+
+	def _marker_coords(self, x, y, radius):
+		sx, sy = self._to_screen(x, y)
+		r = max(1.0, radius * self.scale)  # radius is in video pixels, like cv2.circle before
+		return (sx - r, sy - r, sx + r, sy + r)
+
+	def _create_marker(self, x, y, kind):
+		if kind == 'calib':
+			radius, color = self.CALIB_POINT_RADIUS, self.CALIB_POINT_COLOR
+			state = 'normal' if getattr(self, 'SHOW_CALIB_POINT', True) else 'hidden'
+		elif kind == 'track':
+			# provisional points: hollow, so they read as suggestions
+			outline = self._bgr_to_hex(self.TRACK_POINT_COLOR)
+			return self.canvas.create_oval(*self._marker_coords(x, y, self.DATA_POINT_RADIUS), fill='', outline=outline, width=2, tags=(kind,))
+		else:
+			radius, color, state = self.DATA_POINT_RADIUS, self.DATA_POINT_COLOR, 'normal'
+		fill = self._bgr_to_hex(color)
+		return self.canvas.create_oval(*self._marker_coords(x, y, radius), fill=fill, outline=fill, state=state, tags=(kind,))
+
+	def _rebuild_overlay_items(self, idx):
+		"""Recreate all marker items for frame idx (after a frame change or rescale)."""
+		self.canvas.delete('calib')
+		self.canvas.delete('point')
+		self.canvas.delete('track')
+		self._calib_items = [self._create_marker(x, y, 'calib') for (x, y) in self.calib_img]
+		self._point_items = [self._create_marker(x, y, 'point') for (x, y) in self.points.raw(idx)]
+		self._track_items = [self._create_marker(x, y, 'track') for (x, y) in self.provisional.get(idx, ())]
+
+	def _restyle_overlay_items(self):
+		"""Apply changed marker settings to the existing items."""
+		calib_fill = self._bgr_to_hex(self.CALIB_POINT_COLOR)
+		state = 'normal' if getattr(self, 'SHOW_CALIB_POINT', True) else 'hidden'
+		for item, (x, y) in zip(self._calib_items, self.calib_img):
+			self.canvas.coords(item, *self._marker_coords(x, y, self.CALIB_POINT_RADIUS))
+			self.canvas.itemconfig(item, fill=calib_fill, outline=calib_fill, state=state)
+		data_fill = self._bgr_to_hex(self.DATA_POINT_COLOR)
+		i = self.shown_frame_idx if self.shown_frame_idx is not None else self.current_frame_idx
+		for item, (x, y) in zip(self._point_items, self.points.raw(i)):
+			self.canvas.coords(item, *self._marker_coords(x, y, self.DATA_POINT_RADIUS))
+			self.canvas.itemconfig(item, fill=data_fill, outline=data_fill)
+		track_outline = self._bgr_to_hex(self.TRACK_POINT_COLOR)
+		for item, (x, y) in zip(self._track_items, self.provisional.get(i, ())):
+			self.canvas.coords(item, *self._marker_coords(x, y, self.DATA_POINT_RADIUS))
+			self.canvas.itemconfig(item, outline=track_outline)
 
 	def on_canvas_click(self, event):
 		if self.current_image is None:
 			return
+		# clicks go to the frame on screen, so stop there
+		self.pause()
+		if self.shown_frame_idx != self.current_frame_idx:
+			# the requested frame is still decoding: the markers on screen belong to another frame
+			self.log(f'Frame {self.current_frame_idx+1} is still loading; click ignored')
+			return
 		
 		# --- 座標変換処理 ---
 		screen_x = event.x
 		screen_y = event.y
 
 		# 画面座標 -> 元の動画座標への逆変換
-		# (画面座標 - 余白) / 倍率 = 元の座標
+		# (画面座標 - オフセット) / 倍率 = 元の座標（倍率・オフセットはズーム・パン込み）
 		original_x = (screen_x - self.offset_x) / self.scale
 		original_y = (screen_y - self.offset_y) / self.scale
 
 		# 動画の範囲内かチェック
-		img_h, img_w = self.current_image.shape[:2]
+		img_w, img_h = self.video_size or (self.current_image.shape[1], self.current_image.shape[0])
 		if not (0 <= original_x < img_w and 0 <= original_y < img_h):
 			# 黒帯部分をクリックした場合は無視
 			return
@@ -333,8 +889,8 @@ class ClickGUI:
 	def handle_calib_click(self, x, y):
 		self.calib_img.append((x, y))
 		self.log(f'Calibration image point recorded: {(x, y)}')
-		# immediately redraw so the red calibration marker is visible before the popup
-		self.show_frame(self.current_frame_idx)
+		# add the marker right away so it is visible before the popup
+		self._calib_items.append(self._create_marker(x, y, 'calib'))
 		# ask for real coordinate
 		ans = simpledialog.askstring('Real coord', 'Enter real-world coordinate as "x,y":')
 		if ans:
@@ -343,112 +899,309 @@ class ClickGUI:
 			except Exception:
 				messagebox.showerror('Error', 'Invalid format, use x,y')
 				self.calib_img.pop()
-				# update display to remove the temporary marker
-				self.show_frame(self.current_frame_idx)
+				# remove the temporary marker
+				self.canvas.delete(self._calib_items.pop())
 				return
 			self.calib_real.append((xr, yr))
 			self.log(f'Calibration real point recorded: {(xr, yr)}')
 		else:
 			self.calib_img.pop()
-			# update display to remove the temporary marker
-			self.show_frame(self.current_frame_idx)
+			# remove the temporary marker
+			self.canvas.delete(self._calib_items.pop())
 			return
-		if len(self.calib_img) >= 2:
-			self.compute_transform()
+		if len(self.calib_img) >= self._calib_points_needed():
+			if not self.compute_transform():
+				# start over with a fresh set of points
+				self.enter_calib_mode()
+				return
 			# enter add mode via the method so UI/highlight updates occur
 			self.enter_add_mode()
 			self.log('Calibration complete')
-			self.show_frame(self.current_frame_idx)
+
+	def _calib_points_needed(self):
+		return max(int(self.CALIB_POINTS), CALIB_MODELS[self.CALIB_MODEL])
 
 	def compute_transform(self):
-		p0 = np.array(self.calib_img[0], dtype=float)
-		p1 = np.array(self.calib_img[1], dtype=float)
-		r0 = np.array(self.calib_real[0], dtype=float)
-		r1 = np.array(self.calib_real[1], dtype=float)
-		# Use simple per-axis linear mapping (no rotation):
-		# X = r0_x + (x - p0_x) * scale_x
-		# Y = r0_y + (y - p0_y) * scale_y
-		dx_img = p1[0] - p0[0]
-		dy_img = p1[1] - p0[1]
-		dx_real = r1[0] - r0[0]
-		dy_real = r1[1] - r0[1]
-		if dx_img == 0:
-			self.log('Warning: image points have identical x; using scale_x=1.0')
-			scale_x = 1.0
-		else:
-			scale_x = dx_real / dx_img
-		if dy_img == 0:
-			self.log('Warning: image points have identical y; using scale_y=1.0')
-			scale_y = 1.0
-		else:
-			scale_y = dy_real / dy_img
-		self._transform = {'p0': p0, 'r0': r0, 'scale_x': scale_x, 'scale_y': scale_y}
-		self.log(f'Computed linear transform: scale_x={scale_x:.6f}, scale_y={scale_y:.6f}')
+		"""Fit CALIB_MODEL to the calibration points. Returns False if the fit failed."""
+		try:
+			calib = Calibration.fit(self.calib_img, self.calib_real, self.CALIB_MODEL)
+		except ValueError as e:
+			self.log(f'Calibration failed: {e}')
+			messagebox.showerror('Calibration failed', str(e))
+			return False
+		for w in calib.warnings:
+			self.log(f'Warning: {w}')
+		self._transform = calib
+		if self.journal:
+			self.journal.log_calibration(calib, self.calib_img, self.calib_real)
+		self.event('calibration', model=calib.model, img=self.calib_img, real=self.calib_real, rms=calib.rms)
+		res = ', '.join(f'{r:.4g}' for r in calib.residuals)
+		self.log(f'Computed {calib.model} transform from {len(self.calib_img)} points: rms residual={calib.rms:.6g} ({res})')
 		# recompute all real coordinates from raw coords using new transform
 		self.update_coords_real_from_raw()
-
+		return True
 
 	def update_coords_real_from_raw(self):
-		"""Recompute coords_real from coords_raw using current calibration transform.
-		If no transform is available, coords_real entries become [None, None].
+		"""Recompute real coords of all points from raw coords using current calibration transform.
+		If no transform is available, real coords become NaN.
 		"""
-		if not hasattr(self, 'coords_raw') or self.coords_raw is None:
-			return
-		# ensure coords_real has same frame count
-		if len(self.coords_real) != len(self.coords_raw):
-			self.coords_real = [[] for _ in range(len(self.coords_raw))]
-		for i, pts in enumerate(self.coords_raw):
-			new_real = []
-			for (x, y) in pts:
-				if self._transform is None:
-					new_real.append([None, None])
-				else:
-					real = self.pixel_to_real(x, y)
-					new_real.append(real if real is not None else [None, None])
-			self.coords_real[i] = new_real
+		raw, rows = self.points.all_raw()
+		if self._transform is None:
+			real = np.full_like(raw, np.nan)
+		else:
+			real = self._transform.apply(raw)
+		self.points.set_real_rows(rows, real)
 		self.log('Recomputed coords_real from coords_raw using current calibration')
 
 	def pixel_to_real(self, x, y):
 		if self._transform is None:
 			return None
-		p = np.array([x, y], dtype=float)
-		p_rel = p - self._transform['p0']
-		real_x = float(self._transform['r0'][0] + p_rel[0] * self._transform.get('scale_x', 1.0))
-		real_y = float(self._transform['r0'][1] + p_rel[1] * self._transform.get('scale_y', 1.0))
-		return [real_x, real_y]
+		return self._transform.apply([x, y])[0].tolist()
 
-	def handle_add_click(self, x, y):
-		i = self.current_frame_idx
-		self.coords_raw[i].append([x, y])
+	def handle_add_click(self, x, y, frame=None):
+		"""Add a point to frame (default: the frame on screen); its marker is drawn only if that frame is shown."""
+		t0 = time.perf_counter()
+		i = self.shown_frame_idx if frame is None else frame
+		if i is None:
+			return
+		# a click next to a provisional point is its correction: the click replaces it
+		self._drop_provisional_near(i, x, y)
 		real = self.pixel_to_real(x, y)
+		self.points.append(i, (x, y), real)
+		if self.journal:
+			self.journal.log_add(i, (x, y), real)
+		self._timeline_points_changed(i, 1)
+		self.event('add', frame=i, raw=(x, y), real=real)
 		if real is None:
 			self.log('Not calibrated: real coordinates unavailable')
-			self.coords_real[i].append([None, None])
 		else:
-			self.coords_real[i].append(real)
-			n_points = len(self.coords_raw[i])
+			n_points = self.points.count(i)
 			self.log(f'[{n_points}] Added point real coords: ({real[0]:.3f}, {real[1]:.3f})')
-		self.show_frame(i)
+		if i == self.shown_frame_idx:
+			self._point_items.append(self._create_marker(x, y, 'point'))
+		self.perf.add('click_add', time.perf_counter() - t0)
 
 	def handle_del_click(self, x, y):
-		i = self.current_frame_idx
-		pts = self.coords_raw[i]
-		if not pts:
+		"""Delete the point of the frame on screen nearest to (x, y)."""
+		t0 = time.perf_counter()
+		i = self.shown_frame_idx
+		if i is None:
+			return
+		idx = self.points.nearest(i, x, y)
+		if idx is None:
 			self.log('No points to delete on this frame')
 			return
-		dists = [math.hypot(px - x, py - y) for (px, py) in pts]
-		idx = int(np.argmin(dists))
-		removed_raw = pts.pop(idx)
-		removed_real = self.coords_real[i].pop(idx) if idx < len(self.coords_real[i]) else None
+		removed_raw, removed_real = self.points.delete(i, idx)
+		if self.journal:
+			self.journal.log_delete(i, idx)
+		self._timeline_points_changed(i, -1)
+		self.event('delete', frame=i, index=idx, raw=removed_raw, real=removed_real)
 		self.log(f'Deleted point raw {removed_raw}, real {removed_real}')
-		self.show_frame(i)
+		if idx < len(self._point_items):
+			self.canvas.delete(self._point_items.pop(idx))
+		self.perf.add('click_del', time.perf_counter() - t0)
+
+	# --- tracking assist ---
+
+	def start_tracking(self):
+		"""Propagate the points of the current frame to the next TRACK_FRAMES frames in the background."""
+		if not self.source or self.frame_count == 0:
+			return
+		i = self.current_frame_idx
+		pts = self.points.raw(i)
+		if len(pts) == 0:
+			# continue from provisional points, e.g. after the previous run ended here
+			pts = self.provisional.get(i, np.zeros((0, 2)))
+		if len(pts) == 0:
+			self.log('No points to track on this frame')
+			return
+		n = min(int(self.TRACK_FRAMES), self.frame_count - 1 - i)
+		if n <= 0:
+			self.log('No frames after this one to track into')
+			return
+		self._stop_tracking()
+		for f in range(i + 1, i + 1 + n):
+			self.provisional.pop(f, None)
+		self.tracker = PointTracker(
+			lambda f: self.source.read(f, background=True), i, pts, n,
+			self.TRACK_WIN_SIZE, self.TRACK_MAX_LEVEL, self.TRACK_FB_THRESHOLD,
+		)
+		self._track_copied = 0
+		self.tracker.start()
+		self.log(f'Tracking {len(pts)} points over frames {i+2}-{i+1+n} in the background')
+		self.master.after(self.TRACK_POLL_MS, self._poll_tracker, self.tracker)
+
+	def _stop_tracking(self):
+		if self.tracker is not None:
+			self.tracker.close()
+			self.tracker = None
+
+	def _poll_tracker(self, tracker):
+		"""after() callback: move newly tracked frames into self.provisional."""
+		if tracker is not self.tracker:
+			return
+		done = tracker.done  # sampled first so the frames finished meanwhile are copied below
+		shown = self.shown_frame_idx
+		redraw = False
+		for k in range(self._track_copied, tracker.ready):
+			f = tracker.start_frame + 1 + k
+			pts = tracker.tracks[k]
+			pts = pts[~np.isnan(pts).any(axis=1)]
+			if len(pts):
+				self.provisional[f] = pts
+			redraw |= f == shown
+		self._track_copied = tracker.ready
+		if redraw and self.current_image is not None:
+			self._rebuild_overlay_items(shown)
+		if not done:
+			self.master.after(self.TRACK_POLL_MS, self._poll_tracker, tracker)
+			return
+		self.tracker = None
+		if tracker.error:
+			self.log(f'Tracking failed: {tracker.error}')
+			return
+		last = tracker.get(tracker.start_frame + tracker.ready) if tracker.ready else tracker.pts
+		lost = int(np.isnan(last).any(axis=1).sum())
+		self.log(f'Tracking done: {tracker.ready} frames, {len(tracker.pts) - lost}/{len(tracker.pts)} points followed to the end (Enter: accept, Esc: discard)')
+
+	def _drop_provisional_near(self, i, x, y):
+		pts = self.provisional.get(i)
+		if pts is None:
+			return
+		# within a few marker radii (in video pixels), but at least ~10 screen pixels
+		snap = max(3 * self.DATA_POINT_RADIUS, 10 / self.scale)
+		d = np.hypot(pts[:, 0] - x, pts[:, 1] - y)
+		k = int(np.argmin(d))
+		if d[k] > snap:
+			return
+		pts = np.delete(pts, k, axis=0)
+		if len(pts):
+			self.provisional[i] = pts
+		else:
+			del self.provisional[i]
+		self._rebuild_overlay_items(i)
+
+	def accept_provisional(self):
+		"""Add the provisional points of the current frame as regular points and go to the next frame."""
+		i = self.current_frame_idx
+		pts = self.provisional.pop(i, None)
+		if pts is None:
+			self.log('No provisional points on this frame')
+			return
+		for x, y in pts:
+			self.handle_add_click(float(x), float(y), i)
+		if i == self.shown_frame_idx:
+			self.canvas.delete('track')
+			self._track_items = []
+		self.log(f'Accepted {len(pts)} tracked points on frame {i+1}')
+		self.next_frame()
+
+	def accept_all_provisional(self):
+		"""Add the provisional points of every frame as regular points."""
+		if not self.provisional:
+			self.log('No provisional points')
+			return
+		n = 0
+		for f in sorted(self.provisional):
+			pts = self.provisional[f]
+			real = self._transform.apply(pts) if self._transform is not None else [None] * len(pts)
+			for xy, r in zip(pts, real):
+				r = None if r is None else r.tolist()
+				self.points.append(f, xy, r)
+				if self.journal:
+					self.journal.log_add(f, xy, r)
+			n += len(pts)
+		self.event('accept', points=n, frames=len(self.provisional))
+		self.log(f'Accepted {n} provisional points on {len(self.provisional)} frames')
+		self.provisional = {}
+		self._timeline_draw_density()
+		if self.shown_frame_idx is not None:
+			self._rebuild_overlay_items(self.shown_frame_idx)
+
+	# --- automatic detection ---
+
+	def start_detection(self):
+		"""Detect candidate points on all frames in a process pool; they become provisional points."""
+		if not self.source or self.frame_count == 0:
+			return
+		if self.detect_job is not None:
+			self.log('Detection is already running')
+			return
+		params = {
+			'min_area': self.DETECT_MIN_AREA,
+			'max_area': self.DETECT_MAX_AREA,
+			'dark': self.DETECT_DARK,
+			'threshold': self.DETECT_THRESHOLD,
+		}
+		self.detect_job = DetectionJob(
+			self.source.path, self.frame_count, self.DETECT_METHOD, params,
+			self.DETECT_WORKERS, self.DETECT_CHUNK_FRAMES,
+		)
+		self._detect_logged = 0
+		self.detect_job.start()
+		self.log(f'Detecting candidate points ({self.DETECT_METHOD}) on {self.frame_count} frames in the background')
+		self.master.after(500, self._poll_detection, self.detect_job)
+
+	def _stop_detection(self):
+		if self.detect_job is not None:
+			self.detect_job.cancel()
+			self.detect_job = None
+
+	def _poll_detection(self, job):
+		"""after() callback: report progress and turn the finished result into provisional points."""
+		if job is not self.detect_job:
+			return
+		if not job.done:
+			pct = 100 * job.progress // max(1, job.n_frames)
+			if pct >= self._detect_logged + 10:
+				self._detect_logged = pct - pct % 10
+				self.log(f'Detection: {pct}%')
+			self.master.after(500, self._poll_detection, job)
+			return
+		self.detect_job = None
+		if job.error or job.result is None:
+			self.log(f'Detection failed: {job.error}')
+			return
+		# candidates on top of an existing point are not suggested again
+		snap = 3 * self.DATA_POINT_RADIUS
+		n = n_frames = 0
+		for f, pts in enumerate(job.result):
+			if len(pts) == 0 or f >= self.frame_count:
+				continue
+			existing = self.points.raw(f)
+			if len(existing):
+				d = np.hypot(pts[:, None, 0] - existing[None, :, 0], pts[:, None, 1] - existing[None, :, 1])
+				pts = pts[d.min(axis=1) > snap]
+			if len(pts):
+				self.provisional[f] = pts
+				n += len(pts)
+				n_frames += 1
+		if self.shown_frame_idx is not None:
+			self._rebuild_overlay_items(self.shown_frame_idx)
+		self.log(f'Detection done: {n} candidates on {n_frames} frames (Enter: accept frame, Shift+Enter: accept all, Esc: discard)')
+
+	def discard_provisional(self):
+		"""Stop tracking / detection and drop all provisional points."""
+		if self.tracker is None and self.detect_job is None and not self.provisional:
+			return
+		self._stop_tracking()
+		self._stop_detection()
+		n = sum(len(p) for p in self.provisional.values())
+		self.provisional = {}
+		self.canvas.delete('track')
+		self._track_items = []
+		self.log(f'Discarded {n} provisional points')
 
 	def enter_calib_mode(self):
 		self.mode = self.MODE_CALIB
 		self.calib_img = []
 		self.calib_real = []
+		if self._transform is not None and self.journal:
+			self.journal.log_calibration(None)
 		self._transform = None
-		self.log('Entered calibration mode: click two image points and enter real coords')
+		self.canvas.delete('calib')
+		self._calib_items = []
+		self.log(f'Entered calibration mode ({self.CALIB_MODEL}): click {self._calib_points_needed()} image points and enter real coords')
 		self._update_mode_highlight()
 
 	def enter_add_mode(self):
@@ -497,17 +1250,270 @@ class ClickGUI:
 	def prev_frame(self):
 		if self.frame_count == 0:
 			return
+		self.pause()
 		self.current_frame_idx = max(0, self.current_frame_idx - 1)
 		self.show_frame(self.current_frame_idx, log_flag=True)
 
 	def next_frame(self):
 		if self.frame_count == 0:
 			return
+		self.pause()
 		self.current_frame_idx = min(self.frame_count - 1, self.current_frame_idx + 1)
 		self.show_frame(self.current_frame_idx, log_flag=True)
 
+	# --- playback ---
+
+	def toggle_play(self):
+		if self.playing:
+			self.pause()
+		else:
+			self.play()
+
+	def _play_rate(self):
+		return self.source.fps * self.PLAY_SPEED
+
+	def play(self):
+		"""Play from the current frame at native fps x PLAY_SPEED."""
+		if self.playing or not self.source or self.frame_count == 0:
+			return
+		if self.current_frame_idx >= self.frame_count - 1:
+			self.current_frame_idx = 0
+		self.playing = True
+		self._play_rendered = 0
+		self._play_dropped = 0
+		self._play_anchor(time.perf_counter())
+		self._play_start = self._play_t0
+		self._play_stats_t = self._play_t0
+		self.play_btn.config(text='Pause (Space)')
+		self._play_tick()
+
+	def _play_anchor(self, now):
+		# the frame due at time t is f0 + (t - t0) * rate
+		self._play_t0 = now
+		self._play_f0 = self.current_frame_idx
+		self._play_last = self.current_frame_idx
+
+	def pause(self):
+		if not self.playing:
+			return
+		self.playing = False
+		if self._play_job is not None:
+			self.master.after_cancel(self._play_job)
+			self._play_job = None
+		self.play_btn.config(text='Play (Space)')
+		self._update_play_label(time.perf_counter())
+		self.log(f'Paused at frame {self.current_frame_idx+1}/{self.frame_count} ({self.play_label.cget("text")})')
+
+	def change_play_speed(self, step):
+		speeds = self.PLAY_SPEEDS
+		i = min(range(len(speeds)), key=lambda k: abs(speeds[k] - self.PLAY_SPEED))
+		self.PLAY_SPEED = speeds[max(0, min(len(speeds) - 1, i + step))]
+		if self.playing:
+			self._play_anchor(time.perf_counter())
+		self.play_label.config(text=f'x{self.PLAY_SPEED:g}')
+		self.log(f'Playback speed: x{self.PLAY_SPEED:g}')
+
+	def _play_tick(self):
+		"""after() timer: show the frame due now; skip frames while the previous one is still decoding."""
+		self._play_job = None
+		if not self.playing:
+			return
+		now = time.perf_counter()
+		rate = self._play_rate()
+		target = min(self._play_f0 + int((now - self._play_t0) * rate), self.frame_count - 1)
+		if target > self._play_last and not self.decoder.busy:
+			self._play_dropped += target - self._play_last - 1
+			self._play_last = target
+			self.current_frame_idx = target
+			self.show_frame(target)
+		if now - self._play_stats_t >= self.PLAY_STATS_MS / 1000:
+			self._play_stats_t = now
+			self._update_play_label(now)
+		if self._play_last >= self.frame_count - 1 and not self.decoder.busy:
+			self.pause()
+			return
+		# tick at twice the frame rate so a frame is never shown late by more than half a period
+		self._play_job = self.master.after(max(1, int(500 / rate)), self._play_tick)
+
+	def _update_play_label(self, now):
+		elapsed = max(1e-6, now - self._play_start)
+		self.play_label.config(text=f'x{self.PLAY_SPEED:g}  {self._play_rendered / elapsed:.1f} fps  dropped {self._play_dropped}')
+
+	# --- timeline ---
+
+	def _timeline_x(self, frame):
+		return (frame + 0.5) * self._tl_w / max(1, self.frame_count)
+
+	def _timeline_resize(self, event):
+		if event.width != self._tl_w:
+			self._tl_w = max(1, event.width)
+			self._timeline_redraw()
+
+	def _timeline_redraw(self):
+		self._timeline_draw_strip()
+		self._timeline_draw_density()
+		self._timeline_move_cursor(self.current_frame_idx)
+
+	def _timeline_draw_strip(self):
+		"""Tile the thumbnails nearest to each slot across the timeline width."""
+		if self.thumbs is None or self.thumbs.ready == 0 or self.frame_count == 0:
+			return
+		w, th = self._tl_w, self.TIMELINE_THUMB_H
+		tw = self.thumbs.get(0).shape[1]
+		strip = np.zeros((th, -(-w // tw) * tw, 3), dtype=np.uint8)
+		for s in range(strip.shape[1] // tw):
+			frame = int((s + 0.5) * tw * self.frame_count / w)
+			thumb = self.thumbs.get(self.thumbs.nearest(min(frame, self.frame_count - 1)))
+			if thumb is not None:
+				strip[:, s * tw:(s + 1) * tw] = thumb
+		self._tl_display.prepare(strip[:, :w], (w, th), cv2.INTER_NEAREST)
+		self._tl_photo, created = self._tl_display.to_photo()
+		if self._tl_strip_item is None:
+			self._tl_strip_item = self.timeline.create_image(0, 0, image=self._tl_photo, anchor=tk.NW)
+			self.timeline.tag_lower(self._tl_strip_item)
+		elif created:
+			self.timeline.itemconfig(self._tl_strip_item, image=self._tl_photo)
+
+	def _timeline_bin(self, frame):
+		return min(self._tl_w - 1, frame * self._tl_w // max(1, self.frame_count))
+
+	def _timeline_draw_density(self):
+		"""Rebuild the point-count bar: one rectangle per timeline pixel column with points."""
+		self.timeline.delete('density')
+		self._tl_bin_items = {}
+		n = self.frame_count
+		if n == 0:
+			self._tl_bins = np.zeros(self._tl_w, dtype=np.int64)
+			return
+		_, offsets = self.points.csr()
+		counts = np.diff(offsets)
+		bins = np.arange(n) * self._tl_w // n
+		self._tl_bins = np.bincount(bins, weights=counts, minlength=self._tl_w).astype(np.int64)
+		for b in np.flatnonzero(self._tl_bins):
+			self._timeline_draw_bin(int(b))
+
+	def _timeline_draw_bin(self, b):
+		# height relative to the busiest column (at least a third, so single points stay visible)
+		y1 = self.TIMELINE_THUMB_H + self.TIMELINE_DENSITY_H
+		top = self.TIMELINE_THUMB_H + self.TIMELINE_DENSITY_H * (1 - max(1 / 3, self._tl_bins[b] / max(1, self._tl_bins.max())))
+		item = self._tl_bin_items.get(b)
+		if self._tl_bins[b] <= 0:
+			if item is not None:
+				self.timeline.delete(self._tl_bin_items.pop(b))
+			return
+		if item is None:
+			self._tl_bin_items[b] = self.timeline.create_rectangle(b, top, b + 1, y1, fill=self.DENSITY_COLOR, outline='', tags=('density',))
+		else:
+			self.timeline.coords(item, b, top, b + 1, y1)
+
+	def _timeline_points_changed(self, frame, delta):
+		"""Incremental density update after adding (+1) or deleting (-1) a point on frame."""
+		if len(self._tl_bins) != self._tl_w:
+			self._timeline_draw_density()
+			return
+		b = self._timeline_bin(frame)
+		old_max = self._tl_bins.max()
+		self._tl_bins[b] += delta
+		if self._tl_bins.max() != old_max:
+			# the scale changed: every column's height changes
+			self._timeline_draw_density()
+		else:
+			self._timeline_draw_bin(b)
+
+	def _timeline_move_cursor(self, idx):
+		x = self._timeline_x(idx)
+		h = self.TIMELINE_THUMB_H + self.TIMELINE_DENSITY_H
+		if self._tl_cursor is None:
+			self._tl_cursor = self.timeline.create_line(x, 0, x, h, fill='red', width=2)
+		else:
+			self.timeline.coords(self._tl_cursor, x, 0, x, h)
+			self.timeline.tag_raise(self._tl_cursor)
+
+	def _timeline_scrub(self, event):
+		"""Click / drag on the timeline: thumbnail right away, the exact frame once decoded."""
+		if self.frame_count == 0:
+			return
+		idx = int(min(max(event.x, 0), self._tl_w - 1) * self.frame_count / self._tl_w)
+		idx = min(idx, self.frame_count - 1)
+		if idx == self.current_frame_idx:
+			return
+		self.pause()
+		self.current_frame_idx = idx
+		self.show_frame(idx, preview=True)
+
+	def _poll_thumbs(self, thumbs, shown):
+		"""after() callback: redraw the strip as thumbnails are generated."""
+		if thumbs is not self.thumbs:
+			return
+		done = thumbs.done  # sampled first so the last thumbnails are drawn below
+		ready = thumbs.ready
+		if ready != shown:
+			self._timeline_draw_strip()
+		if thumbs.error:
+			self.log(f'Timeline thumbnails unavailable: {thumbs.error}')
+		elif not done:
+			self.master.after(500, self._poll_thumbs, thumbs, ready)
+
+	# --- performance HUD ---
+
+	def toggle_hud(self):
+		if self._hud_items is not None:
+			if self._hud_job is not None:
+				self.master.after_cancel(self._hud_job)
+				self._hud_job = None
+			self.canvas.delete('hud')
+			self._hud_items = None
+			return
+		bg = self.canvas.create_rectangle(0, 0, 0, 0, fill='black', outline='', stipple='gray50', tags=('hud',))
+		text = self.canvas.create_text(8, 8, anchor=tk.NW, fill='#00ff00', font=('Courier', 9), tags=('hud',))
+		self._hud_items = (bg, text)
+		self._update_hud()
+
+	def _update_hud(self):
+		"""after() loop while the HUD is visible: rolling p50 / p95 / p99 per stage."""
+		self._hud_job = None
+		if self._hud_items is None:
+			return
+		bg, text = self._hud_items
+		self.canvas.itemconfig(text, text=self.perf.hud_text())
+		bbox = self.canvas.bbox(text)
+		if bbox:
+			self.canvas.coords(bg, bbox[0] - 4, bbox[1] - 4, bbox[2] + 4, bbox[3] + 4)
+		self.canvas.tag_raise('hud')
+		self._hud_job = self.master.after(self.PERF_HUD_MS, self._update_hud)
+
+	def export_perf(self):
+		"""Save this session's stage timings (CSV: all samples, JSON: summary + samples)."""
+		initial = getattr(self, 'last_dir', os.getcwd())
+		path = filedialog.asksaveasfilename(initialdir=initial, defaultextension='.json', filetypes=[('JSON', '*.json'), ('CSV', '*.csv')])
+		if not path:
+			return
+		meta = {
+			'app_version': __version__,
+			'canvas': [self.canvas_w, self.canvas_h],
+			'proxy': self.proxy is not None,
+			'frame_cache_mb': self.FRAME_CACHE_MB,
+		}
+		if self.source:
+			meta.update({
+				'video': os.path.abspath(self.source.path),
+				'codec': self.source.codec,
+				'size': list(self.source.size or ()),
+				'fps': self.source.fps,
+				'frames': self.frame_count,
+				'seek_index': self.source.seek_index is not None,
+				'decoder': getattr(self.source, 'backend', None),
+			})
+		try:
+			self.perf.save(path, meta)
+		except OSError as e:
+			self.log(f'Error saving stats: {e}')
+			return
+		self.log(f'Saved performance stats to {path}')
+
 	def jump_dialog(self):
 		"""Ask user for a frame number and jump to it if valid."""
+		self.pause()
 		if self.frame_count == 0:
 			messagebox.showwarning('No video', 'No video loaded to jump within')
 			return
@@ -529,27 +1535,100 @@ class ClickGUI:
 	def save(self):
 		# default to last used directory or current working directory
 		initial = getattr(self, 'last_dir', os.getcwd())
-		path = filedialog.asksaveasfilename(initialdir=initial, defaultextension='.mat', filetypes=[('MAT', '*.mat')])
+		filetypes = [('MAT', '*.mat'), ('Columnar (memory-mapped)', '*.clk')]
+		filetype = tk.StringVar(master=self.master, value=filetypes[0][0])
+		path = filedialog.asksaveasfilename(initialdir=initial, filetypes=filetypes, typevariable=filetype)
 		if not path:
 			return
+		if not os.path.splitext(path)[1]:
+			# bare name: the extension of the chosen file type (defaultextension would always be .mat)
+			path += '.clk' if filetype.get() == filetypes[1][0] else '.mat'
 		try:
-			savemat(path, {'coords_raw': np.array(self.coords_raw, dtype=object), 'coords_real': np.array(self.coords_real, dtype=object)})
+			if path.lower().endswith('.clk'):
+				_, raw, real, offsets = self.points.flat()
+				save_click_columns(path, raw, real, offsets=offsets)
+				self.log(f'Saved columnar results to {path}')
+			else:
+				save_click_mat(path, *self.points.to_ragged())
+				self.log(f'Saved .mat to {path}')
 			self.last_dir = os.path.dirname(path) or initial
-			self.log(f'Saved .mat to {path}')
+			if self.journal:
+				self.journal.mark_saved()
+			self.event('save', path=os.path.abspath(path), points=len(self.points))
 		except Exception as e:
 			self.log(f'Error saving: {e}')
 
+	def export_video(self):
+		"""Write the video with the current points drawn on it, in the background."""
+		if not self.source:
+			self.log('Open a video first')
+			return
+		if self.export_job is not None:
+			self.log('Export is already running')
+			return
+		initial = getattr(self, 'last_dir', os.getcwd())
+		path = filedialog.asksaveasfilename(initialdir=initial, defaultextension='.mp4', filetypes=[('MP4', '*.mp4'), ('AVI (Motion JPEG)', '*.avi')])
+		if not path:
+			return
+		style = {
+			'point_color': self.DATA_POINT_COLOR,
+			'point_radius': self.DATA_POINT_RADIUS,
+			'calib_color': self.CALIB_POINT_COLOR,
+			'calib_radius': self.CALIB_POINT_RADIUS,
+			'frame_number': self.EXPORT_FRAME_NUMBER,
+		}
+		calib = self.calib_img if getattr(self, 'SHOW_CALIB_POINT', True) else []
+		# snapshot of the points: edits made during the export do not affect it
+		coords_raw, _ = self.points.to_ragged()
+		self.export_job = ExportJob(
+			self.source.path, path, coords_raw, list(calib), style,
+			fourcc='MJPG' if path.lower().endswith('.avi') else 'mp4v', threads=self.EXPORT_THREADS, fps=self.source.fps,
+		)
+		self._export_logged = 0
+		self.export_job.start()
+		self.log(f'Exporting annotated video to {path}')
+		self.master.after(500, self._poll_export, self.export_job)
+
+	def _poll_export(self, job):
+		"""after() callback: report export progress."""
+		if job is not self.export_job:
+			return
+		if not job.done:
+			pct = 100 * job.progress // max(1, job.total)
+			if pct >= self._export_logged + 10:
+				self._export_logged = pct - pct % 10
+				self.log(f'Export: {pct}%')
+			self.master.after(500, self._poll_export, job)
+			return
+		self.export_job = None
+		if job.error:
+			self.log(f'Export failed: {job.error}')
+		else:
+			self.log(f'Exported {job.written} frames to {job.out_path}')
+
 	def help_dialog(self):
 		txt = (
 			'Usage:\n'
-			'- Open: choose video file.\n'
-			'- Calib (c): click two image points and enter real coords as x,y.\n'
+			'- Open: choose video file, or any frame of an image sequence to open its whole directory.\n'
+			'- Calib (c): click image points (2 by default) and enter real coords as x,y.\n'
+			'  Model (scale/affine/homography) and number of points: Settings.\n'
 			'- Add (a): click to add points; real coords computed if calibrated.\n'
 			'- Del (d): click near a point to delete it.\n'
 			'- Prev/Next (←/→ or Z/X): navigate frames.\n'
 			'- Jump (j): enter frame number to jump to.\n'
+			'- Zoom: mouse wheel (around the cursor); pan: drag with the right or middle button; 0: fit to window.\n'
+			'- Play/Pause (Space): play at the video fps; [ / ] change the speed.\n'
+			'  Frames are skipped when decoding cannot keep up (achieved fps and drops are shown).\n'
+			'- Timeline (bottom): click or drag to scrub; the orange bar shows where points are.\n'
+			'- P: show/hide the timing HUD (p50/p95/p99 per stage); Shift+P: save the stats (.json/.csv).\n'
+			'- Track (t): propagate the points of this frame to the next frames (optical flow).\n'
+			'  Tracked points are provisional (hollow): Enter accepts them and goes to the next frame,\n'
+			'  clicking near one in Add mode replaces it, Esc discards all.\n'
+			'- Detect (b): detect candidate markers on all frames (blob detector, in parallel)\n'
+			'  as provisional points; Shift+Enter accepts the provisional points of all frames.\n'
 			'- Settings (E): open settings dialog to adjust colors and sizes.\n'
-			'- Save (Ctrl+S): save coords to .mat (requires scipy) or .npz fallback.\n'
+			'- Save (Ctrl+S): save coords to .mat, or to a columnar .clk store.\n'
+			'- Export video (Ctrl+E): write the video with the points drawn on it (.mp4 / .avi).\n'
 		)
 		messagebox.showinfo('Help', txt)
 
@@ -624,6 +1703,24 @@ class ClickGUI:
 		chk_show = tk.Checkbutton(win, text='Show calibration points', variable=show_calib_var)
 		chk_show.grid(row=4, column=0, columnspan=2, sticky='w', padx=6, pady=6)
 
+		# Low-resolution proxy toggle (takes effect when the next video is opened)
+		proxy_var = tk.BooleanVar(value=self.PROXY_MODE)
+		chk_proxy = tk.Checkbutton(win, text='Low-resolution proxy (from next open)', variable=proxy_var)
+		chk_proxy.grid(row=5, column=0, columnspan=2, sticky='w', padx=6, pady=6)
+
+		# Calibration model and number of points (used from the next calibration)
+		lbl5 = tk.Label(win, text='Calibration model:')
+		lbl5.grid(row=6, column=0, sticky='w', padx=6, pady=6)
+		model_var = tk.StringVar(value=self.CALIB_MODEL)
+		opt_model = tk.OptionMenu(win, model_var, *CALIB_MODELS)
+		opt_model.grid(row=6, column=1, sticky='w', padx=6, pady=6)
+
+		lbl6 = tk.Label(win, text='Calibration points:')
+		lbl6.grid(row=7, column=0, sticky='w', padx=6, pady=6)
+		ent_npts = tk.Entry(win)
+		ent_npts.insert(0, str(self.CALIB_POINTS))
+		ent_npts.grid(row=7, column=1, padx=6, pady=6)
+
 		def apply():
 			# validate and apply
 			try:
@@ -636,6 +1733,15 @@ class ClickGUI:
 			except Exception:
 				messagebox.showerror('Error', 'Invalid add radius')
 				return
+			model = model_var.get()
+			try:
+				n_calib = int(ent_npts.get())
+			except Exception:
+				messagebox.showerror('Error', 'Invalid number of calibration points')
+				return
+			if n_calib < CALIB_MODELS[model]:
+				messagebox.showerror('Error', f'{model} calibration needs at least {CALIB_MODELS[model]} points')
+				return
 			# convert colors
 			try:
 				calib_bgr = self._hex_to_bgr(calib_color_var.get())
@@ -650,18 +1756,21 @@ class ClickGUI:
 			self.DATA_POINT_COLOR = add_bgr
 			# apply show calibration toggle
 			self.SHOW_CALIB_POINT = bool(show_calib_var.get())
-			# refresh UI: update mode button highlights and redraw frame
+			self.PROXY_MODE = bool(proxy_var.get())
+			self.CALIB_MODEL = model
+			self.CALIB_POINTS = n_calib
+			# refresh UI: update mode button highlights and restyle the markers
 			self._update_mode_highlight()
 			self.log(f'Updated settings: calib_r={calib_r}, data_r={data_r}, calib_col={calib_color_var.get()}, add_col={add_color_var.get()}')
-			self.show_frame(self.current_frame_idx)
+			self._restyle_overlay_items()
 			win.destroy()
 
 		# entries are ent_calib and ent_add
 
 		btn_apply = tk.Button(win, text='Apply', command=apply)
-		btn_apply.grid(row=5, column=1, padx=6, pady=8)
+		btn_apply.grid(row=8, column=1, padx=6, pady=8)
 		btn_cancel = tk.Button(win, text='Cancel', command=win.destroy)
-		btn_cancel.grid(row=5, column=2, padx=6, pady=8)
+		btn_cancel.grid(row=8, column=2, padx=6, pady=8)
 
 
 
@@ -0,0 +1,163 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+
+__all__ = [
+	'ClickColumns',
+	'save_click_columns',
+	'load_click_columns',
+]
+
+
+FORMAT_NAME = 'click_app.columns'
+FORMAT_VERSION = 1
+COLUMNS = ('frame_idx', 'point_idx', 'x_raw', 'y_raw', 'x_real', 'y_real')
+_DTYPES = {'frame_idx': np.int64, 'point_idx': np.int32}
+
+
+def save_click_columns(path, coords_raw, coords_real=None, offsets=None):
+	"""
+	クリック結果を列指向フォーマット (.clk ディレクトリ) で保存する
+	各列 (frame_idx, point_idx, x_raw, y_raw, x_real, y_real) と
+	フレームごとの開始位置 offsets を非圧縮 .npy で書くので、読み込み時はメモリマップできる
+
+	coords_raw / coords_real: ragged per-frame (k, 2) sequences (load_click_mat layout),
+	or, when offsets (n_frames + 1,) is given, flat (N, 2) arrays in frame-major order.
+	"""
+	if offsets is None:
+		raw = [np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in coords_raw]
+		counts = np.array([len(p) for p in raw], dtype=np.int64)
+		offsets = np.zeros(len(raw) + 1, dtype=np.int64)
+		np.cumsum(counts, out=offsets[1:])
+		flat_raw = np.concatenate(raw) if len(raw) else np.zeros((0, 2))
+		if coords_real is None:
+			flat_real = np.full_like(flat_raw, np.nan)
+		else:
+			flat_real = np.concatenate([np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in coords_real]) if len(raw) else np.zeros((0, 2))
+	else:
+		offsets = np.asarray(offsets, dtype=np.int64)
+		flat_raw = np.asarray(coords_raw, dtype=np.float64).reshape(-1, 2)
+		flat_real = np.full_like(flat_raw, np.nan) if coords_real is None else np.asarray(coords_real, dtype=np.float64).reshape(-1, 2)
+	n_frames = len(offsets) - 1
+	n = int(offsets[-1])
+	if len(flat_raw) != n or len(flat_real) != n:
+		raise ValueError('coords_raw / coords_real do not match the per-frame point counts')
+	counts = np.diff(offsets)
+	frame_idx = np.repeat(np.arange(n_frames, dtype=np.int64), counts)
+	point_idx = (np.arange(n, dtype=np.int64) - offsets[frame_idx]).astype(np.int32)
+	columns = {
+		'frame_idx': frame_idx,
+		'point_idx': point_idx,
+		'x_raw': flat_raw[:, 0],
+		'y_raw': flat_raw[:, 1],
+		'x_real': flat_real[:, 0],
+		'y_real': flat_real[:, 1],
+	}
+	# write next to the target and swap in, so readers never see a half-written store
+	tmp = path.rstrip('/\\') + '.tmp'
+	shutil.rmtree(tmp, ignore_errors=True)
+	os.makedirs(tmp)
+	for name, col in columns.items():
+		np.save(os.path.join(tmp, name + '.npy'), np.ascontiguousarray(col, dtype=_DTYPES.get(name, np.float64)))
+	np.save(os.path.join(tmp, 'offsets.npy'), offsets)
+	with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+		json.dump({'format': FORMAT_NAME, 'version': FORMAT_VERSION, 'n_frames': n_frames, 'n_points': n}, f)
+	if os.path.isdir(path):
+		shutil.rmtree(path)
+	elif os.path.exists(path):
+		os.remove(path)
+	os.replace(tmp, path)
+
+
+def load_click_columns(path):
+	"""列指向フォーマットの結果を開く（データはメモリマップされ、必要な部分だけ読まれる）"""
+	return ClickColumns(path)
+
+
+class ClickColumns:
+	"""
+	save_click_columns で保存した結果の遅延ローダー
+	frame(i) は O(1) で i 番目のフレームの点を返し、iter_frames / iter_chunks で
+	フレーム範囲を順に読み出せる。to_ragged() で load_click_mat と同じ形式に変換する
+	"""
+
+	def __init__(self, path):
+		self.path = path
+		with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+			meta = json.load(f)
+		if meta.get('format') != FORMAT_NAME:
+			raise ValueError(f'Not a click columns store: {path}')
+		if meta.get('version', 0) > FORMAT_VERSION:
+			raise ValueError(f'Unsupported click columns version {meta.get("version")}')
+		self.meta = meta
+		self.offsets = np.load(os.path.join(path, 'offsets.npy'))
+		self._cols = {}
+
+	def __len__(self):
+		return self.n_frames
+
+	@property
+	def n_frames(self):
+		return len(self.offsets) - 1
+
+	@property
+	def n_points(self):
+		return int(self.offsets[-1])
+
+	def column(self, name):
+		"""Memory-mapped column array (one of COLUMNS)."""
+		if name not in COLUMNS:
+			raise KeyError(name)
+		col = self._cols.get(name)
+		if col is None:
+			col = np.load(os.path.join(self.path, name + '.npy'), mmap_mode='r')
+			self._cols[name] = col
+		return col
+
+	def counts(self):
+		"""Number of points on every frame."""
+		return np.diff(self.offsets)
+
+	def _xy(self, kind, a, b):
+		return np.column_stack([self.column('x_' + kind)[a:b], self.column('y_' + kind)[a:b]])
+
+	def frame(self, i):
+		"""(raw (k, 2), real (k, 2)) of frame i."""
+		if not -self.n_frames <= i < self.n_frames:
+			raise IndexError(f'frame {i} out of range')
+		i %= self.n_frames
+		a, b = int(self.offsets[i]), int(self.offsets[i + 1])
+		return self._xy('raw', a, b), self._xy('real', a, b)
+
+	def iter_chunks(self, start=0, stop=None, frames_per_chunk=4096):
+		"""
+		Yield (frame_start, frame_stop, columns) for consecutive frame ranges, where columns
+		maps every column name to the flat slice covering those frames.
+		"""
+		stop = self.n_frames if stop is None else min(stop, self.n_frames)
+		for f0 in range(start, stop, frames_per_chunk):
+			f1 = min(f0 + frames_per_chunk, stop)
+			a, b = int(self.offsets[f0]), int(self.offsets[f1])
+			yield f0, f1, {name: np.asarray(self.column(name)[a:b]) for name in COLUMNS}
+
+	def iter_frames(self, start=0, stop=None, frames_per_chunk=4096):
+		"""Yield (i, raw (k, 2), real (k, 2)) for frames in [start, stop), reading chunk by chunk."""
+		for f0, f1, cols in self.iter_chunks(start, stop, frames_per_chunk):
+			raw = np.column_stack([cols['x_raw'], cols['y_raw']])
+			real = np.column_stack([cols['x_real'], cols['y_real']])
+			base = self.offsets[f0]
+			for i in range(f0, f1):
+				a, b = self.offsets[i] - base, self.offsets[i + 1] - base
+				yield i, raw[a:b], real[a:b]
+
+	def to_ragged(self):
+		"""Convert to the load_click_mat layout: {'coords_raw': obj array, 'coords_real': obj array}."""
+		coords_raw = np.empty(self.n_frames, dtype=object)
+		coords_real = np.empty(self.n_frames, dtype=object)
+		for i, raw, real in self.iter_frames():
+			coords_raw[i] = raw
+			coords_real[i] = real
+		return {'coords_raw': coords_raw, 'coords_real': coords_real}
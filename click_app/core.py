@@ -0,0 +1,104 @@
+"""
+GUI 非依存のコア: 結果ファイルの入出力・キャリブレーション・点ストア・解析・動画ソース
+tkinter / matplotlib は読み込まず、OpenCV (VideoSource) と SciPy (.mat 入出力) は初回使用時に読み込む
+"""
+import numpy as np
+
+from .analysis import FlatCoords, flatten_ragged
+from .calibration import Calibration, CALIB_MODELS
+from .point_store import PointStore
+
+
+__all__ = [
+	'load_click_mat',
+	'save_click_mat',
+	'plot_clicks_on_frame',
+	'Calibration',
+	'CALIB_MODELS',
+	'PointStore',
+	'FlatCoords',
+	'flatten_ragged',
+]
+
+# imported on first access (pulls in OpenCV)
+_LAZY = {
+	'VideoSource': '.video_source',
+	'open_source': '.video_source',
+	'ImageSequenceSource': '.image_sequence',
+}
+
+
+def __getattr__(name):
+	if name in _LAZY:
+		import importlib
+		return getattr(importlib.import_module(_LAZY[name], __package__), name)
+	raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def load_click_mat(filepath):
+    """
+    click_gui.py で作成した.matファイルを読み込んで、
+    保存前と同じ形式のデータにする関数
+	
+	coords_raw[i] is np.ndarray of shape (n_points, 2) where n_points may vary across frames
+	same for coords_real
+    """
+    from scipy.io import loadmat
+    data = loadmat(filepath)
+    coords_raw = data.get('coords_raw', None)
+    coords_real = data.get('coords_real', None)
+    if coords_raw is None or coords_real is None:
+        raise ValueError('Invalid .mat file: missing coords_raw or coords_real')
+	
+
+
+    coords_raw = coords_raw[0]
+    coords_real = coords_real[0]    
+
+    out = {
+        'coords_raw': coords_raw,
+        'coords_real': coords_real
+    }
+    return out
+
+
+def save_click_mat(filepath, coords_raw, coords_real):
+	"""
+	coords_raw / coords_real (フレームごとの (k, 2) 配列の列) を load_click_mat で読める .mat に保存する
+	"""
+	from scipy.io import savemat
+	n = len(coords_raw)
+	cells_raw = np.empty(n, dtype=object)
+	cells_real = np.empty(n, dtype=object)
+	for i in range(n):
+		cells_raw[i] = np.asarray(coords_raw[i], dtype=np.float64).reshape(-1, 2)
+		cells_real[i] = np.asarray(coords_real[i], dtype=np.float64).reshape(-1, 2)
+	savemat(filepath, {'coords_raw': cells_raw, 'coords_real': cells_real})
+
+
+def plot_clicks_on_frame(coords, frame=0):
+	"""
+	指定されたフレームのクリック点を表示する関数
+	coords_raw: クリック点のリスト [[x1, y1], [x2, y2], ...]
+	"""
+	if frame < 0 or frame >= len(coords):
+		# raise ValueError('Invalid frame index')
+		print('Invalid frame index')
+		return
+
+	points = coords[frame]
+	if len(points) == 0:
+		print('No points to plot on this frame.')
+		return
+	
+	x_vals = points[:, 0]
+	y_vals = points[:, 1]
+
+	import matplotlib.pyplot as plt
+	plt.figure()
+	plt.scatter(x_vals, y_vals, c='red', marker='o')
+	plt.title('Click Points on Frame')
+	plt.xlabel('X Coordinate')
+	plt.ylabel('Y Coordinate')
+	plt.grid()
+	plt.show()
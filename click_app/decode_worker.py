@@ -0,0 +1,83 @@
+import queue
+import threading
+
+
+__all__ = [
+	'DecodeWorker',
+]
+
+
+class DecodeWorker:
+	"""
+	フレームのシーク・デコードを UI スレッドの外で行うワーカー
+	未処理のリクエストは常に最新の 1 件だけを保持し（古いものは捨てる）、
+	結果は results キューに入れる。Tk 側は after() でキューをポーリングする
+	"""
+
+	def __init__(self, read_fn):
+		self._read = read_fn  # callable(idx) -> frame or None
+		self.results = queue.Queue()
+		# held while decoding; take it before swapping the capture the read_fn uses
+		self.lock = threading.Lock()
+		self._cond = threading.Condition()
+		self._pending = None
+		self._seq = 0
+		self._inflight = False
+		self._stopped = False
+		self._thread = threading.Thread(target=self._run, name='DecodeWorker', daemon=True)
+		self._thread.start()
+
+	@property
+	def latest(self):
+		"""Sequence number of the newest request; results with an older one are stale."""
+		return self._seq
+
+	@property
+	def busy(self):
+		"""True while a request is pending or being decoded."""
+		with self._cond:
+			return self._pending is not None or self._inflight
+
+	def request(self, idx, *args):
+		"""Queue idx for decoding, replacing any request not yet started."""
+		with self._cond:
+			self._seq += 1
+			self._pending = (self._seq, idx, args)
+			self._cond.notify()
+			return self._seq
+
+	def cancel(self):
+		"""Drop the pending request and mark in-flight results as stale."""
+		with self._cond:
+			self._seq += 1
+			self._pending = None
+
+	def close(self):
+		with self._cond:
+			self._stopped = True
+			self._pending = None
+			self._cond.notify()
+		self._thread.join(timeout=1.0)
+
+	def _run(self):
+		while True:
+			with self._cond:
+				while not self._stopped and self._pending is None:
+					self._cond.wait()
+				if self._stopped:
+					return
+				seq, idx, args = self._pending
+				self._pending = None
+				self._inflight = True
+			try:
+				with self.lock:
+					if seq != self._seq:
+						continue  # superseded while waiting for the lock
+					try:
+						frame = self._read(idx)
+					except Exception:
+						frame = None
+				self.results.put((seq, idx, frame, args))
+			finally:
+				with self._cond:
+					self._inflight = False
@@ -0,0 +1,301 @@
+import time
+
+import cv2
+import numpy as np
+
+
+__all__ = [
+	'DECODER_BACKENDS',
+	'Decoder',
+	'OpenCVDecoder',
+	'PyAVDecoder',
+	'available_decoders',
+	'open_decoder',
+	'probe_decoders',
+	'select_decoder',
+]
+
+
+# decoding forward is cheaper than seeking for gaps up to this many frames
+SEEK_FORWARD_MAX = 16
+
+
+class Decoder:
+	"""
+	フレーム単位で正確なデコーダの共通インターフェース（1 スレッドから使う）
+	read(idx) は連続した読み込みならそのまま次をデコードし、離れていればシークしてから目的のフレームまで進む
+	"""
+
+	name = None
+
+	def __init__(self, path, threads=0):
+		self.path = path
+		self.threads = threads  # decoder threads (0: backend default)
+		self.size = None  # (w, h)
+		self.fps = 30.0
+		self.frame_count = 0
+		self.codec = '?'
+		self.seek_index = None  # SeekIndex: keyframes / timestamps for frame-accurate seeking
+
+	def read(self, idx, stats=None):
+		"""Frame idx (BGR) or None; stats (PerfStats) receives the 'seek' and 'decode' times."""
+		raise NotImplementedError
+
+	def close(self):
+		pass
+
+
+class OpenCVDecoder(Decoder):
+	"""cv2.VideoCapture; with threads > 0 the FFmpeg backend decodes on that many threads."""
+
+	name = 'opencv'
+
+	def __init__(self, path, threads=0):
+		super().__init__(path, threads)
+		cap = None
+		if threads > 0 and hasattr(cv2, 'CAP_PROP_N_THREADS'):
+			cap = cv2.VideoCapture(path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_N_THREADS, threads])
+			if not cap.isOpened():
+				cap.release()
+				cap = None
+		if cap is None:
+			cap = cv2.VideoCapture(path)
+		if not cap.isOpened():
+			raise OSError(f'Unable to open video: {path}')
+		self.cap = cap
+		w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+		h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+		self.size = (w, h) if w > 0 and h > 0 else None
+		self.fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+		self.frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+		fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+		self.codec = ''.join(chr((fourcc >> 8 * i) & 0xFF) for i in range(4)).strip('\x00 ') or '?'
+		self._pos = -1  # frame index self.cap returns on the next read()
+
+	def read(self, idx, stats=None):
+		if self.cap is None:
+			return None
+		if self.seek_index is not None:
+			# frame-accurate: decode forward from the nearest keyframe
+			frame = self.seek_index.read(self.cap, idx, self._pos, stats)
+		else:
+			t0 = time.perf_counter()
+			if self._pos < 0 or not 0 <= idx - self._pos <= SEEK_FORWARD_MAX:
+				self.cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+				self._pos = idx
+				if stats is not None:
+					t1 = time.perf_counter()
+					stats.add('seek', t1 - t0)
+					t0 = t1
+			# short gaps: skip without retrieving the images
+			ok = True
+			while ok and self._pos < idx:
+				ok = self.cap.grab()
+				self._pos += 1
+			ret, frame = self.cap.read() if ok else (False, None)
+			if stats is not None:
+				stats.add('decode', time.perf_counter() - t0)
+			if not ret:
+				frame = None
+		self._pos = -1 if frame is None else idx + 1
+		return frame
+
+	def close(self):
+		if self.cap is not None:
+			self.cap.release()
+			self.cap = None
+
+
+class PyAVDecoder(Decoder):
+	"""
+	PyAV (FFmpeg) with frame-threaded decoding and seeking by timestamp.
+	Optional: needs the `av` package.
+	"""
+
+	name = 'pyav'
+
+	def __init__(self, path, threads=0):
+		super().__init__(path, threads)
+		try:
+			import av
+		except ImportError as e:
+			raise OSError(f'PyAV is not installed: {e}') from e
+		self._av_error = av.error.FFmpegError  # base of every error raised while demuxing / decoding
+		try:
+			self.container = av.open(path)
+		except av.error.FFmpegError as e:
+			raise OSError(f'Unable to open video: {path} ({e})') from e
+		if not self.container.streams.video:
+			self.container.close()
+			raise OSError(f'No video stream: {path}')
+		stream = self.stream = self.container.streams.video[0]
+		stream.thread_type = 'AUTO'  # frame + slice threads
+		if threads > 0:
+			stream.codec_context.thread_count = threads
+		ctx = stream.codec_context
+		self.size = (ctx.width, ctx.height) if ctx.width and ctx.height else None
+		self.fps = float(stream.average_rate or stream.guessed_rate or 30.0)
+		self.time_base = float(stream.time_base)
+		self.start_pts = stream.start_time or 0
+		if stream.frames:
+			self.frame_count = int(stream.frames)
+		elif stream.duration:
+			self.frame_count = int(round(stream.duration * self.time_base * self.fps))
+		self.codec = ctx.name or '?'
+		self._frames = None  # decode iterator positioned after frame _pos - 1
+		self._pos = -1
+
+	def _msec_of(self, idx):
+		if self.seek_index is not None:
+			return float(self.seek_index.timestamps[idx])
+		return idx * 1000.0 / self.fps
+
+	def _index_of(self, frame):
+		"""
+		Frame index of a decoded frame, from its timestamp (same clock as the SeekIndex: ms from the stream start),
+		or None if the frame carries neither pts nor dts.
+		"""
+		pts = frame.pts if frame.pts is not None else frame.dts
+		if pts is None:
+			return None
+		msec = (pts - self.start_pts) * self.time_base * 1000.0
+		if self.seek_index is not None:
+			return self.seek_index.frame_at_msec(msec)
+		return int(round(msec * self.fps / 1000.0))
+
+	def _seek(self, start):
+		"""Seek to the keyframe at or before frame start; decoding continues from there."""
+		target = self.start_pts + int(self._msec_of(start) / 1000.0 / self.time_base)
+		self.container.seek(target, stream=self.stream, backward=True, any_frame=False)
+		self._frames = self.container.decode(self.stream)
+
+	def _seek_start(self, idx, start=None):
+		"""
+		Frame to seek to for idx: its keyframe from the SeekIndex, or idx itself without one.
+		With start (a seek that landed past idx), the next candidate further back:
+		the previous keyframe, or twice as far back in time (at least 2 s more).
+		"""
+		if self.seek_index is not None:
+			return self.seek_index.nearest_keyframe(idx if start is None else start - 1)
+		if start is None:
+			return idx
+		return max(0, idx - 2 * max(idx - start, int(self.fps)))
+
+	def read(self, idx, stats=None):
+		if self.container is None or idx < 0 or (self.seek_index is not None and idx >= self.seek_index.frame_count):
+			return None
+		t0 = time.perf_counter()
+		frame = None
+		try:
+			last = self._pos - 1  # index of the previous decoded frame; None right after a seek
+			start = None  # frame the last seek aimed at (None: decoding on from the previous read)
+			if self._frames is None or not 0 <= idx - self._pos <= SEEK_FORWARD_MAX:
+				start = self._seek_start(idx)
+				self._seek(start)
+				last = None
+				if stats is not None:
+					t1 = time.perf_counter()
+					stats.add('seek', t1 - t0)
+					t0 = t1
+			while frame is None:
+				for f in self._frames:
+					j = self._index_of(f)
+					if j is None:
+						if last is None:
+							continue  # no timestamp and no known predecessor: position unknown
+						j = last + 1
+					if last is None and j > idx and start > 0:
+						# the seek landed past idx (sparse keyframes, inexact seeking in TS/AVI): start further back
+						start = self._seek_start(idx, start)
+						self._seek(start)
+						break
+					last = j
+					if j >= idx:
+						# j > idx after its predecessor (or from the stream start): idx is missing from the stream,
+						# show the next frame rather than nothing
+						frame = f.to_ndarray(format='bgr24')
+						self._pos = j + 1
+						break
+				else:
+					break  # end of stream
+		except self._av_error:
+			# corrupt or truncated data: like an unreadable frame; the next read seeks afresh
+			frame = None
+		if frame is None:
+			self._frames = None
+		if stats is not None:
+			stats.add('decode', time.perf_counter() - t0)
+		return frame
+
+	def close(self):
+		if self.container is not None:
+			self.container.close()
+			self.container = None
+			self._frames = None
+
+
+DECODER_BACKENDS = {
+	'opencv': OpenCVDecoder,
+	'pyav': PyAVDecoder,
+}
+
+
+def available_decoders():
+	"""Names of the backends that can be used here (PyAV only if installed)."""
+	names = ['opencv']
+	try:
+		import av  # noqa: F401
+		names.append('pyav')
+	except ImportError:
+		pass
+	return names
+
+
+def open_decoder(path, backend='opencv', threads=0, seek_index=None):
+	"""Open path with the named backend (see DECODER_BACKENDS). Raises OSError if it cannot be opened."""
+	if backend not in DECODER_BACKENDS:
+		raise ValueError(f'unknown decoder backend {backend!r} (expected one of {", ".join(DECODER_BACKENDS)})')
+	decoder = DECODER_BACKENDS[backend](path, threads)
+	decoder.seek_index = seek_index
+	return decoder
+
+
+def probe_decoders(path, backends=None, threads=0, seek_index=None, n_seq=24, n_random=6):
+	"""
+	Short benchmark of each backend on this file: n_seq sequential reads from frame 0 and
+	n_random reads at fixed positions spread over the video.
+	Returns {name: {'seq_ms', 'random_ms', 'score'}} (ms per frame; score = seq_ms + random_ms),
+	or {name: {'error': message}} for a backend that failed.
+	"""
+	results = {}
+	for name in backends or available_decoders():
+		try:
+			dec = open_decoder(path, name, threads, seek_index)
+		except (OSError, ValueError) as e:
+			results[name] = {'error': str(e)}
+			continue
+		try:
+			n = seek_index.frame_count if seek_index is not None else dec.frame_count
+			seq = range(min(n_seq, n))
+			# deterministic and far apart, alternating directions
+			rand = [int(f * (n - 1)) for f in np.array([0.7, 0.2, 0.9, 0.4, 0.55, 0.1])[:n_random]]
+			timings = {}
+			for key, order in (('seq_ms', seq), ('random_ms', rand)):
+				t0 = time.perf_counter()
+				for i in order:
+					if dec.read(i) is None:
+						raise OSError(f'frame {i} unreadable')
+				timings[key] = (time.perf_counter() - t0) * 1e3 / max(1, len(order))
+			timings['score'] = timings['seq_ms'] + timings['random_ms']
+			results[name] = timings
+		except Exception as e:
+			results[name] = {'error': str(e)}
+		finally:
+			dec.close()
+	return results
+
+
+def select_decoder(results, default='opencv'):
+	"""Backend with the lowest probe score (default if none succeeded)."""
+	scored = [(r['score'], name) for name, r in results.items() if 'score' in r]
+	return min(scored)[1] if scored else default
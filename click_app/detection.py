@@ -0,0 +1,211 @@
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import cv2
+import numpy as np
+
+from .image_sequence import open_capture
+from .seek_index import SeekIndex
+
+
+__all__ = [
+	'DETECT_METHODS',
+	'DetectionJob',
+	'detect_points',
+	'detect_video',
+]
+
+
+DETECT_METHODS = ('blob', 'contour')
+DEFAULT_PARAMS = {
+	'min_area': 10.0,   # [px^2]
+	'max_area': 5000.0,
+	'dark': False,      # True: dark markers on a bright background
+	'threshold': None,  # gray level for 'contour' (None: Otsu per frame)
+}
+
+
+def _params(params):
+	p = dict(DEFAULT_PARAMS)
+	p.update(params or {})
+	return p
+
+
+def _blob_detector(p):
+	bp = cv2.SimpleBlobDetector_Params()
+	bp.filterByArea = True
+	bp.minArea = float(p['min_area'])
+	bp.maxArea = float(p['max_area'])
+	bp.filterByColor = True
+	bp.blobColor = 0 if p['dark'] else 255
+	bp.filterByCircularity = False
+	bp.filterByConvexity = False
+	bp.filterByInertia = False
+	return cv2.SimpleBlobDetector_create(bp)
+
+
+def detect_points(frame, method='blob', params=None, _detector=None):
+	"""Candidate marker centers (k, 2) in one BGR (or gray) frame."""
+	p = _params(params)
+	gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+	if method == 'blob':
+		detector = _detector or _blob_detector(p)
+		kps = detector.detect(gray)
+		return np.array([kp.pt for kp in kps], dtype=np.float64).reshape(-1, 2)
+	if method != 'contour':
+		raise ValueError(f'Unknown detection method: {method}')
+	mode = cv2.THRESH_BINARY_INV if p['dark'] else cv2.THRESH_BINARY
+	if p['threshold'] is None:
+		_, mask = cv2.threshold(gray, 0, 255, mode | cv2.THRESH_OTSU)
+	else:
+		_, mask = cv2.threshold(gray, float(p['threshold']), 255, mode)
+	contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+	out = []
+	for c in contours:
+		m = cv2.moments(c)
+		if m['m00'] > 0 and p['min_area'] <= m['m00'] <= p['max_area']:
+			out.append((m['m10'] / m['m00'], m['m01'] / m['m00']))
+	return np.array(out, dtype=np.float64).reshape(-1, 2)
+
+
+def _detect_range(path, start, stop, method, params):
+	"""
+	Worker: detect on frames [start, stop) with its own VideoCapture (or SequenceCapture).
+	Returns (start, n_read, frame_idx (N,), xy (N, 2)).
+	"""
+	cap = open_capture(path)
+	try:
+		if not cap.isOpened():
+			raise OSError(f'Unable to open video: {path}')
+		detector = _blob_detector(_params(params)) if method == 'blob' else None
+		index = SeekIndex.load(path)
+		if index is not None:
+			frame = index.read(cap, start)  # frame-accurate start of the range
+		else:
+			if start:
+				cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+			ok, frame = cap.read()
+			frame = frame if ok else None
+		frames, pts = [], []
+		i = start
+		while frame is not None and i < stop:
+			xy = detect_points(frame, method, params, detector)
+			frames.append(np.full(len(xy), i, dtype=np.int64))
+			pts.append(xy)
+			i += 1
+			if i < stop:
+				ok, frame = cap.read()
+				frame = frame if ok else None
+	finally:
+		cap.release()
+	if not pts:
+		return start, 0, np.zeros(0, dtype=np.int64), np.zeros((0, 2))
+	return start, i - start, np.concatenate(frames), np.concatenate(pts)
+
+
+def _split(n_frames, chunk_frames):
+	chunk_frames = max(1, int(chunk_frames))
+	return [(a, min(a + chunk_frames, n_frames)) for a in range(0, n_frames, chunk_frames)]
+
+
+def _to_ragged(n_frames, frame_idx, xy):
+	out = np.empty(n_frames, dtype=object)
+	order = np.argsort(frame_idx, kind='stable')
+	frame_idx = frame_idx[order]
+	xy = xy[order]
+	offsets = np.searchsorted(frame_idx, np.arange(n_frames + 1))
+	for i in range(n_frames):
+		out[i] = xy[offsets[i]:offsets[i + 1]]
+	return out
+
+
+def _terminate_workers(pool):
+	"""Stop the chunks still running in pool's processes (they hold no state worth finishing)."""
+	terminate = getattr(pool, 'terminate_workers', None)  # Python 3.14+
+	if terminate is not None:
+		terminate()
+		return
+	for proc in list((getattr(pool, '_processes', None) or {}).values()):
+		proc.terminate()
+
+
+def detect_video(path, n_frames, method='blob', params=None, workers=None, chunk_frames=200, progress=None, cancel=None):
+	"""
+	Detect candidate points on every frame of a video, frame ranges in parallel in a process pool.
+	Returns a 1-D object array of per-frame (k, 2) arrays (the coords_raw layout).
+	progress(frames_done) is called as ranges finish; cancel is an optional threading.Event.
+	"""
+	if method not in DETECT_METHODS:
+		raise ValueError(f'Unknown detection method: {method}')
+	workers = workers or os.cpu_count() or 1
+	frame_idx, xy = [], []
+	done = 0
+	cancelled = False
+	pool = ProcessPoolExecutor(max_workers=workers)
+	try:
+		todo = {pool.submit(_detect_range, path, a, b, method, params) for a, b in _split(n_frames, chunk_frames)}
+		while todo:
+			# short waits so a cancel does not have to wait for a whole chunk
+			finished, todo = wait(todo, timeout=0.2, return_when=FIRST_COMPLETED)
+			if cancel is not None and cancel.is_set():
+				cancelled = True
+				break
+			for fut in finished:
+				_, n_read, f, p = fut.result()
+				frame_idx.append(f)
+				xy.append(p)
+				done += n_read
+				if progress is not None:
+					progress(done)
+	except BaseException:
+		cancelled = True
+		raise
+	finally:
+		if cancelled:
+			_terminate_workers(pool)
+		pool.shutdown(wait=not cancelled, cancel_futures=True)
+	if cancelled:
+		return None
+	frame_idx = np.concatenate(frame_idx) if frame_idx else np.zeros(0, dtype=np.int64)
+	xy = np.concatenate(xy) if xy else np.zeros((0, 2))
+	return _to_ragged(n_frames, frame_idx, xy)
+
+
+class DetectionJob:
+	"""
+	detect_video をバックグラウンドスレッドから動かす（GUI は after() で progress / done をポーリングする）
+	完了すると result に coords_raw 形式の候補点が入る
+	"""
+
+	def __init__(self, path, n_frames, method='blob', params=None, workers=None, chunk_frames=200):
+		self.n_frames = n_frames
+		self.progress = 0  # frames processed
+		self.result = None
+		self.error = None
+		self._args = (path, n_frames, method, params, workers, chunk_frames)
+		self._cancel = threading.Event()
+		self._thread = threading.Thread(target=self._run, name='DetectionJob', daemon=True)
+
+	@property
+	def done(self):
+		return not self._thread.is_alive()
+
+	def start(self):
+		self._thread.start()
+
+	def cancel(self):
+		self._cancel.set()
+
+	def join(self, timeout=None):
+		if self._thread.is_alive():
+			self._thread.join(timeout)
+
+	def _run(self):
+		try:
+			self.result = detect_video(*self._args, progress=self._set_progress, cancel=self._cancel)
+		except Exception as e:  # reported to the GUI; the worker processes may fail in any way
+			self.error = str(e) or type(e).__name__
+
+	def _set_progress(self, n):
+		self.progress = n
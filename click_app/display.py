@@ -0,0 +1,70 @@
+import time
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+
+__all__ = [
+	'DisplayBuffer',
+]
+
+
+class DisplayBuffer:
+	"""
+	キャンバス表示用の事前確保バッファ
+	resize 先 (BGR) と色変換先 (RGB) の配列、PhotoImage をサイズが変わるまで使い回し、
+	フレームごとに全画面サイズの配列を確保しないようにする
+	"""
+
+	def __init__(self):
+		self._bgr = None
+		self._rgb = None
+		self.photo = None
+		self.stats = None  # PerfStats receiving 'resize' / 'color' / 'photo' times
+
+	@staticmethod
+	def _ensure(buf, shape, dtype):
+		if buf is None or buf.shape != shape or buf.dtype != dtype:
+			return np.empty(shape, dtype=dtype)
+		return buf
+
+	def prepare(self, src, size, interpolation=cv2.INTER_LINEAR):
+		"""
+		Resize src (BGR) to size=(w, h) and convert to RGB into the reused buffers; src is never copied.
+		Returns the RGB buffer, which stays valid until the next call.
+		"""
+		w, h = size
+		stats = self.stats
+		t0 = time.perf_counter()
+		self._bgr = self._ensure(self._bgr, (h, w, 3), np.uint8)
+		self._rgb = self._ensure(self._rgb, (h, w, 3), np.uint8)
+		cv2.resize(src, (w, h), dst=self._bgr, interpolation=interpolation)
+		if stats is not None:
+			t1 = time.perf_counter()
+			stats.add('resize', t1 - t0)
+			t0 = t1
+		cv2.cvtColor(self._bgr, cv2.COLOR_BGR2RGB, dst=self._rgb)
+		if stats is not None:
+			stats.add('color', time.perf_counter() - t0)
+		return self._rgb
+
+	def to_photo(self):
+		"""
+		Copy the prepared RGB buffer into the reused PhotoImage.
+		Returns (photo, created): created is True when a new PhotoImage had to be made,
+		i.e. the canvas image item must be pointed at it.
+		"""
+		t0 = time.perf_counter()
+		h, w = self._rgb.shape[:2]
+		# wraps the buffer without copying; paste() is the only copy into Tk
+		img = Image.frombuffer('RGB', (w, h), self._rgb, 'raw', 'RGB', 0, 1)
+		if self.photo is not None and (self.photo.width(), self.photo.height()) == (w, h):
+			self.photo.paste(img)
+			created = False
+		else:
+			self.photo = ImageTk.PhotoImage(img)
+			created = True
+		if self.stats is not None:
+			self.stats.add('photo', time.perf_counter() - t0)
+		return self.photo, created
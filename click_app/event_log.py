@@ -0,0 +1,117 @@
+import glob
+import json
+import os
+import queue
+import threading
+import time
+
+
+__all__ = [
+	'EventLog',
+	'default_log_dir',
+	'prune_logs',
+]
+
+
+def default_log_dir():
+	return os.path.join(os.path.expanduser('~'), '.click_app', 'logs')
+
+
+def prune_logs(log_dir, keep=30, max_age_days=None):
+	"""
+	Delete old session logs in log_dir: all but the newest keep files, and those older than max_age_days.
+	Returns the number of files removed.
+	"""
+	paths = []
+	for p in glob.glob(os.path.join(log_dir, 'session-*.jsonl')):
+		try:
+			paths.append((os.path.getmtime(p), p))
+		except OSError:
+			pass
+	paths.sort(reverse=True)
+	cutoff = time.time() - max_age_days * 86400 if max_age_days is not None else None
+	removed = 0
+	for k, (mtime, p) in enumerate(paths):
+		if (keep is not None and k >= keep) or (cutoff is not None and mtime < cutoff):
+			try:
+				os.remove(p)
+				removed += 1
+			except OSError:
+				pass
+	return removed
+
+
+def _json_default(o):
+	# numpy scalars / arrays and tuples of them
+	if hasattr(o, 'tolist'):
+		return o.tolist()
+	return str(o)
+
+
+class EventLog:
+	"""
+	構造化イベントログ (JSON Lines) を別スレッドでファイルに追記する
+	write() はキューに入れるだけで呼び出し側を待たせない。flush_s ごとにまとめて書き、close() で残りを書き切る
+	1 行 = 1 イベント: {"t": UNIX 時刻, "event": 種類, ...任意のフィールド}
+	"""
+
+	def __init__(self, path, flush_s=1.0, max_queue=100000):
+		self.path = path
+		self.flush_s = flush_s
+		self.dropped = 0  # events lost because the queue was full (disk far slower than the UI)
+		self.error = None
+		os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+		self._file = open(path, 'a', encoding='utf-8')
+		self._queue = queue.Queue(max_queue)
+		self._stop = threading.Event()
+		self._thread = threading.Thread(target=self._run, name='EventLog', daemon=True)
+		self._thread.start()
+
+	@classmethod
+	def for_session(cls, log_dir=None, keep=30, max_age_days=30, **kwargs):
+		"""
+		New log file <log_dir>/session-<date>-<time>-<pid>.jsonl. Older sessions beyond the newest keep
+		(including this one) or older than max_age_days are deleted first (None: no limit).
+		"""
+		log_dir = log_dir or default_log_dir()
+		if keep is not None or max_age_days is not None:
+			prune_logs(log_dir, None if keep is None else max(0, keep - 1), max_age_days)
+		name = f'session-{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}.jsonl'
+		return cls(os.path.join(log_dir, name), **kwargs)
+
+	def write(self, event, **fields):
+		if self._stop.is_set():
+			return
+		rec = {'t': round(time.time(), 6), 'event': event}
+		rec.update(fields)
+		try:
+			self._queue.put_nowait(rec)
+		except queue.Full:
+			self.dropped += 1
+
+	def close(self):
+		self._stop.set()
+		self._thread.join(timeout=5.0)
+
+	def _drain(self):
+		lines = []
+		while True:
+			try:
+				rec = self._queue.get_nowait()
+			except queue.Empty:
+				break
+			lines.append(json.dumps(rec, ensure_ascii=False, default=_json_default))
+		if lines and self.error is None:
+			try:
+				self._file.write('\n'.join(lines) + '\n')
+				self._file.flush()
+			except OSError as e:
+				self.error = str(e)
+
+	def _run(self):
+		try:
+			while not self._stop.wait(self.flush_s):
+				self._drain()
+			self._drain()
+		finally:
+			self._file.close()
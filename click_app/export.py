@@ -0,0 +1,225 @@
+import os
+import threading
+
+import cv2
+import numpy as np
+
+from .image_sequence import open_capture
+from .seek_index import SeekIndex
+
+
+__all__ = [
+	'ExportJob',
+	'export_annotated_video',
+]
+
+
+DEFAULT_STYLE = {
+	'point_color': (255, 0, 0),  # BGR, same defaults as ClickGUI
+	'point_radius': 4,
+	'calib_color': (0, 255, 0),
+	'calib_radius': 4,
+	'frame_number': True,
+}
+
+
+def render_overlay(img, pts, calib_pts=(), style=None, frame_idx=None):
+	"""Draw points (k, 2), calibration points and the frame number into img in place."""
+	s = dict(DEFAULT_STYLE)
+	s.update(style or {})
+	for (x, y) in calib_pts:
+		cv2.circle(img, (int(x), int(y)), s['calib_radius'], s['calib_color'], -1)
+	for (x, y) in pts:
+		cv2.circle(img, (int(x), int(y)), s['point_radius'], s['point_color'], -1)
+	if s['frame_number'] and frame_idx is not None:
+		cv2.putText(img, str(frame_idx + 1), (8, 24), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 3, cv2.LINE_AA)
+		cv2.putText(img, str(frame_idx + 1), (8, 24), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 1, cv2.LINE_AA)
+	return img
+
+
+class _Pipeline:
+	"""
+	decode + render workers -> reorder buffer -> writer
+	worker k decodes chunks k, k+K, ... with its own VideoCapture and renders in place.
+	A worker may only start frame j once j < next_write + capacity, so at most capacity
+	frames are buffered and the frame the writer waits for can always be produced.
+	"""
+
+	def __init__(self, video_path, coords_raw, calib_pts, style, start, stop, threads, chunk_frames, capacity, cancel):
+		self.video_path = video_path
+		self.coords_raw = coords_raw
+		self.calib_pts = calib_pts
+		self.style = style
+		self.start = start
+		self.stop = stop
+		self.threads = threads
+		self.chunk_frames = chunk_frames
+		self.capacity = capacity
+		self.cancel = cancel
+		self.cond = threading.Condition()
+		self.next_write = start
+		self.buffer = {}
+		self.end = stop  # lowered when a worker hits the real end of the video
+		self.error = None
+		self.index = SeekIndex.load(video_path)
+
+	def _admit(self, j):
+		with self.cond:
+			while j < self.end and j >= self.next_write + self.capacity and not self._stopped():
+				self.cond.wait(0.1)
+			return not self._stopped() and j < self.end
+
+	def _stopped(self):
+		return self.error is not None or (self.cancel is not None and self.cancel.is_set())
+
+	def _points(self, i):
+		if i >= len(self.coords_raw):
+			return ()
+		return np.asarray(self.coords_raw[i], dtype=np.float64).reshape(-1, 2)
+
+	def worker(self, k):
+		cap = open_capture(self.video_path)
+		try:
+			if not cap.isOpened():
+				raise OSError(f'Unable to open video: {self.video_path}')
+			for a in range(self.start + k * self.chunk_frames, self.stop, self.threads * self.chunk_frames):
+				b = min(a + self.chunk_frames, self.stop)
+				if not self._admit(a):
+					return
+				if self.index is not None:
+					frame = self.index.read(cap, a)
+				else:
+					cap.set(cv2.CAP_PROP_POS_FRAMES, a)
+					ok, frame = cap.read()
+					frame = frame if ok else None
+				for j in range(a, b):
+					if j > a:
+						if not self._admit(j):
+							return
+						ok, frame = cap.read()
+						frame = frame if ok else None
+					if frame is None:
+						with self.cond:
+							self.end = min(self.end, j)
+							self.cond.notify_all()
+						return
+					render_overlay(frame, self._points(j), self.calib_pts, self.style, j)
+					with self.cond:
+						self.buffer[j] = frame
+						self.cond.notify_all()
+		except Exception as e:
+			with self.cond:
+				self.error = e
+				self.cond.notify_all()
+		finally:
+			cap.release()
+
+	def next_frame(self):
+		"""Block until the next frame in order is rendered; None at the end."""
+		with self.cond:
+			i = self.next_write
+			while i not in self.buffer and i < self.end and not self._stopped():
+				self.cond.wait(0.1)
+			if self.error is not None:
+				raise self.error
+			if i not in self.buffer:
+				return None
+			frame = self.buffer.pop(i)
+			self.next_write += 1
+			self.cond.notify_all()
+			return frame
+
+
+def export_annotated_video(
+	video_path, out_path, coords_raw, calib_pts=(), style=None, fps=None, fourcc='mp4v',
+	start=0, stop=None, threads=None, chunk_frames=64, max_buffered=None, progress=None, cancel=None,
+):
+	"""
+	Write a copy of video_path with the clicked points drawn on every frame (no GUI).
+	coords_raw: per-frame (k, 2) raw coordinates (load_click_mat / PointStore.to_ragged layout).
+	Decoding and drawing run on `threads` workers, each with its own VideoCapture; frames are
+	written in order through a buffer of at most max_buffered frames.
+	progress(frames_written, frames_total) is called after every written frame.
+	Returns the number of frames written.
+	"""
+	cap = open_capture(video_path)
+	if not cap.isOpened():
+		raise OSError(f'Unable to open video: {video_path}')
+	w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+	h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+	n = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+	fps = fps or cap.get(cv2.CAP_PROP_FPS) or 30.0
+	cap.release()
+	index = SeekIndex.load(video_path)
+	if index is not None:
+		n = index.frame_count
+	stop = n if stop is None else min(stop, n)
+	if not 0 <= start < stop:
+		raise ValueError(f'Empty frame range {start}-{stop}')
+	threads = threads or min(8, os.cpu_count() or 1)
+	max_buffered = max_buffered or 2 * threads * chunk_frames
+	writer = cv2.VideoWriter(out_path, cv2.VideoWriter_fourcc(*fourcc), fps, (w, h))
+	if not writer.isOpened():
+		raise OSError(f'Unable to open video writer for {out_path} ({fourcc})')
+	pipe = _Pipeline(video_path, coords_raw, list(calib_pts), style, start, stop, threads, chunk_frames, max_buffered, cancel)
+	workers = [threading.Thread(target=pipe.worker, args=(k,), name=f'ExportWorker-{k}', daemon=True) for k in range(threads)]
+	for t in workers:
+		t.start()
+	written = 0
+	try:
+		while True:
+			frame = pipe.next_frame()
+			if frame is None:
+				break
+			writer.write(frame)
+			written += 1
+			if progress is not None:
+				progress(written, stop - start)
+	finally:
+		with pipe.cond:
+			pipe.end = start  # stops the workers early on cancel or a writer error
+			pipe.cond.notify_all()
+		for t in workers:
+			t.join()
+		writer.release()
+	return written
+
+
+class ExportJob:
+	"""
+	export_annotated_video をバックグラウンドスレッドで実行する（GUI は after() で progress / done をポーリングする）
+	"""
+
+	def __init__(self, video_path, out_path, coords_raw, calib_pts=(), style=None, **kwargs):
+		self.out_path = out_path
+		self.progress = 0
+		self.total = 0
+		self.written = None
+		self.error = None
+		self._args = (video_path, out_path, coords_raw, calib_pts, style)
+		self._kwargs = kwargs
+		self._cancel = threading.Event()
+		self._thread = threading.Thread(target=self._run, name='ExportJob', daemon=True)
+
+	@property
+	def done(self):
+		return not self._thread.is_alive()
+
+	def start(self):
+		self._thread.start()
+
+	def cancel(self):
+		self._cancel.set()
+
+	def join(self, timeout=None):
+		self._thread.join(timeout)
+
+	def _run(self):
+		try:
+			self.written = export_annotated_video(*self._args, progress=self._set_progress, cancel=self._cancel, **self._kwargs)
+		except Exception as e:
+			self.error = str(e) or type(e).__name__
+
+	def _set_progress(self, n, total):
+		self.progress = n
+		self.total = total
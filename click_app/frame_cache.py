@@ -0,0 +1,132 @@
+import threading
+from collections import OrderedDict
+
+from .decoders import OpenCVDecoder
+
+
+__all__ = [
+	'FrameCache',
+	'FrameReadAhead',
+]
+
+
+class FrameCache:
+	"""
+	デコード済みフレームの LRU キャッシュ（スレッドセーフ）
+	max_mb で指定したメモリ量を超えると、最も古く参照されたフレームから捨てる
+	"""
+
+	def __init__(self, max_mb=512):
+		self.max_bytes = int(max_mb * 1024 * 1024)
+		self.nbytes = 0
+		self._frames = OrderedDict()
+		self._lock = threading.Lock()
+
+	def __len__(self):
+		with self._lock:
+			return len(self._frames)
+
+	def __contains__(self, idx):
+		with self._lock:
+			return idx in self._frames
+
+	def get(self, idx):
+		"""Return the cached frame for idx (read-only ndarray) or None."""
+		with self._lock:
+			frame = self._frames.get(idx)
+			if frame is not None:
+				self._frames.move_to_end(idx)
+			return frame
+
+	def put(self, idx, frame):
+		if frame is None or frame.nbytes > self.max_bytes:
+			return
+		# cached frames are shared between threads, so they must never be drawn on
+		frame.flags.writeable = False
+		with self._lock:
+			old = self._frames.pop(idx, None)
+			if old is not None:
+				self.nbytes -= old.nbytes
+			self._frames[idx] = frame
+			self.nbytes += frame.nbytes
+			while self.nbytes > self.max_bytes:
+				_, evicted = self._frames.popitem(last=False)
+				self.nbytes -= evicted.nbytes
+
+	def clear(self):
+		with self._lock:
+			self._frames.clear()
+			self.nbytes = 0
+
+
+class FrameReadAhead:
+	"""
+	current_frame_idx の前後のフレームを別スレッドで先読みして FrameCache に入れる
+	デコーダはスレッド間で共有できないため、専用のデコーダを open_decoder() で開く
+	"""
+
+	def __init__(self, path, cache, n_next=8, n_prev=4, open_decoder=None):
+		self.path = path
+		self.cache = cache
+		self.n_next = n_next
+		self.n_prev = n_prev
+		self.open_decoder = open_decoder or (lambda: OpenCVDecoder(path))
+		self.frame_count = 0
+		self.seek_index = None  # set once the background SeekIndex is ready
+		self._center = None
+		self._generation = 0
+		self._cond = threading.Condition()
+		self._stopped = False
+		self._thread = threading.Thread(target=self._run, name='FrameReadAhead', daemon=True)
+		self._thread.start()
+
+	def set_center(self, idx, frame_count):
+		"""Request frames around idx; supersedes any read-ahead still in progress."""
+		with self._cond:
+			self.frame_count = frame_count
+			self._center = idx
+			self._generation += 1
+			self._cond.notify()
+
+	def close(self):
+		with self._cond:
+			self._stopped = True
+			self._cond.notify()
+		self._thread.join(timeout=1.0)
+
+	def _wanted_runs(self, center):
+		"""Contiguous [start, stop) runs to decode: forward first, then backward."""
+		fwd = (center + 1, min(self.frame_count, center + 1 + self.n_next))
+		bwd = (max(0, center - self.n_prev), center)
+		return [r for r in (fwd, bwd) if r[0] < r[1]]
+
+	def _run(self):
+		try:
+			dec = self.open_decoder()
+		except OSError:
+			return
+		try:
+			while True:
+				with self._cond:
+					while not self._stopped and self._center is None:
+						self._cond.wait()
+					if self._stopped:
+						return
+					center = self._center
+					generation = self._generation
+					self._center = None
+				dec.seek_index = self.seek_index
+				for start, stop in self._wanted_runs(center):
+					# cached frames in between are skipped by the decoder without being retrieved
+					for i in range(start, stop):
+						if self._generation != generation or self._stopped:
+							break
+						if i not in self.cache:
+							frame = dec.read(i)
+							if frame is None:
+								break
+							self.cache.put(i, frame)
+					if self._generation != generation:
+						break
+		finally:
+			dec.close()
@@ -0,0 +1,350 @@
+import os
+import re
+import struct
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from .frame_cache import FrameCache
+
+
+__all__ = [
+	'IMAGE_EXTS',
+	'ImageSequence',
+	'ImageSequenceSource',
+	'SequenceCapture',
+	'open_capture',
+	'read_image',
+]
+
+
+# extensions recognised as frames of an image sequence (case-insensitive)
+IMAGE_EXTS = ('.png', '.tif', '.tiff', '.bmp', '.jpg', '.jpeg', '.pgm', '.ppm', '.pnm', '.npy')
+
+_DIGITS = re.compile(r'(\d+)')
+_PNM_FIELD = re.compile(rb'\s*(?:#[^\n]*\n\s*)*(\d+)')  # header number, skipping comments
+
+
+def _natural_key(name):
+	"""'img_10.png' sorts after 'img_9.png'."""
+	return [int(t) if t.isdigit() else t.lower() for t in _DIGITS.split(name)]
+
+
+def _to_bgr(a):
+	"""Mapped pixel data (gray, RGB or BGR; 8 or 16 bit) -> new contiguous uint8 BGR frame."""
+	if a.dtype != np.uint8:
+		# like cv2.IMREAD_COLOR: keep the high byte
+		a = (a >> (8 * a.dtype.itemsize - 8)).astype(np.uint8)
+	if a.ndim == 2:
+		return cv2.cvtColor(a, cv2.COLOR_GRAY2BGR)
+	return np.array(a, order='C')  # always a copy: the file mapping is not kept open
+
+
+def _map_npy(path):
+	a = np.load(path, mmap_mode='r')
+	if a.ndim == 3 and a.shape[2] == 1:
+		a = a[:, :, 0]
+	return a if a.ndim == 2 or (a.ndim == 3 and a.shape[2] == 3) else None
+
+
+def _map_pnm(path):
+	"""Binary PGM (P5) / PPM (P6)."""
+	with open(path, 'rb') as f:
+		head = f.read(512)
+	if head[:2] not in (b'P5', b'P6'):
+		return None
+	fields = []
+	pos = 2
+	while len(fields) < 3:
+		m = _PNM_FIELD.match(head, pos)
+		if m is None:
+			return None
+		fields.append(int(m.group(1)))
+		pos = m.end()
+	w, h, maxval = fields
+	ch = 1 if head[:2] == b'P5' else 3
+	dtype = np.uint8 if maxval < 256 else np.dtype('>u2')
+	a = np.memmap(path, dtype=dtype, mode='r', offset=pos + 1, shape=(h, w, ch) if ch == 3 else (h, w))
+	return a[:, :, ::-1] if ch == 3 else a  # RGB -> BGR view
+
+
+def _map_bmp(path):
+	"""Uncompressed 24/32-bit BMP (pixels are stored as BGR(A))."""
+	with open(path, 'rb') as f:
+		head = f.read(34)
+	if len(head) < 34 or head[:2] != b'BM':
+		return None
+	offset, = struct.unpack_from('<I', head, 10)
+	w, h, _, bpp, compression = struct.unpack_from('<iiHHI', head, 18)
+	if compression != 0 or bpp not in (24, 32) or w <= 0:
+		return None
+	ch = bpp // 8
+	stride = (w * ch + 3) & ~3
+	rows = np.memmap(path, dtype=np.uint8, mode='r', offset=offset, shape=(abs(h), stride))
+	a = rows[:, :w * ch].reshape(abs(h), w, ch)[:, :, :3]
+	return a[::-1] if h > 0 else a  # positive height: bottom-up rows
+
+
+def _map_tiff(path):
+	"""Uncompressed, chunky, 8/16-bit gray or RGB TIFF whose strips are contiguous (typical camera output)."""
+	with open(path, 'rb') as f:
+		head = f.read(8)
+		if head[:4] not in (b'II*\x00', b'MM\x00*'):
+			return None
+		e = '<' if head[:2] == b'II' else '>'
+		ifd, = struct.unpack(e + 'I', head[4:8])
+		f.seek(ifd)
+		n, = struct.unpack(e + 'H', f.read(2))
+		entries = f.read(12 * n)
+		tags = {}
+		for k in range(n):
+			tag, typ, count, value = struct.unpack_from(e + 'HHI4s', entries, 12 * k)
+			fmt = {3: 'H', 4: 'I'}.get(typ)
+			if fmt is None:
+				continue
+			size = struct.calcsize(fmt) * count
+			if size > 4:
+				f.seek(struct.unpack(e + 'I', value)[0])
+				value = f.read(size)
+			tags[tag] = struct.unpack_from(e + fmt * count, value)
+	get = lambda tag, default=None: tags.get(tag, (default,))[0]
+	w, h = get(256), get(257)
+	bits, spp = get(258, 1), get(277, 1)
+	offsets, counts = tags.get(273), tags.get(279)
+	if (
+		w is None or h is None or offsets is None or counts is None
+		or get(259, 1) != 1 or get(284, 1) != 1 or 322 in tags
+		or bits not in (8, 16) or spp not in (1, 3) or get(262) not in (1, 2)
+	):
+		return None
+	# strips must follow each other so the image is one block
+	if any(offsets[k] + counts[k] != offsets[k + 1] for k in range(len(offsets) - 1)):
+		return None
+	dtype = np.uint8 if bits == 8 else np.dtype(e + 'u2')
+	a = np.memmap(path, dtype=dtype, mode='r', offset=offsets[0], shape=(h, w, spp) if spp == 3 else (h, w))
+	return a[:, :, ::-1] if spp == 3 else a
+
+
+_MAPPERS = {
+	'.npy': _map_npy,
+	'.pgm': _map_pnm,
+	'.ppm': _map_pnm,
+	'.pnm': _map_pnm,
+	'.bmp': _map_bmp,
+	'.tif': _map_tiff,
+	'.tiff': _map_tiff,
+}
+
+
+def read_image(path):
+	"""
+	画像ファイル 1 枚を BGR uint8 のフレームとして読む（読めなければ None）
+	非圧縮の形式（BMP, PGM/PPM, 非圧縮 TIFF, .npy）はメモリマップして直接変換し、それ以外は cv2.imread でデコードする
+	"""
+	mapper = _MAPPERS.get(os.path.splitext(path)[1].lower())
+	if mapper is not None:
+		try:
+			a = mapper(path)
+		except (OSError, ValueError, struct.error):
+			a = None
+		if a is not None:
+			return _to_bgr(a)
+	return cv2.imread(path, cv2.IMREAD_COLOR)
+
+
+class ImageSequence:
+	"""
+	連番画像のディレクトリ（高速度カメラの PNG / TIFF 出力など）を 1 本の動画として扱う
+	ファイル名だけを読んで自然順に並べ（各ファイルを stat しない）、画像は read(i) で初めて読む
+	"""
+
+	def __init__(self, path, fps=30.0, ext=None):
+		self.path = path
+		self.fps = fps
+		names = []
+		with os.scandir(path) as it:
+			for entry in it:
+				e = os.path.splitext(entry.name)[1].lower()
+				if e in IMAGE_EXTS and not entry.name.startswith('.'):
+					names.append(entry.name)
+		names.sort(key=_natural_key)
+		# one extension only (the first frame's), so stray previews or exports are not frames
+		self.ext = ext or (os.path.splitext(names[0])[1].lower() if names else None)
+		self.names = [n for n in names if os.path.splitext(n)[1].lower() == self.ext]
+		self._size = None
+
+	def __len__(self):
+		return len(self.names)
+
+	def file(self, i):
+		return os.path.join(self.path, self.names[i])
+
+	@property
+	def size(self):
+		"""(w, h) of the first frame (read on first use), or None."""
+		if self._size is None and self.names:
+			frame = self.read(0)
+			if frame is not None:
+				self._size = (frame.shape[1], frame.shape[0])
+		return self._size
+
+	def read(self, i):
+		"""Frame i as a new BGR array, or None."""
+		if not 0 <= i < len(self.names):
+			return None
+		return read_image(self.file(i))
+
+
+class SequenceCapture:
+	"""
+	ImageSequence を cv2.VideoCapture と同じ呼び方で読む（このパッケージで使う read / grab / set / get のみ）
+	"""
+
+	def __init__(self, seq):
+		self.seq = seq
+		self._pos = 0
+
+	def isOpened(self):
+		return self.seq is not None and len(self.seq) > 0
+
+	def read(self):
+		frame = self.seq.read(self._pos) if self.seq is not None else None
+		if frame is None:
+			return False, None
+		self._pos += 1
+		return True, frame
+
+	def grab(self):
+		if self.seq is None or self._pos >= len(self.seq):
+			return False
+		self._pos += 1
+		return True
+
+	def set(self, prop, value):
+		if prop == cv2.CAP_PROP_POS_FRAMES:
+			self._pos = max(0, int(value))
+			return True
+		return False
+
+	def get(self, prop):
+		size = self.seq.size or (0, 0)
+		return {
+			cv2.CAP_PROP_FRAME_WIDTH: size[0],
+			cv2.CAP_PROP_FRAME_HEIGHT: size[1],
+			cv2.CAP_PROP_FRAME_COUNT: len(self.seq),
+			cv2.CAP_PROP_FPS: self.seq.fps,
+			cv2.CAP_PROP_POS_FRAMES: self._pos,
+		}.get(prop, 0.0)
+
+	def release(self):
+		self.seq = None
+
+
+def open_capture(path):
+	"""cv2.VideoCapture for video files, SequenceCapture for a directory of images."""
+	if os.path.isdir(path):
+		return SequenceCapture(ImageSequence(path))
+	return cv2.VideoCapture(path)
+
+
+class ImageSequenceSource:
+	"""
+	連番画像のディレクトリからのフレーム取得 (VideoSource と同じインターフェース)
+	画像は 1 枚ずつ独立に読めるので、現在のフレームの前後をスレッドプールで並列に先読みしてキャッシュに入れる
+	"""
+
+	def __init__(self, path, cache_mb=512, n_next=8, n_prev=4, fps=30.0, workers=None):
+		self.path = path
+		self.seq = ImageSequence(path, fps)
+		if len(self.seq) == 0:
+			raise OSError(f'No images in {path}')
+		self.size = self.seq.size
+		if self.size is None:
+			raise OSError(f'Unable to read {self.seq.file(0)}')
+		self.fps = fps
+		self.codec = self.seq.ext.lstrip('.').upper()
+		self.stats = None  # PerfStats receiving 'decode' times of read()
+		self.lock = threading.Lock()
+		self.cache = FrameCache(cache_mb)
+		self.seek_index = None  # every frame is a keyframe
+		self.readahead = None
+		self.frame_count = len(self.seq)
+		self.n_next = n_next
+		self.n_prev = n_prev
+		# image decoders release the GIL, so threads decode in parallel
+		self._pool = ThreadPoolExecutor(workers or min(8, os.cpu_count() or 1), thread_name_prefix='ImageSequence')
+		self._pending = {}  # idx -> Future of a read-ahead decode
+		self._closed = False
+
+	def __len__(self):
+		return self.frame_count
+
+	@property
+	def indexing(self):
+		return False
+
+	@property
+	def pending(self):
+		return False
+
+	def take_index(self):
+		return None
+
+	def cached(self, idx):
+		"""Frame idx if it is already decoded (no decoding), else None."""
+		frame = self.cache.get(idx)
+		if frame is not None:
+			self._read_ahead(idx)
+		return frame
+
+	def read(self, idx, background=False):
+		"""
+		Return frame idx (read-only), from the cache or a running read-ahead when possible; None if unreadable.
+		background=True: not timed into stats (like the read-ahead decodes).
+		"""
+		frame = self.cache.get(idx)
+		if frame is None:
+			stats = None if background else self.stats
+			with self.lock:
+				future = self._pending.get(idx)
+			try:
+				frame = future.result() if future is not None else self._decode(idx, stats)
+			except CancelledError:
+				frame = self._decode(idx, stats)
+		self._read_ahead(idx)
+		return frame
+
+	def _decode(self, idx, stats=None):
+		t0 = time.perf_counter()
+		frame = self.seq.read(idx)
+		if stats is not None:
+			stats.add('decode', time.perf_counter() - t0)
+		self.cache.put(idx, frame)
+		return frame
+
+	def _read_ahead(self, center):
+		"""Queue decodes of the frames around center (nearest first); drop queued ones that left the window."""
+		if self._closed:
+			return
+		wanted = list(range(center + 1, min(self.frame_count, center + 1 + self.n_next)))
+		wanted += range(center - 1, max(-1, center - 1 - self.n_prev), -1)
+		with self.lock:
+			keep = set(wanted)
+			for i, future in list(self._pending.items()):
+				if future.done() or (i not in keep and future.cancel()):
+					del self._pending[i]
+			for i in wanted:
+				if i not in self._pending and i not in self.cache:
+					self._pending[i] = self._pool.submit(self._decode, i)
+
+	def close(self):
+		self._closed = True
+		with self.lock:
+			for future in self._pending.values():
+				future.cancel()
+			self._pending.clear()
+		self._pool.shutdown(wait=True)
+		self.cache.clear()
@@ -0,0 +1,288 @@
+import glob
+import json
+import os
+import shutil
+import struct
+import threading
+
+import numpy as np
+
+from .calibration import Calibration
+from .point_store import PointStore
+
+
+__all__ = [
+	'EditJournal',
+	'SessionState',
+	'session_dir',
+]
+
+
+# <video>.session/
+#   snapshot.mat          state at generation S (coords_raw / coords_real + calibration)
+#   journal-<gen>.bin     edits made after snapshot <gen>
+#   saved                 present while the journaled state equals the last saved result file
+# recovery = snapshot S + replay of every journal with gen >= S, in order
+_MAGIC = b'CKJ1'
+_FILE_HEADER = struct.Struct('<4sIq')  # magic, version, n_frames
+_REC_HEADER = struct.Struct('<BI')  # op, payload length
+_ADD = struct.Struct('<qdddd')  # frame, x, y, real_x, real_y
+_DEL = struct.Struct('<qI')  # frame, position within the frame
+OP_ADD = 1
+OP_DEL = 2
+OP_CALIB = 3  # JSON payload; "null" clears the calibration
+
+
+def session_dir(video_path):
+	return video_path + '.session'
+
+
+def _journal_path(directory, gen):
+	return os.path.join(directory, f'journal-{gen:06d}.bin')
+
+
+def _journal_gens(directory):
+	gens = []
+	for p in glob.glob(os.path.join(directory, 'journal-*.bin')):
+		try:
+			gens.append(int(os.path.basename(p)[8:-4]))
+		except ValueError:
+			pass
+	return sorted(gens)
+
+
+class SessionState:
+	"""Recovered annotation state: points plus the calibration in effect."""
+
+	def __init__(self, n_frames):
+		self.points = PointStore(n_frames)
+		self.calibration = None
+		self.calib_img = []
+		self.calib_real = []
+		self.n_edits = 0
+
+	def apply_calibration(self, payload):
+		if payload is None:
+			# like the GUI: real coords keep their values until the next calibration
+			self.calibration = None
+			self.calib_img = []
+			self.calib_real = []
+			return
+		self.calibration = Calibration.from_dict(payload)
+		self.calib_img = [tuple(p) for p in payload.get('img', [])]
+		self.calib_real = [tuple(p) for p in payload.get('real', [])]
+		raw, rows = self.points.all_raw()
+		self.points.set_real_rows(rows, self.calibration.apply(raw))
+
+
+def _calib_payload(calibration, calib_img, calib_real):
+	if calibration is None:
+		return None
+	d = calibration.to_dict()
+	d['img'] = [list(map(float, p)) for p in calib_img]
+	d['real'] = [list(map(float, p)) for p in calib_real]
+	return d
+
+
+class EditJournal:
+	"""
+	追加・削除・キャリブレーションの操作を動画の隣のバイナリジャーナルに逐次追記する (1操作 O(1))
+	compact() で現在の状態を .mat スナップショットとしてバックグラウンドで書き出し、
+	スナップショットに含まれたジャーナルを削除する。recover() で直前のセッションを復元する
+	"""
+
+	def __init__(self, video_path, n_frames):
+		self.dir = session_dir(video_path)
+		self.n_frames = int(n_frames)
+		self.pending = 0  # records written since the last compaction
+		self.saved = False  # True until the next edit after mark_saved()
+		self._file = None
+		self._gen = 0
+		self._compactor = None
+		self.error = None  # OSError of the last background snapshot, raised by the next compact()
+
+	# --- recovery ---
+
+	def has_session(self):
+		return os.path.isdir(self.dir) and (
+			os.path.exists(os.path.join(self.dir, 'snapshot.mat'))
+			or any(os.path.getsize(_journal_path(self.dir, g)) > _FILE_HEADER.size for g in _journal_gens(self.dir))
+		)
+
+	def unsaved(self):
+		"""True if the stored session holds edits that are not in a saved result file."""
+		return self.has_session() and not os.path.exists(os.path.join(self.dir, 'saved'))
+
+	def recover(self):
+		"""Rebuild the last session state from the snapshot and journals (None if there is none)."""
+		if not os.path.isdir(self.dir):
+			return None
+		state = SessionState(self.n_frames)
+		snap_gen = 0
+		snap = os.path.join(self.dir, 'snapshot.mat')
+		if os.path.exists(snap):
+			from scipy.io import loadmat
+			data = loadmat(snap)
+			snap_gen = int(data['journal_generation'].ravel()[0])
+			state.points = PointStore.from_ragged(data['coords_raw'][0], data['coords_real'][0])
+			state.points.set_n_frames(self.n_frames)
+			calib = json.loads(str(data['calibration'][0])) if 'calibration' in data else None
+			if calib is not None:
+				state.calibration = Calibration.from_dict(calib)
+				state.calib_img = [tuple(p) for p in calib.get('img', [])]
+				state.calib_real = [tuple(p) for p in calib.get('real', [])]
+		for gen in _journal_gens(self.dir):
+			if gen >= snap_gen:
+				self._replay(_journal_path(self.dir, gen), state)
+		self._gen = max([snap_gen] + _journal_gens(self.dir))
+		return state
+
+	def _replay(self, path, state):
+		with open(path, 'rb') as f:
+			data = f.read()
+		if len(data) < _FILE_HEADER.size or data[:4] != _MAGIC:
+			return
+		pos = _FILE_HEADER.size
+		while pos + _REC_HEADER.size <= len(data):
+			op, n = _REC_HEADER.unpack_from(data, pos)
+			start = pos + _REC_HEADER.size
+			if start + n > len(data):
+				break  # torn last record (crash while writing)
+			payload = data[start:start + n]
+			pos = start + n
+			try:
+				if op == OP_ADD:
+					frame, x, y, rx, ry = _ADD.unpack(payload)
+					state.points.append(frame, (x, y), (rx, ry))
+				elif op == OP_DEL:
+					frame, k = _DEL.unpack(payload)
+					state.points.delete(frame, k)
+				elif op == OP_CALIB:
+					state.apply_calibration(json.loads(payload.decode('utf-8')))
+			except (IndexError, ValueError):
+				continue  # edit outside the current video (frame count changed)
+			state.n_edits += 1
+
+	def discard(self):
+		"""Delete the stored session (snapshot and journals)."""
+		self.close()
+		shutil.rmtree(self.dir, ignore_errors=True)
+		self._gen = 0
+
+	# --- writing ---
+
+	def open(self):
+		"""Start appending to a new journal generation."""
+		os.makedirs(self.dir, exist_ok=True)
+		self._gen += 1
+		self._file = open(_journal_path(self.dir, self._gen), 'ab')
+		if self._file.tell() == 0:
+			self._file.write(_FILE_HEADER.pack(_MAGIC, 1, self.n_frames))
+			self._file.flush()
+
+	def close(self):
+		if self._compactor is not None:
+			self._compactor.join()
+			self._compactor = None
+		if self._file is not None:
+			self._file.flush()
+			os.fsync(self._file.fileno())
+			self._file.close()
+			self._file = None
+
+	def mark_saved(self):
+		"""Record that the current state was saved; the next edit makes the session unsaved again."""
+		if not os.path.isdir(self.dir):
+			return
+		with open(os.path.join(self.dir, 'saved'), 'w'):
+			pass
+		self.saved = True
+
+	def _write(self, op, payload):
+		if self._file is None:
+			return
+		if self.saved:
+			self.saved = False
+			try:
+				os.remove(os.path.join(self.dir, 'saved'))
+			except FileNotFoundError:
+				pass
+		self._file.write(_REC_HEADER.pack(op, len(payload)) + payload)
+		# flushed to the OS so a crash of this process loses nothing
+		self._file.flush()
+		self.pending += 1
+
+	def log_add(self, frame, raw_xy, real_xy):
+		rx, ry = (np.nan, np.nan) if real_xy is None else real_xy
+		self._write(OP_ADD, _ADD.pack(int(frame), float(raw_xy[0]), float(raw_xy[1]), float(rx), float(ry)))
+
+	def log_delete(self, frame, k):
+		self._write(OP_DEL, _DEL.pack(int(frame), int(k)))
+
+	def log_calibration(self, calibration, calib_img=(), calib_real=()):
+		payload = _calib_payload(calibration, calib_img, calib_real)
+		self._write(OP_CALIB, json.dumps(payload).encode('utf-8'))
+
+	# --- compaction ---
+
+	@property
+	def compacting(self):
+		return self._compactor is not None and self._compactor.is_alive()
+
+	def compact(self, points, calibration=None, calib_img=(), calib_real=()):
+		"""
+		Snapshot the current state to snapshot.mat in a background thread.
+		Must be called from the thread that writes the journal; returns False if a
+		compaction is still running or there is nothing new.
+		Raises the OSError of a failed previous snapshot (its journals are kept, so nothing is lost).
+		"""
+		if self.compacting:
+			return False
+		if self.error is not None:
+			error, self.error = self.error, None
+			raise error
+		if self._file is None or self.pending == 0:
+			return False
+		# cheap copies on the caller's thread; the ragged conversion and savemat run in the background
+		frame_idx, raw, real, _ = points.flat()
+		n_frames = points.n_frames
+		calib = _calib_payload(calibration, calib_img, calib_real)
+		# edits from now on go to the next generation; the snapshot covers everything before
+		self._file.close()
+		self._file = None
+		self.open()
+		self.pending = 0
+		gen = self._gen
+		self._compactor = threading.Thread(
+			target=self._write_snapshot, args=(gen, n_frames, frame_idx, raw, real, calib),
+			name='JournalCompactor', daemon=True,
+		)
+		self._compactor.start()
+		return True
+
+	def _write_snapshot(self, gen, n_frames, frame_idx, raw, real, calib):
+		from scipy.io import savemat
+		coords_raw, coords_real = PointStore.from_flat(n_frames, frame_idx, raw, real).to_ragged()
+		tmp = os.path.join(self.dir, 'snapshot.tmp.mat')
+		try:
+			savemat(tmp, {
+				'coords_raw': coords_raw,
+				'coords_real': coords_real,
+				'journal_generation': gen,
+				'calibration': json.dumps(calib),
+			})
+			os.replace(tmp, os.path.join(self.dir, 'snapshot.mat'))
+		except OSError as e:
+			# disk full / no permission: keep the previous snapshot and all journals
+			self.error = e
+			try:
+				os.remove(tmp)
+			except OSError:
+				pass
+			return
+		for g in _journal_gens(self.dir):
+			if g < gen:
+				try:
+					os.remove(_journal_path(self.dir, g))
+				except OSError as e:
+					self.error = e
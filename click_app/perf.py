@@ -0,0 +1,146 @@
+import csv
+import json
+import os
+import platform
+import threading
+import time
+from array import array
+from collections import deque
+
+import numpy as np
+
+
+__all__ = [
+	'PerfStats',
+]
+
+
+class PerfStats:
+	"""
+	段階ごとの処理時間の記録（スレッドセーフ）
+	add(stage, seconds) で記録し、直近 window 件のパーセンタイルを HUD 用に、
+	セッション全体のサンプル（最大 max_samples 件/段階）を CSV / JSON 書き出し用に保持する
+	"""
+
+	# display order; other stage names are accepted and listed after these
+	STAGES = ('seek', 'decode', 'resize', 'color', 'photo', 'canvas', 'overlay_items', 'latency', 'click_add', 'click_del')
+
+	def __init__(self, window=300, max_samples=200000, enabled=True):
+		self.window = window
+		self.max_samples = max_samples
+		self.enabled = enabled
+		self.t0 = time.perf_counter()
+		self._lock = threading.Lock()
+		self._recent = {}
+		self._t = {}  # session samples: seconds since t0
+		self._ms = {}
+		self.dropped = 0  # samples not kept because max_samples was reached
+
+	def add(self, stage, seconds):
+		if not self.enabled:
+			return
+		now = time.perf_counter() - self.t0
+		ms = seconds * 1e3
+		with self._lock:
+			recent = self._recent.get(stage)
+			if recent is None:
+				recent = self._recent[stage] = deque(maxlen=self.window)
+				self._t[stage] = array('d')
+				self._ms[stage] = array('d')
+			recent.append(ms)
+			if len(self._ms[stage]) < self.max_samples:
+				self._t[stage].append(now)
+				self._ms[stage].append(ms)
+			else:
+				self.dropped += 1
+
+	def _ordered(self, names):
+		return [s for s in self.STAGES if s in names] + sorted(s for s in names if s not in self.STAGES)
+
+	def stages(self):
+		with self._lock:
+			names = list(self._recent)
+		return self._ordered(names)
+
+	def percentiles(self, stage, q=(50, 95, 99), recent=True):
+		"""Percentiles in ms of the rolling window (recent=True) or of the whole session."""
+		with self._lock:
+			src = self._recent.get(stage) if recent else self._ms.get(stage)
+			data = np.array(src if src is not None else [], dtype=np.float64)
+		if len(data) == 0:
+			return None
+		return np.percentile(data, q)
+
+	def summary(self):
+		"""{stage: {count, mean, p50, p95, p99, max}} over the whole session (ms)."""
+		out = {}
+		for stage in self.stages():
+			with self._lock:
+				data = np.array(self._ms.get(stage, ()), dtype=np.float64)
+			if len(data) == 0:
+				continue
+			p50, p95, p99 = np.percentile(data, (50, 95, 99))
+			out[stage] = {
+				'count': int(len(data)),
+				'mean': float(data.mean()),
+				'p50': float(p50),
+				'p95': float(p95),
+				'p99': float(p99),
+				'max': float(data.max()),
+			}
+		return out
+
+	def hud_text(self):
+		lines = [f'{"stage":<10}{"p50":>7}{"p95":>7}{"p99":>7}  ms']
+		# one consistent copy of the windows: the decode / read-ahead threads keep adding, clear() may run
+		with self._lock:
+			windows = {stage: np.array(recent, dtype=np.float64) for stage, recent in self._recent.items()}
+		for stage in self._ordered(windows):
+			data = windows[stage]
+			if len(data) == 0:
+				continue
+			p = np.percentile(data, (50, 95, 99))
+			lines.append(f'{stage:<10}{p[0]:>7.2f}{p[1]:>7.2f}{p[2]:>7.2f}  (n={len(data)})')
+		return '\n'.join(lines)
+
+	def clear(self):
+		with self._lock:
+			self._recent.clear()
+			self._t.clear()
+			self._ms.clear()
+			self.dropped = 0
+			self.t0 = time.perf_counter()
+
+	@staticmethod
+	def machine_info():
+		import cv2
+		return {
+			'platform': platform.platform(),
+			'python': platform.python_version(),
+			'processor': platform.processor() or platform.machine(),
+			'cpu_count': os.cpu_count(),
+			'opencv': cv2.__version__,
+		}
+
+	def save(self, path, meta=None):
+		"""
+		.csv: one row per sample (stage, t_s, ms), meta as leading '#' comment lines.
+		.json: meta + machine info + session summary + all samples.
+		"""
+		meta = dict(meta or {})
+		meta.setdefault('machine', self.machine_info())
+		meta.setdefault('saved', time.strftime('%Y-%m-%dT%H:%M:%S'))
+		if path.lower().endswith('.csv'):
+			with open(path, 'w', newline='', encoding='utf-8') as f:
+				f.write(f'# {json.dumps(meta)}\n')
+				w = csv.writer(f)
+				w.writerow(['stage', 't_s', 'ms'])
+				for stage in self.stages():
+					with self._lock:
+						rows = list(zip(self._t.get(stage, ()), self._ms.get(stage, ())))
+					w.writerows((stage, f'{t:.6f}', f'{ms:.4f}') for t, ms in rows)
+			return
+		with self._lock:
+			samples = {s: {'t_s': list(self._t[s]), 'ms': list(self._ms[s])} for s in self._t}
+		with open(path, 'w', encoding='utf-8') as f:
+			json.dump({'meta': meta, 'summary': self.summary(), 'dropped': self.dropped, 'samples': samples}, f)
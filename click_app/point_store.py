@@ -0,0 +1,218 @@
+import numpy as np
+
+
+__all__ = [
+	'PointStore',
+]
+
+
+class PointStore:
+	"""
+	クリック点の列指向ストア
+	全フレームの点を連続した float64 配列 (raw / real) とフレーム番号の配列に保持する
+	追加は償却 O(1)、削除は墓標 (alive=False) を立てるだけで、墓標が半分を超えたら詰め直す
+	フレーム単位の参照は点のあるフレームだけが持つ行番号リスト、一括処理は CSR (offsets) を使う
+	"""
+
+	_INITIAL_CAPACITY = 256
+
+	def __init__(self, n_frames=0):
+		self.n_frames = int(n_frames)
+		self._raw = np.empty((self._INITIAL_CAPACITY, 2), dtype=np.float64)
+		self._real = np.empty((self._INITIAL_CAPACITY, 2), dtype=np.float64)
+		self._frame = np.empty(self._INITIAL_CAPACITY, dtype=np.int64)
+		self._alive = np.zeros(self._INITIAL_CAPACITY, dtype=bool)
+		self._n = 0  # rows used (alive or not)
+		self._n_alive = 0
+		self._rows = {}  # frame -> row indices in click order (only frames with points)
+		self._csr = None  # cached (rows in frame-major order, offsets)
+
+	def __len__(self):
+		return self._n_alive
+
+	# --- per-frame access ---
+
+	def count(self, frame):
+		return len(self._rows.get(frame, ()))
+
+	def raw(self, frame):
+		"""(k, 2) array of raw image coordinates of frame, in click order."""
+		return self._raw[self._rows.get(frame, [])]
+
+	def real(self, frame):
+		"""(k, 2) array of real-world coordinates of frame (NaN when uncalibrated)."""
+		return self._real[self._rows.get(frame, [])]
+
+	def frames_with_points(self):
+		return sorted(self._rows)
+
+	# --- editing ---
+
+	def _grow(self):
+		cap = len(self._frame) * 2
+		for name in ('_raw', '_real', '_frame', '_alive'):
+			old = getattr(self, name)
+			new = np.zeros((cap,) + old.shape[1:], dtype=old.dtype)
+			new[:self._n] = old[:self._n]
+			setattr(self, name, new)
+
+	def append(self, frame, raw_xy, real_xy=None):
+		"""Add a point to frame; returns its position within the frame."""
+		if not 0 <= frame < self.n_frames:
+			raise IndexError(f'frame {frame} out of range (0-{self.n_frames - 1})')
+		if self._n == len(self._frame):
+			self._grow()
+		r = self._n
+		self._raw[r] = raw_xy
+		self._real[r] = (np.nan, np.nan) if real_xy is None else real_xy
+		self._frame[r] = frame
+		self._alive[r] = True
+		self._n += 1
+		self._n_alive += 1
+		rows = self._rows.setdefault(frame, [])
+		rows.append(r)
+		self._csr = None
+		return len(rows) - 1
+
+	def delete(self, frame, k):
+		"""Remove the k-th point of frame; returns (raw_xy, real_xy) as lists."""
+		rows = self._rows.get(frame)
+		if not rows or not 0 <= k < len(rows):
+			raise IndexError(f'no point {k} on frame {frame}')
+		r = rows.pop(k)
+		if not rows:
+			del self._rows[frame]
+		self._alive[r] = False
+		self._n_alive -= 1
+		self._csr = None
+		removed = (self._raw[r].tolist(), self._real[r].tolist())
+		if self._n > self._INITIAL_CAPACITY and self._n_alive < self._n // 2:
+			self._compact()
+		return removed
+
+	def nearest(self, frame, x, y):
+		"""Position within frame of the point closest to (x, y), or None."""
+		pts = self.raw(frame)
+		if len(pts) == 0:
+			return None
+		return int(np.argmin(np.hypot(pts[:, 0] - x, pts[:, 1] - y)))
+
+	def set_n_frames(self, n_frames):
+		"""Change the frame count; points on frames >= n_frames are dropped."""
+		for f in [f for f in self._rows if f >= n_frames]:
+			for r in self._rows.pop(f):
+				self._alive[r] = False
+				self._n_alive -= 1
+		self.n_frames = int(n_frames)
+		self._csr = None
+
+	def clear(self, n_frames=None):
+		self.__init__(self.n_frames if n_frames is None else n_frames)
+
+	def _compact(self):
+		order, offsets = self.csr()
+		n = len(order)
+		for name in ('_raw', '_real', '_frame'):
+			old = getattr(self, name)
+			new = np.zeros((max(n * 2, self._INITIAL_CAPACITY),) + old.shape[1:], dtype=old.dtype)
+			new[:n] = old[order]
+			setattr(self, name, new)
+		self._alive = np.zeros(len(self._frame), dtype=bool)
+		self._alive[:n] = True
+		self._n = n
+		self._rows = {}
+		for f in np.flatnonzero(np.diff(offsets)):
+			self._rows[int(f)] = list(range(offsets[f], offsets[f + 1]))
+		self._csr = (np.arange(n), offsets)
+
+	# --- bulk (CSR) access ---
+
+	def csr(self):
+		"""
+		(rows, offsets): row indices of all points in frame-major, click order and
+		offsets of length n_frames + 1 so that frame i owns rows[offsets[i]:offsets[i+1]].
+		"""
+		if self._csr is None:
+			# rows of one frame are always increasing in click order, so a stable sort suffices
+			alive = np.flatnonzero(self._alive[:self._n])
+			rows = alive[np.argsort(self._frame[alive], kind='stable')]
+			counts = np.bincount(self._frame[rows], minlength=self.n_frames)
+			offsets = np.zeros(self.n_frames + 1, dtype=np.int64)
+			np.cumsum(counts, out=offsets[1:])
+			self._csr = (rows, offsets)
+		return self._csr
+
+	def flat(self):
+		"""Frame-major flat columns: (frame_idx, raw (N, 2), real (N, 2), offsets)."""
+		rows, offsets = self.csr()
+		return self._frame[rows], self._raw[rows], self._real[rows], offsets
+
+	def all_raw(self):
+		"""Raw coordinates of every stored point (any order) and the row indices."""
+		rows = np.flatnonzero(self._alive[:self._n])
+		return self._raw[rows], rows
+
+	def set_real_rows(self, rows, real):
+		"""Overwrite real coordinates for rows (as returned by all_raw)."""
+		self._real[rows] = real
+
+	# --- ragged (legacy) layout ---
+
+	def to_ragged(self):
+		"""
+		coords_raw, coords_real as 1-D object arrays of per-frame (k, 2) float64 arrays,
+		the layout written to .mat files (empty frames are (0, 2)).
+		"""
+		_, raw, real, offsets = self.flat()
+		coords_raw = np.empty(self.n_frames, dtype=object)
+		coords_real = np.empty(self.n_frames, dtype=object)
+		for i in range(self.n_frames):
+			a, b = offsets[i], offsets[i + 1]
+			coords_raw[i] = raw[a:b]
+			coords_real[i] = real[a:b]
+		return coords_raw, coords_real
+
+	@classmethod
+	def from_flat(cls, n_frames, frame_idx, raw, real=None):
+		"""Build a store from flat columns; rows of one frame are taken in the given (click) order."""
+		frame_idx = np.asarray(frame_idx, dtype=np.int64)
+		n = len(frame_idx)
+		store = cls(n_frames)
+		if n and (frame_idx.min() < 0 or frame_idx.max() >= n_frames):
+			raise IndexError('frame index out of range')
+		order = np.argsort(frame_idx, kind='stable')
+		frame_idx = frame_idx[order]
+		raw = np.asarray(raw, dtype=np.float64).reshape(n, 2)[order]
+		if real is not None:
+			real = np.asarray(real, dtype=np.float64).reshape(n, 2)[order]
+		cap = max(n * 2, cls._INITIAL_CAPACITY)
+		store._raw = np.zeros((cap, 2), dtype=np.float64)
+		store._real = np.full((cap, 2), np.nan, dtype=np.float64)
+		store._frame = np.zeros(cap, dtype=np.int64)
+		store._alive = np.zeros(cap, dtype=bool)
+		store._raw[:n] = raw
+		if real is not None:
+			store._real[:n] = real
+		store._frame[:n] = frame_idx
+		store._alive[:n] = True
+		store._n = store._n_alive = n
+		counts = np.bincount(frame_idx, minlength=n_frames)
+		offsets = np.zeros(n_frames + 1, dtype=np.int64)
+		np.cumsum(counts, out=offsets[1:])
+		for f in np.flatnonzero(counts):
+			store._rows[int(f)] = list(range(offsets[f], offsets[f + 1]))
+		return store
+
+	@classmethod
+	def from_ragged(cls, coords_raw, coords_real=None):
+		"""Build a store from per-frame sequences of [x, y] (e.g. load_click_mat output)."""
+		raw = [np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in coords_raw]
+		counts = np.array([len(p) for p in raw], dtype=np.int64)
+		frame_idx = np.repeat(np.arange(len(raw)), counts)
+		flat_raw = np.concatenate(raw) if len(raw) else np.zeros((0, 2))
+		flat_real = None
+		if coords_real is not None:
+			real = [np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in coords_real]
+			if [len(p) for p in real] == counts.tolist():
+				flat_real = np.concatenate(real) if len(real) else np.zeros((0, 2))
+		return cls.from_flat(len(raw), frame_idx, flat_raw, flat_real)
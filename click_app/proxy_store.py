@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import cv2
+import numpy as np
+
+from .image_sequence import open_capture
+
+
+__all__ = [
+	'ProxyStore',
+	'default_proxy_dir',
+]
+
+
+def default_proxy_dir():
+	return os.path.join(tempfile.gettempdir(), 'click_app_proxy')
+
+
+class ProxyStore:
+	"""
+	低解像度プロキシ: 全フレームを縮小・非圧縮でメモリマップした .npy に書き出す
+	書き出しはバックグラウンドで先頭から順に行い、書き終わったフレームは
+	デコードなしの O(1) スライスで取得できる
+	"""
+
+	def __init__(self, video_path, frame_count, max_side=960, cache_dir=None):
+		self.video_path = video_path
+		self.max_side = max_side
+		self.cache_dir = cache_dir or default_proxy_dir()
+		st = os.stat(video_path)
+		key = f'{os.path.abspath(video_path)}|{st.st_size}|{st.st_mtime_ns}|{max_side}'
+		name = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+		self.data_path = os.path.join(self.cache_dir, name + '.npy')
+		self.meta_path = os.path.join(self.cache_dir, name + '.json')
+		self.frame_count = frame_count
+		self.size = None  # (w, h) of proxy frames
+		self.frames = None
+		self.ready = 0  # frames [0, ready) are written
+		self.error = None
+		self._stop = threading.Event()
+		self._thread = None
+
+	@property
+	def done(self):
+		return self._thread is None or not self._thread.is_alive()
+
+	def start(self):
+		"""Open a finished store from disk or start transcoding in the background."""
+		meta = self._read_meta()
+		if meta is not None and meta.get('complete'):
+			try:
+				self.frames = np.load(self.data_path, mmap_mode='r')
+				self.ready = int(meta['frames'])
+				self.size = (self.frames.shape[2], self.frames.shape[1])
+				return
+			except (OSError, ValueError):
+				pass
+		self._thread = threading.Thread(target=self._run, name='ProxyStore', daemon=True)
+		self._thread.start()
+
+	def close(self):
+		self._stop.set()
+		if self._thread is not None:
+			self._thread.join(timeout=2.0)
+		self.frames = None
+
+	def get(self, idx):
+		"""Proxy frame idx as a read-only view, or None if it is not written yet."""
+		if self.frames is None or not 0 <= idx < self.ready:
+			return None
+		frame = self.frames[idx]
+		# while transcoding the store is mapped 'w+'; readers must not write through it
+		frame.flags.writeable = False
+		return frame
+
+	def _read_meta(self):
+		try:
+			with open(self.meta_path, 'r', encoding='utf-8') as f:
+				return json.load(f)
+		except (OSError, ValueError):
+			return None
+
+	def _proxy_size(self, w, h):
+		s = min(1.0, self.max_side / max(w, h))
+		return max(1, int(round(w * s))), max(1, int(round(h * s)))
+
+	def _run(self):
+		cap = open_capture(self.video_path)
+		try:
+			if not cap.isOpened():
+				self.error = 'Unable to open video'
+				return
+			w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+			h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+			pw, ph = self._proxy_size(w, h)
+			nbytes = self.frame_count * pw * ph * 3
+			os.makedirs(self.cache_dir, exist_ok=True)
+			if shutil.disk_usage(self.cache_dir).free < nbytes * 1.1:
+				self.error = f'Not enough disk space for proxy ({nbytes / 1e9:.1f} GB)'
+				return
+			frames = np.lib.format.open_memmap(self.data_path, mode='w+', dtype=np.uint8, shape=(self.frame_count, ph, pw, 3))
+			self.size = (pw, ph)
+			self.frames = frames
+			n = 0
+			while n < self.frame_count and not self._stop.is_set():
+				ok, frame = cap.read()
+				if not ok:
+					break
+				cv2.resize(frame, (pw, ph), dst=frames[n], interpolation=cv2.INTER_AREA)
+				n += 1
+				self.ready = n
+			frames.flush()
+			if not self._stop.is_set():
+				with open(self.meta_path, 'w', encoding='utf-8') as f:
+					json.dump({'video': os.path.abspath(self.video_path), 'frames': n, 'complete': True}, f)
+		except OSError as e:
+			self.error = str(e)
+		finally:
+			cap.release()
@@ -0,0 +1,189 @@
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+__all__ = [
+	'SeekIndex',
+	'SeekIndexBuilder',
+	'sidecar_path',
+]
+
+
+INDEX_VERSION = 1
+
+
+def sidecar_path(video_path):
+	"""動画ファイルの隣に置くインデックスファイルのパス"""
+	return video_path + '.seekidx.npz'
+
+
+def _file_key(video_path):
+	st = os.stat(video_path)
+	return int(st.st_size), int(st.st_mtime_ns)
+
+
+class SeekIndex:
+	"""
+	キーフレーム位置と各フレームの実タイムスタンプ (ms) のインデックス
+	ランダムアクセス時は直前のキーフレームへシークしてから目的のフレームまで順にデコードする
+	"""
+
+	def __init__(self, timestamps, keyframes):
+		self.timestamps = np.asarray(timestamps, dtype=np.float64)
+		self.keyframes = np.asarray(keyframes, dtype=np.int64)
+
+	@property
+	def frame_count(self):
+		return len(self.timestamps)
+
+	@classmethod
+	def build(cls, video_path, cancel=None):
+		"""
+		Scan the container once and return a SeekIndex (None if cancelled or unreadable).
+		Packets are read without decoding when the FFmpeg backend allows it.
+		"""
+		cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_FORMAT, -1])
+		raw = cap.isOpened() and hasattr(cv2, 'CAP_PROP_LRF_HAS_KEY_FRAME')
+		if not raw:
+			cap.release()
+			cap = cv2.VideoCapture(video_path)
+			if not cap.isOpened():
+				return None
+		pts = []
+		is_key = []
+		try:
+			while cap.grab():
+				if cancel is not None and cancel.is_set():
+					return None
+				pts.append(cap.get(cv2.CAP_PROP_POS_MSEC))
+				is_key.append(bool(cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME)) if raw else False)
+		finally:
+			cap.release()
+		if not pts:
+			return None
+		# packets arrive in decode order; presentation order is the order of timestamps
+		order = np.argsort(np.asarray(pts), kind='stable')
+		timestamps = np.asarray(pts)[order]
+		if raw:
+			keyframes = np.flatnonzero(np.asarray(is_key)[order])
+		else:
+			# keyframes unknown: seek straight to every frame (still verified by timestamp)
+			keyframes = np.arange(len(timestamps))
+		if len(keyframes) == 0 or keyframes[0] != 0:
+			keyframes = np.concatenate([[0], keyframes])
+		return cls(timestamps, keyframes)
+
+	@classmethod
+	def load(cls, video_path):
+		"""Load the sidecar index, or return None if it is missing or stale."""
+		path = sidecar_path(video_path)
+		if not os.path.exists(path):
+			return None
+		try:
+			with np.load(path) as data:
+				if int(data['version']) != INDEX_VERSION:
+					return None
+				if tuple(int(v) for v in data['file_key']) != _file_key(video_path):
+					return None
+				return cls(data['timestamps'], data['keyframes'])
+		except Exception:
+			return None
+
+	def save(self, video_path):
+		np.savez(
+			sidecar_path(video_path),
+			version=INDEX_VERSION,
+			file_key=np.array(_file_key(video_path), dtype=np.int64),
+			timestamps=self.timestamps,
+			keyframes=self.keyframes,
+		)
+
+	def nearest_keyframe(self, idx):
+		"""Largest keyframe index <= idx."""
+		k = int(np.searchsorted(self.keyframes, idx, side='right')) - 1
+		return int(self.keyframes[max(k, 0)])
+
+	def frame_at_msec(self, msec):
+		"""Index of the frame whose timestamp is closest to msec."""
+		i = int(np.searchsorted(self.timestamps, msec))
+		if i >= len(self.timestamps):
+			return len(self.timestamps) - 1
+		if i > 0 and msec - self.timestamps[i - 1] < self.timestamps[i] - msec:
+			return i - 1
+		return i
+
+	def _seek_key(self, cap, key):
+		"""Seek to keyframe key, grab it and return the index it really landed on (-1 on failure)."""
+		cap.set(cv2.CAP_PROP_POS_FRAMES, key)
+		if not cap.grab():
+			return -1
+		# verify against the index: the backend may land elsewhere on VFR files
+		return self.frame_at_msec(cap.get(cv2.CAP_PROP_POS_MSEC))
+
+	def read(self, cap, idx, pos=-1, stats=None):
+		"""
+		Frame-accurate read of frame idx: seek to the nearest keyframe and decode forward.
+		pos is the frame cap returns on its next read() (-1 if unknown); when it lies
+		between the keyframe and idx no seek is needed.
+		stats (PerfStats) receives the 'seek' and 'decode' times.
+		Returns the frame or None.
+		"""
+		if not 0 <= idx < self.frame_count:
+			return None
+		t0 = time.perf_counter()
+		key = self.nearest_keyframe(idx)
+		if key <= pos <= idx:
+			cur = pos - 1
+		else:
+			cur = self._seek_key(cap, key)
+			if cur > idx and key > 0:
+				# overshot: restart from the previous keyframe
+				cur = self._seek_key(cap, self.nearest_keyframe(key - 1))
+			if cur < 0 or cur > idx:
+				return None
+			if stats is not None:
+				t1 = time.perf_counter()
+				stats.add('seek', t1 - t0)
+				t0 = t1
+		while cur < idx:
+			if not cap.grab():
+				return None
+			cur += 1
+		ok, frame = cap.retrieve()
+		if stats is not None:
+			stats.add('decode', time.perf_counter() - t0)
+		return frame if ok else None
+
+
+class SeekIndexBuilder:
+	"""
+	load_video 時にバックグラウンドでインデックスを作成し、サイドカーファイルに保存する
+	完了したら result に SeekIndex が入る（GUI 側は after() でポーリングする）
+	"""
+
+	def __init__(self, video_path):
+		self.video_path = video_path
+		self.result = None
+		self.done = threading.Event()
+		self._cancel = threading.Event()
+		self._thread = threading.Thread(target=self._run, name='SeekIndexBuilder', daemon=True)
+		self._thread.start()
+
+	def cancel(self):
+		self._cancel.set()
+
+	def _run(self):
+		try:
+			index = SeekIndex.build(self.video_path, cancel=self._cancel)
+			if index is not None:
+				try:
+					index.save(self.video_path)
+				except OSError:
+					pass  # read-only media: keep the in-memory index only
+			self.result = index
+		finally:
+			self.done.set()
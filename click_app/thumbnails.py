@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import cv2
+import numpy as np
+
+from .image_sequence import open_capture
+
+
+__all__ = [
+	'ThumbnailStrip',
+	'default_thumb_dir',
+]
+
+
+def default_thumb_dir():
+	return os.path.join(tempfile.gettempdir(), 'click_app_thumbs')
+
+
+class ThumbnailStrip:
+	"""
+	タイムライン用のサムネイル: interval フレームおきに縮小画像を作り、メモリマップした .npy に保存する
+	作成はバックグラウンドで先頭から順に行い、同じ動画を次に開いたときはディスクから読むだけになる
+	"""
+
+	def __init__(self, video_path, frame_count, max_thumbs=200, height=40, cache_dir=None):
+		self.video_path = video_path
+		self.frame_count = int(frame_count)
+		self.interval = max(1, -(-self.frame_count // max_thumbs))  # ceil
+		self.n_thumbs = max(1, -(-self.frame_count // self.interval))
+		self.height = int(height)
+		self.cache_dir = cache_dir or default_thumb_dir()
+		st = os.stat(video_path)
+		key = f'{os.path.abspath(video_path)}|{st.st_size}|{st.st_mtime_ns}|{self.frame_count}|{max_thumbs}|{height}'
+		name = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+		self.data_path = os.path.join(self.cache_dir, name + '.npy')
+		self.meta_path = os.path.join(self.cache_dir, name + '.json')
+		self.thumbs = None  # (n_thumbs, height, width, 3) BGR
+		self.ready = 0  # thumbnails [0, ready) are written
+		self.error = None
+		self._stop = threading.Event()
+		self._thread = None
+
+	@property
+	def done(self):
+		return self._thread is None or not self._thread.is_alive()
+
+	def start(self):
+		"""Open the strip from disk or start generating it in the background."""
+		try:
+			with open(self.meta_path, 'r', encoding='utf-8') as f:
+				meta = json.load(f)
+			if meta.get('complete'):
+				self.thumbs = np.load(self.data_path, mmap_mode='r')
+				self.ready = int(meta['thumbs'])
+				return
+		except (OSError, ValueError, KeyError):
+			pass
+		self._thread = threading.Thread(target=self._run, name='ThumbnailStrip', daemon=True)
+		self._thread.start()
+
+	def close(self):
+		self._stop.set()
+		if self._thread is not None:
+			self._thread.join(timeout=2.0)
+
+	def frame_of(self, k):
+		return k * self.interval
+
+	def nearest(self, frame):
+		"""Index of the ready thumbnail closest to frame, or None."""
+		if self.ready == 0:
+			return None
+		return min(self.ready - 1, max(0, int(round(frame / self.interval))))
+
+	def get(self, k):
+		if self.thumbs is None or not 0 <= k < self.ready:
+			return None
+		return self.thumbs[k]
+
+	def _run(self):
+		cap = open_capture(self.video_path)
+		try:
+			if not cap.isOpened():
+				self.error = 'Unable to open video'
+				return
+			w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+			h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+			tw = max(1, int(round(w * self.height / max(1, h))))
+			os.makedirs(self.cache_dir, exist_ok=True)
+			thumbs = np.lib.format.open_memmap(self.data_path, mode='w+', dtype=np.uint8, shape=(self.n_thumbs, self.height, tw, 3))
+			self.thumbs = thumbs
+			pos = 0  # frame the next read() returns
+			k = 0
+			while k < self.n_thumbs and not self._stop.is_set():
+				target = self.frame_of(k)
+				# short gaps: decoding forward is cheaper than seeking
+				if target - pos > 16:
+					cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+					pos = target
+				while pos < target and cap.grab():
+					pos += 1
+				ok, frame = cap.read()
+				if not ok:
+					break
+				pos += 1
+				cv2.resize(frame, (tw, self.height), dst=thumbs[k], interpolation=cv2.INTER_AREA)
+				k += 1
+				self.ready = k
+			thumbs.flush()
+			if not self._stop.is_set():
+				with open(self.meta_path, 'w', encoding='utf-8') as f:
+					json.dump({'video': os.path.abspath(self.video_path), 'thumbs': k, 'complete': True}, f)
+		except OSError as e:
+			self.error = str(e)
+		finally:
+			cap.release()
@@ -0,0 +1,93 @@
+import threading
+
+import cv2
+import numpy as np
+
+
+__all__ = [
+	'PointTracker',
+]
+
+
+class PointTracker:
+	"""
+	ピラミッド Lucas-Kanade (cv2.calcOpticalFlowPyrLK) で点を後続フレームへ伝播する
+	start_frame の点を start_frame+1 .. start_frame+n_frames へ順に追跡する（バックグラウンド）
+	順方向と逆方向の追跡結果のずれ (forward-backward error) が fb_threshold [px] を超えた点は
+	見失ったとみなし、以降のフレームでは NaN になる。追跡済みのフレームは get() で取得できる
+	"""
+
+	def __init__(self, read_fn, start_frame, pts, n_frames, win_size=21, max_level=3, fb_threshold=1.0):
+		self._read = read_fn  # callable(idx) -> BGR frame or None
+		self.start_frame = int(start_frame)
+		self.pts = np.asarray(pts, dtype=np.float32).reshape(-1, 2)
+		self.n_frames = max(0, int(n_frames))
+		self.win_size = int(win_size)
+		self.max_level = int(max_level)
+		self.fb_threshold = float(fb_threshold)
+		# tracks[i] are the positions on frame start_frame + 1 + i (NaN once lost)
+		self.tracks = np.full((self.n_frames, len(self.pts), 2), np.nan)
+		self.ready = 0  # frames start_frame+1 .. start_frame+ready are tracked
+		self.error = None
+		self._stop = threading.Event()
+		self._thread = None
+
+	@property
+	def done(self):
+		return self._thread is None or not self._thread.is_alive()
+
+	def start(self):
+		"""Run the propagation on a worker thread."""
+		self._thread = threading.Thread(target=self.run, name='PointTracker', daemon=True)
+		self._thread.start()
+
+	def cancel(self):
+		self._stop.set()
+
+	def close(self):
+		self.cancel()
+		if self._thread is not None:
+			self._thread.join(timeout=2.0)
+
+	def get(self, frame):
+		"""(N, 2) positions on frame (NaN for lost points), or None if it is not tracked (yet)."""
+		i = frame - self.start_frame - 1
+		if not 0 <= i < self.ready:
+			return None
+		return self.tracks[i]
+
+	def run(self):
+		"""Propagate synchronously (what the worker thread runs)."""
+		lk = dict(
+			winSize=(self.win_size, self.win_size),
+			maxLevel=self.max_level,
+			criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 30, 0.01),
+		)
+		frame = self._read(self.start_frame)
+		if frame is None:
+			self.error = f'Unable to read frame {self.start_frame}'
+			return
+		prev = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+		h, w = prev.shape
+		alive = np.arange(len(self.pts))  # indices of the points still tracked
+		p0 = self.pts.reshape(-1, 1, 2).copy()
+		for i in range(self.n_frames):
+			if self._stop.is_set() or len(alive) == 0:
+				break
+			frame = self._read(self.start_frame + 1 + i)
+			if frame is None:
+				break
+			gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+			p1, st, _ = cv2.calcOpticalFlowPyrLK(prev, gray, p0, None, **lk)
+			back, st_back, _ = cv2.calcOpticalFlowPyrLK(gray, prev, p1, None, **lk)
+			xy = p1.reshape(-1, 2)
+			fb = np.hypot(*(back - p0).reshape(-1, 2).T)
+			ok = (
+				(st.ravel() == 1) & (st_back.ravel() == 1) & (fb < self.fb_threshold)
+				& (xy[:, 0] >= 0) & (xy[:, 0] < w) & (xy[:, 1] >= 0) & (xy[:, 1] < h)
+			)
+			alive = alive[ok]
+			self.tracks[i, alive] = xy[ok]
+			p0 = p1[ok]
+			prev = gray
+			self.ready = i + 1
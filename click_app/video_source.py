@@ -0,0 +1,177 @@
+import os
+import threading
+
+from .decoders import available_decoders, open_decoder, probe_decoders, select_decoder
+from .frame_cache import FrameCache, FrameReadAhead
+from .image_sequence import ImageSequenceSource
+from .seek_index import SeekIndex, SeekIndexBuilder
+
+
+__all__ = [
+	'VideoSource',
+	'open_source',
+]
+
+
+def open_source(path, cache_mb=512, n_next=8, n_prev=4, sequence_fps=30.0, sequence_workers=None, backend='auto', threads=0):
+	"""
+	Frame source for path: VideoSource for a video file (decoded with backend on threads threads),
+	ImageSequenceSource for a directory of numbered images (played at sequence_fps, read ahead on
+	sequence_workers threads). Raises OSError if nothing can be read.
+	"""
+	if os.path.isdir(path):
+		return ImageSequenceSource(path, cache_mb, n_next, n_prev, fps=sequence_fps, workers=sequence_workers)
+	return VideoSource(path, cache_mb, n_next, n_prev, backend=backend, threads=threads)
+
+
+class VideoSource:
+	"""
+	動画ファイルからのフレーム取得 (GUI 非依存)
+	LRU キャッシュ・先読み・キーフレームのシークインデックスをまとめて持ち、
+	read(idx) でフレーム単位に正確なフレームを返す。インデックスがなければバックグラウンドで作る
+	デコーダ (OpenCV / PyAV) は backend で指定し、'auto' ならまず既定のデコーダで開き、
+	バックグラウンドの短いベンチマークで速い方が分かったらそちらに切り替える
+	"""
+
+	def __init__(self, path, cache_mb=512, n_next=8, n_prev=4, build_index=True, backend='auto', threads=0):
+		self.path = path
+		self.stats = None  # PerfStats receiving 'seek' / 'decode' times of read()
+		self.lock = threading.Lock()  # serializes reads on self.decoder
+		self._builder = None
+		self._closed = False
+		# keyframe/timestamp index: reuse the sidecar file, otherwise build it in the background
+		self.seek_index = SeekIndex.load(path)
+		self.probe = None  # {backend: timings} once the background probe of backend='auto' has finished
+		self._prober = None
+		backends = available_decoders() if backend == 'auto' else [backend]
+		self.backend = backends[0]
+		self.threads = threads
+		self.decoder = open_decoder(path, self.backend, threads, self.seek_index)
+		self.size = self.decoder.size  # (w, h) of the original frames
+		self.fps = self.decoder.fps  # native frame rate (30 if unknown)
+		self.codec = self.decoder.codec
+		self.cache = FrameCache(cache_mb)
+		self.n_next = n_next
+		self.n_prev = n_prev
+		if self.seek_index is not None:
+			self.frame_count = self.seek_index.frame_count
+		else:
+			self.frame_count = self.decoder.frame_count
+			if build_index:
+				self._builder = SeekIndexBuilder(path)
+		self.readahead = self._make_readahead()
+		if len(backends) > 1:
+			# benchmarking every backend takes a while (random seeks); the UI keeps using the first one meanwhile
+			self._prober = threading.Thread(target=self._probe, args=(backends,), name='DecoderProbe', daemon=True)
+			self._prober.start()
+
+	def __len__(self):
+		return self.frame_count
+
+	@property
+	def indexing(self):
+		"""True while the seek index is being built in the background."""
+		return self._builder is not None and not self._builder.done.is_set()
+
+	@property
+	def probing(self):
+		"""True while backend='auto' is still benchmarking the backends in the background."""
+		return self._prober is not None and self._prober.is_alive()
+
+	def _probe(self, backends):
+		results = probe_decoders(self.path, backends, self.threads, self.seek_index)
+		best = select_decoder(results, self.backend)
+		if best != self.backend:
+			try:
+				self.set_backend(best)
+			except (OSError, ValueError) as e:
+				results[best] = {'error': str(e)}
+		self.probe = results
+
+	def _make_readahead(self):
+		if not (self.n_next or self.n_prev):
+			return None
+		path, backend, threads = self.path, self.backend, self.threads
+		readahead = FrameReadAhead(path, self.cache, self.n_next, self.n_prev, lambda: open_decoder(path, backend, threads))
+		readahead.seek_index = self.seek_index
+		return readahead
+
+	def set_backend(self, backend):
+		"""Switch decoding and read-ahead to another backend; cached frames stay valid."""
+		decoder = open_decoder(self.path, backend, self.threads, self.seek_index)
+		with self.lock:
+			if self._closed:
+				decoder.close()
+				return
+			old, self.decoder = self.decoder, decoder
+			self.backend = backend
+			readahead, self.readahead = self.readahead, None
+			if readahead is not None:
+				self.readahead = self._make_readahead()
+		old.close()
+		if readahead is not None:
+			readahead.close()
+
+	@property
+	def pending(self):
+		"""True until take_index() has picked up the background seek index (also after the builder finished)."""
+		return self._builder is not None
+
+	def take_index(self):
+		"""
+		Install the finished background seek index and return it (None if building failed).
+		frame_count is corrected to the number of frames the index found.
+		"""
+		builder, self._builder = self._builder, None
+		if builder is None or builder.result is None:
+			return None
+		with self.lock:
+			self.seek_index = builder.result
+			self.frame_count = self.seek_index.frame_count
+			if self.decoder is not None:
+				self.decoder.seek_index = self.seek_index
+			if self.readahead:
+				self.readahead.seek_index = self.seek_index
+		return self.seek_index
+
+	def cached(self, idx):
+		"""Frame idx if it is already decoded (no decoding), else None."""
+		frame = self.cache.get(idx)
+		readahead = self.readahead  # may be swapped by set_backend() on another thread
+		if frame is not None and readahead:
+			readahead.set_center(idx, self.frame_count)
+		return frame
+
+	def read(self, idx, background=False):
+		"""
+		Return frame idx (read-only), from the cache when possible; None if it cannot be read.
+		background=True (e.g. tracking): the read is not timed into stats, which describe what the user waits for.
+		"""
+		frame = self.cache.get(idx)
+		if frame is None:
+			with self.lock:
+				if self.decoder is None:
+					return None
+				frame = self.decoder.read(idx, None if background else self.stats)
+			if frame is None:
+				return None
+			self.cache.put(idx, frame)
+		readahead = self.readahead
+		if readahead:
+			readahead.set_center(idx, self.frame_count)
+		return frame
+
+	def close(self):
+		with self.lock:
+			self._closed = True
+			readahead, self.readahead = self.readahead, None
+		if readahead:
+			readahead.close()
+		if self._builder:
+			self._builder.cancel()
+			self._builder = None
+		with self.lock:
+			if self.decoder is not None:
+				self.decoder.close()
+				self.decoder = None
+		self.cache.clear()
@@ -0,0 +1,60 @@
+"""
+クリック結果 (.mat / .clk) を動画に重ねて書き出すコマンド (GUI 不要)
+
+    python export_video.py VIDEO RESULT OUT.mp4 [--threads N] [--start 1 --stop 1000] [--fourcc mp4v]
+
+デコードと描画は複数のスレッドで行い、フレーム順を保ったまま書き出す。進捗と処理速度 (fps) を表示する。
+"""
+import argparse
+import sys
+import time
+
+from click_app.columns import load_click_columns
+from click_app.core import load_click_mat
+from click_app.export import export_annotated_video
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Export a video with the clicked points drawn on it.')
+	parser.add_argument('video', help='source video')
+	parser.add_argument('result', help='click result (.mat or .clk)')
+	parser.add_argument('out', help='output video (.mp4 / .avi)')
+	parser.add_argument('--threads', type=int, default=None, help='decode/draw threads (default: min(8, CPU count))')
+	parser.add_argument('--start', type=int, default=1, help='first frame (1-based, default: 1)')
+	parser.add_argument('--stop', type=int, default=None, help='last frame (1-based, inclusive; default: end)')
+	parser.add_argument('--fourcc', default=None, help='codec (default: mp4v, MJPG for .avi)')
+	parser.add_argument('--radius', type=int, default=4, help='marker radius in pixels')
+	parser.add_argument('--no-frame-number', action='store_true', help='do not draw the frame number')
+	args = parser.parse_args(argv)
+
+	if args.result.lower().endswith('.clk'):
+		coords_raw = load_click_columns(args.result).to_ragged()['coords_raw']
+	else:
+		coords_raw = load_click_mat(args.result)['coords_raw']
+	fourcc = args.fourcc or ('MJPG' if args.out.lower().endswith('.avi') else 'mp4v')
+	style = {'point_radius': args.radius, 'frame_number': not args.no_frame_number}
+
+	t0 = time.perf_counter()
+	last = [0.0]
+
+	def progress(n, total):
+		now = time.perf_counter()
+		if now - last[0] >= 1.0 or n == total:
+			last[0] = now
+			print(f'\r{n}/{total} frames ({100 * n / total:.0f}%, {n / (now - t0):.1f} fps)', end='', flush=True)
+
+	try:
+		n = export_annotated_video(
+			args.video, args.out, coords_raw, style=style, fourcc=fourcc, threads=args.threads,
+			start=args.start - 1, stop=args.stop, progress=progress,
+		)
+	except (OSError, ValueError) as e:
+		print(f'Export failed: {e}')
+		return 1
+	elapsed = time.perf_counter() - t0
+	print(f'\nWrote {n} frames to {args.out} in {elapsed:.1f} s ({n / elapsed:.1f} fps)')
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -14,7 +14,10 @@ if __name__ == "__main__":
         ca.run_gui()
     else:
         # plot from saved .mat file
-        out = ca.load_click_mat(matfilepath)
+        if matfilepath.endswith('.clk'):
+            out = ca.load_click_columns(matfilepath).to_ragged()
+        else:
+            out = ca.load_click_mat(matfilepath)
         coords_raw = out['coords_raw']
         coords_real = out['coords_real']
         while True:
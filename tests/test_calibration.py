@@ -0,0 +1,29 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from click_app.calibration import Calibration  # noqa: E402
+
+
+def _two_point_transform(img, real, pts):
+	"""The original per-axis mapping: X = r0 + (x - p0) * scale, scale = 1.0 on an axis without spread."""
+	p0, p1 = np.asarray(img, dtype=float)
+	r0, r1 = np.asarray(real, dtype=float)
+	d_img = p1 - p0
+	scale = np.where(d_img == 0, 1.0, (r1 - r0) / np.where(d_img == 0, 1.0, d_img))
+	return r0 + (np.asarray(pts, dtype=float) - p0) * scale
+
+
+@pytest.mark.parametrize('img, real', [
+	([(100, 50), (300, 250)], [(0, 0), (10, 20)]),
+	([(100, 50), (300, 50)], [(0, 5), (10, 7)]),     # identical y
+	([(120, 40), (120, 240)], [(-3, 0), (4, 10)]),   # identical x
+	([(80, 80), (80, 80)], [(1, 2), (3, 4)]),        # identical point
+])
+def test_scale_matches_original_two_point_transform(img, real):
+	pts = np.array([(0, 0), (100, 50), (640, 480), (217.5, 33.25)])
+	calib = Calibration.fit(img, real, 'scale')
+	np.testing.assert_allclose(calib.apply(pts), _two_point_transform(img, real, pts), rtol=0, atol=1e-9)
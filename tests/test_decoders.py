@@ -0,0 +1,99 @@
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from click_app.decoders import open_decoder  # noqa: E402
+from click_app.seek_index import SeekIndex  # noqa: E402
+
+
+N_FRAMES = 20
+
+
+@pytest.fixture(scope='module')
+def video(tmp_path_factory):
+	"""Motion JPEG video whose frame i is filled with gray level 10 * i."""
+	path = str(tmp_path_factory.mktemp('decoders') / 'frames.avi')
+	writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, (64, 48))
+	for i in range(N_FRAMES):
+		writer.write(np.full((48, 64, 3), 10 * i, np.uint8))
+	writer.release()
+	return path
+
+
+def _level(frame):
+	return int(round(frame.mean() / 10))
+
+
+@pytest.mark.parametrize('order', [range(N_FRAMES), [15, 3, 4, 19, 0, 7]])
+def test_opencv_reads_frame_exact(video, order):
+	dec = open_decoder(video, 'opencv')
+	try:
+		assert [_level(dec.read(i)) for i in order] == list(order)
+	finally:
+		dec.close()
+
+
+@pytest.mark.parametrize('order', [range(N_FRAMES), [15, 3, 4, 19, 0, 7]])
+def test_pyav_reads_frame_exact(video, order):
+	pytest.importorskip('av')
+	dec = open_decoder(video, 'pyav')
+	try:
+		assert [_level(dec.read(i)) for i in order] == list(order)
+	finally:
+		dec.close()
+
+
+@pytest.mark.parametrize('indexed', [False, True])
+def test_pyav_seek_past_target_restarts_earlier(video, indexed):
+	pytest.importorskip('av')
+	class OvershootingContainer:
+		"""The first seek lands 5 frames past its target, like inexact seeking in TS/AVI."""
+		def __init__(self, container, skip):
+			self._container = container
+			self._skip = skip
+
+		def __getattr__(self, name):
+			return getattr(self._container, name)
+
+		def seek(self, offset, **kwargs):
+			offset, self._skip = offset + self._skip, 0
+			return self._container.seek(offset, **kwargs)
+
+	dec = open_decoder(video, 'pyav', seek_index=SeekIndex.build(video) if indexed else None)
+	container = dec.container
+	try:
+		dec.container = OvershootingContainer(container, int(5 / dec.fps / dec.time_base))
+		assert _level(dec.read(12)) == 12
+	finally:
+		dec.container = container
+		dec.close()
+
+
+def test_pyav_decode_error_is_an_unreadable_frame(video):
+	av = pytest.importorskip('av')
+	class BrokenContainer:
+		def __init__(self, container):
+			self._container = container
+
+		def __getattr__(self, name):
+			return getattr(self._container, name)
+
+		def decode(self, *args, **kwargs):
+			raise av.error.InvalidDataError(1094995529, 'Invalid data found when processing input')
+
+	dec = open_decoder(video, 'pyav')
+	container = dec.container
+	try:
+		dec.container = BrokenContainer(container)
+		assert dec.read(5) is None
+		assert dec._frames is None
+		# recovers on the next read
+		dec.container = container
+		assert _level(dec.read(5)) == 5
+	finally:
+		dec.container = container
+		dec.close()